@@ -0,0 +1,225 @@
+import random
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from jailmaker.service.curriculos_svc import curriculo_padrao
+
+PLANILHA_MATRIZ_HORARIA = Path(__file__).resolve().parent.parent / "jailmaker" / "files" / "matriz_2024_2.xlsx"
+
+LINHAS_POR_PAGINA = 60
+SITUACOES = ("APROVADO", "APROVADO", "APROVADO", "REPROVADO", "REPROV./FREQ", "EM CURSO")
+
+# Distribuições observadas na matriz de 2024/2: horários, padrões de dias (com pesos), turmas, cursos e termos.
+HORARIOS = ("08h00 - 10h00", "10h00 - 12h00", "13h30 - 15h30", "15h30 - 17h30", "19h00 - 21h00", "21h00 - 23h00")
+PESOS_HORARIOS = (45, 61, 82, 91, 76, 54)
+PADROES_DIAS = (
+    ("TERÇA", "QUINTA"),
+    ("SEGUNDA", "QUARTA"),
+    ("QUARTA",),
+    ("SEXTA",),
+    ("SEXTA", "SEXTA"),
+    ("QUINTA", "QUINTA"),
+    ("QUARTA", "QUARTA"),
+    ("SÁBADO", "SÁBADO"),
+    ("TERÇA", "TERÇA"),
+    ("QUARTA", "SEXTA"),
+)
+PESOS_PADROES_DIAS = (59, 41, 25, 24, 13, 10, 9, 8, 7, 6)
+TURMAS = ("I", "N", "IA", "IB", "NA", "NB", "IC", "ID")
+PESOS_TURMAS = (106, 52, 17, 17, 10, 10, 9, 5)
+CURSOS = ("BCT-I", "BCT-N", "EM-I", "EB-I", "BCC/EC-N")
+PESOS_CURSOS = (115, 62, 15, 9, 8)
+TERMOS = ("2", "4", "6", "8", "10")
+
+
+def gerar_pdf_historico(num_paginas: int, seed: int = 0) -> bytes:
+    """
+    Gera um PDF de histórico acadêmico sintético no layout esperado por LeitorHistoricoAcademico,
+    com cabeçalho do aluno na primeira página e disciplinas (algumas com o nome quebrado em duas linhas).
+
+    Args:
+        num_paginas: Quantidade de páginas do histórico.
+        seed: Semente do gerador de números aleatórios.
+
+    Returns:
+        O conteúdo do PDF.
+    """
+    rng = random.Random(seed)
+    nomes = _disciplinas_curriculo()
+    paginas = []
+    for pagina in range(num_paginas):
+        linhas = ["HISTÓRICO ESCOLAR"]
+        if pagina == 0:
+            linhas += [
+                f"Matrícula: {rng.randint(100000, 999999)}",
+                "Nome: ESTUDANTE SINTÉTICO",
+                "Curso: BACHARELADO EM CIÊNCIA DA COMPUTAÇÃO",
+                f"Coeficiente de Rendimento: {rng.uniform(5, 10):.4f}",
+            ]
+        linhas.append("Ano Sem Termo Turno Turma Código Unidade Curricular")
+        while len(linhas) < LINHAS_POR_PAGINA:
+            situacao = rng.choice(SITUACOES)
+            conceito = "-" if situacao == "EM CURSO" else rng.choice("ABCDF")
+            inicio = (
+                f"{rng.randint(2015, 2024)} {rng.randint(1, 2)} {rng.randint(1, 10)} {rng.choice('IN')} "
+                f"{rng.choice(['A', 'B', 'IA', 'NB'])} {rng.randint(1000, 9999)} {rng.choice(nomes)}"
+            )
+            resto = (
+                f"UNIDADE CURRICULAR OBRIGATÓRIA UC {rng.randint(0, 10)} {rng.randint(70, 100)} 4 72 "
+                f"{conceito} {situacao}"
+            )
+            if rng.random() < 0.2:
+                linhas += [f"{inicio} UNIDADE", resto.removeprefix("UNIDADE ")]
+            else:
+                linhas.append(f"{inicio} {resto}")
+        paginas.append(linhas)
+    return _montar_pdf(paginas)
+
+
+def gerar_matriz_horaria(num_ofertas: int, seed: int = 0, proporcao_curriculo: float = 0.6) -> list[dict]:
+    """
+    Gera uma matriz horária sintética no formato da API, com horários, dias, turmas e cursos sorteados
+    conforme as distribuições da matriz real. Padrões com duas aulas no mesmo dia ocupam horários consecutivos.
+
+    Args:
+        num_ofertas: Quantidade de ofertas.
+        seed: Semente do gerador de números aleatórios.
+        proporcao_curriculo: Proporção das ofertas de disciplinas do currículo (as demais são eletivas).
+
+    Returns:
+        A matriz horária.
+    """
+    rng = random.Random(seed)
+    curriculo = _disciplinas_curriculo()
+    num_eletivas = max(50, num_ofertas // 10)
+    num_professores = max(20, num_ofertas // 4)
+    matriz_horaria = []
+    for _ in range(num_ofertas):
+        if rng.random() < proporcao_curriculo:
+            nome = rng.choice(curriculo) + (" (REOF)" if rng.random() < 0.05 else "")
+        else:
+            nome = f"ELETIVA {rng.randrange(num_eletivas)}"
+
+        dias = rng.choices(PADROES_DIAS, PESOS_PADROES_DIAS)[0]
+        if len(dias) == 2 and dias[0] == dias[1]:
+            posicao = rng.randrange(len(HORARIOS) - 1)
+            horarios = list(HORARIOS[posicao : posicao + 2])
+        else:
+            horarios = [rng.choices(HORARIOS, PESOS_HORARIOS)[0]] * len(dias)
+
+        matriz_horaria.append(
+            {
+                "nome": nome,
+                "professor": f"PROFESSOR {rng.randrange(num_professores)}",
+                "turma": rng.choices(TURMAS, PESOS_TURMAS)[0],
+                "horarios": horarios,
+                "dias": list(dias),
+                "curso": rng.choices(CURSOS, PESOS_CURSOS)[0],
+                "termo": rng.choice(TERMOS),
+            }
+        )
+    return matriz_horaria
+
+
+def gerar_historico_academico(progresso: float, seed: int = 0) -> list[dict]:
+    """
+    Gera um histórico acadêmico sintético de um estudante que concluiu a fração `progresso` do currículo,
+    seguindo a ordem topológica dos pré-requisitos, com algumas reprovações anteriores às aprovações e
+    as disciplinas seguintes em curso.
+
+    Args:
+        progresso: Fração do currículo concluída, entre 0 e 1.
+        seed: Semente do gerador de números aleatórios.
+
+    Returns:
+        Lista de dicionários com as chaves "nome" e "situacao".
+    """
+    rng = random.Random(seed)
+    curriculo_curso = curriculo_padrao()
+    curriculo = [
+        curriculo_curso.nomes[disciplina]
+        for disciplina in curriculo_curso.grafo.ordem_topologica
+        if disciplina in curriculo_curso.ids_curriculo
+    ]
+    num_concluidas = round(progresso * len(curriculo))
+
+    historico_academico = []
+    for nome in curriculo[:num_concluidas]:
+        if rng.random() < 0.15:
+            historico_academico.append({"nome": nome, "situacao": rng.choice(("REPROVADO", "REPROV./FREQ"))})
+        historico_academico.append({"nome": nome, "situacao": "APROVADO"})
+    for nome in curriculo[num_concluidas : num_concluidas + rng.randint(2, 4)]:
+        historico_academico.append({"nome": nome, "situacao": "EM CURSO"})
+    return historico_academico
+
+
+def gerar_planilha_matriz_horaria(fator: int) -> pd.DataFrame:
+    """
+    Gera uma planilha de matriz horária sintética, no formato retornado por `pd.read_excel`, repetindo
+    `fator` vezes os blocos de cursos e horários da planilha real. Os nomes das disciplinas de cada cópia
+    recebem um sufixo, para que as ofertas continuem distintas.
+
+    Args:
+        fator: Quantidade de cópias dos blocos da planilha real.
+
+    Returns:
+        A planilha ampliada.
+    """
+    planilha = pd.read_excel(PLANILHA_MATRIZ_HORARIA)
+    cabecalho, corpo = planilha.iloc[:1], planilha.iloc[1:]
+    if len(corpo) % 2:
+        # Mantém a paridade das linhas (horário nas linhas ímpares, docente nas pares) entre as cópias.
+        corpo = pd.concat([corpo, pd.DataFrame([[np.nan] * corpo.shape[1]], columns=corpo.columns)])
+
+    copias = []
+    for copia in range(fator):
+        valores = corpo.to_numpy(dtype=object, copy=True)
+        nomes = valores[::2, 2:]
+        preenchidos = pd.notna(nomes)
+        nomes[preenchidos] = nomes[preenchidos] + f" {copia}"
+        valores[::2, 2:] = nomes
+        copias.append(pd.DataFrame(valores, columns=planilha.columns))
+    return pd.concat([cabecalho, *copias], ignore_index=True)
+
+
+def _montar_pdf(paginas: list[list[str]]) -> bytes:
+    """Monta um PDF mínimo (Helvetica, WinAnsiEncoding) com uma linha de texto por item de cada página."""
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(len(paginas))), len(paginas)),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for i, linhas in enumerate(paginas):
+        conteudo = b"".join(
+            b"BT /F1 8 Tf 20 %d Td (%s) Tj ET\n" % (820 - 13 * j, _escapar(linha)) for j, linha in enumerate(linhas)
+        )
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)
+        )
+        objetos.append(b"<< /Length %d >>\nstream\n%sendstream" % (len(conteudo), conteudo))
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    deslocamentos = []
+    for numero, objeto in enumerate(objetos, start=1):
+        deslocamentos.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (numero, objeto)
+    inicio_xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % deslocamento for deslocamento in deslocamentos)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return bytes(pdf)
+
+
+def _escapar(texto: str) -> bytes:
+    """Escapa um texto para uma string literal de PDF codificada em WinAnsi."""
+    return texto.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)").encode("cp1252")
+
+
+def _disciplinas_curriculo() -> list[str]:
+    """Lista, em ordem alfabética, os nomes das disciplinas do currículo padrão."""
+    curriculo = curriculo_padrao()
+    return sorted(curriculo.nomes[disciplina] for disciplina in curriculo.ids_curriculo)
@@ -0,0 +1,48 @@
+"""
+Benchmark da leitura de históricos acadêmicos em PDF (LeitorHistoricoAcademico.from_pdf).
+
+Uso:
+    python -m benchmarks.historico_academico [--paginas 1 5 20] [--repeticoes 5]
+"""
+
+import argparse
+import io
+import statistics
+import time
+import tracemalloc
+
+from benchmarks.geradores import gerar_pdf_historico
+from jailmaker.service.historico_academico_svc import LeitorHistoricoAcademico
+
+
+def medir(conteudo: bytes, repeticoes: int) -> dict[str, float]:
+    """
+    Mede a latência mediana (ms) e o pico de memória alocada (KiB) da leitura de um PDF.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        LeitorHistoricoAcademico.from_pdf(io.BytesIO(conteudo))
+        tempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    LeitorHistoricoAcademico.from_pdf(io.BytesIO(conteudo))
+    _atual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"latencia_ms": statistics.median(tempos) * 1000, "pico_kib": pico / 1024}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paginas", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'páginas':>8}{'latência (ms)':>15}{'pico (KiB)':>12}")
+    for num_paginas in args.paginas:
+        resultado = medir(gerar_pdf_historico(num_paginas), args.repeticoes)
+        print(f"{num_paginas:>8}{resultado['latencia_ms']:>15.1f}{resultado['pico_kib']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark da conversão da planilha da matriz horária (LeitorMatrizHoraria.converter), comparando a
+implementação vetorizada com a implementação de referência baseada em laços sobre as células.
+A leitura do arquivo xlsx (pd.read_excel) não é medida.
+
+Uso:
+    python -m benchmarks.matriz_horaria [--fatores 1 10 50] [--repeticoes 3]
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+import pandas as pd
+
+from benchmarks.geradores import gerar_planilha_matriz_horaria
+from jailmaker.service.matriz_horaria_svc import LeitorMatrizHoraria
+
+
+class LeitorMatrizHorariaReferencia(LeitorMatrizHoraria):
+    """
+    Implementação anterior à vetorização, que percorre a planilha transposta célula a célula.
+    Mantida apenas como referência de desempenho e de resultado.
+    """
+
+    def converter(self, df: pd.DataFrame) -> pd.DataFrame:
+        df["Unnamed: 0"] = df["Unnamed: 0"].ffill()
+        df = df.T
+        df[0] = df[0].ffill()
+        df = self._gerar_disciplinas(df)
+        df = self._limpar_dados(df)
+        df = self._renomear_colunas(df)
+        df = self._combinar_horarios(df)
+        return df
+
+    def _gerar_disciplinas(self, df: pd.DataFrame) -> pd.DataFrame:
+        linhas = []
+        if df.shape[0] < 3 or df.shape[1] < 3:
+            return pd.DataFrame(linhas)
+
+        for i in range(2, df.shape[0]):
+            dia_semana = df.iloc[i, 0]
+            for col in range(1, df.shape[1], 2):
+                if pd.isna(df.iloc[1, col]):
+                    continue
+                if col + 1 >= df.shape[1]:
+                    break
+
+                nome_disciplina = df.iloc[i, col]
+                turma_professor = df.iloc[i, col + 1]
+                if pd.notna(nome_disciplina) and pd.notna(turma_professor):
+                    linhas.append(
+                        {
+                            "Dia da Semana": dia_semana,
+                            "Horário": df.iloc[1, col],
+                            "Nome da Disciplina": nome_disciplina,
+                            "Turma - Professor": turma_professor,
+                            "Curso - Período": df.iloc[0, col],
+                        }
+                    )
+
+        return pd.DataFrame(linhas)
+
+    def _limpar_dados(self, df: pd.DataFrame) -> pd.DataFrame:
+        df[["Curso", "Período"]] = (
+            df["Curso - Período"].str.replace("\n\n\n\n", "").apply(self._separar_curso_periodo).apply(pd.Series)
+        )
+        df[["Turma", "Professor"]] = df["Turma - Professor"].apply(self._separar_turma_professor).apply(pd.Series)
+        df["Horário"] = df["Horário"].apply(self._normalizar_horario)
+        df.update(df.loc[:, df.columns != "ID"].apply(lambda x: x.str.strip() if x.dtype == "object" else x))
+        return df
+
+    @staticmethod
+    def _separar_curso_periodo(texto: str) -> tuple[str, str | None]:
+        partes = re.split(r" \n|\n", texto)
+        periodo = re.search(r"(?:Período|Termo) (\d+)", partes[1]).group(1) if len(partes) > 1 else None
+        return partes[0], periodo
+
+    @staticmethod
+    def _separar_turma_professor(texto: str) -> tuple[str, str]:
+        correspondencia = re.match(r"([A-Z]+[A-Z0-9]*)\s*-\s*(.+)", texto)
+        if correspondencia:
+            return correspondencia.group(1).strip(), correspondencia.group(2).strip()
+        if texto.strip().isalpha():
+            return "I", texto.strip()
+        correspondencia_maiuscula = re.search(r"[A-Z]+$", texto)
+        return correspondencia_maiuscula.group(0) if correspondencia_maiuscula else "N", texto.strip()
+
+    @staticmethod
+    def _normalizar_horario(horario: str) -> str:
+        correspondencia = re.match(r"(\d{1,2})[hH](\d{2})\s*-\s*(\d{1,2})[hH](\d{2})", horario)
+        if correspondencia:
+            hora_inicio, minuto_inicio, hora_fim, minuto_fim = correspondencia.groups()
+            return f"{int(hora_inicio):02d}h{minuto_inicio} - {int(hora_fim):02d}h{minuto_fim}"
+        return horario
+
+
+def medir(leitor: LeitorMatrizHoraria, planilha: pd.DataFrame, repeticoes: int) -> tuple[float, pd.DataFrame]:
+    """
+    Mede a latência mediana (ms) da conversão da planilha.
+
+    Returns:
+        A latência mediana e o resultado da última conversão.
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        copia = planilha.copy()
+        inicio = time.perf_counter()
+        resultado = leitor.converter(copia)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000, resultado
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fatores", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--repeticoes", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'fator':>6}{'ofertas':>9}{'referência (ms)':>17}{'vetorizada (ms)':>17}{'speedup':>9}")
+    for fator in args.fatores:
+        planilha = gerar_planilha_matriz_horaria(fator)
+        referencia_ms, referencia = medir(LeitorMatrizHorariaReferencia(""), planilha, args.repeticoes)
+        vetorizada_ms, vetorizada = medir(LeitorMatrizHoraria(""), planilha, args.repeticoes)
+        pd.testing.assert_frame_equal(vetorizada, referencia)
+        print(
+            f"{fator:>6}{len(vetorizada):>9}{referencia_ms:>17.1f}{vetorizada_ms:>17.1f}"
+            f"{referencia_ms / vetorizada_ms:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Benchmark da (de)serialização JSON da API, comparando o json da biblioteca padrão (json.loads no corpo e o
+JSONRenderer padrão do Ninja) com o orjson (validação do corpo pelo esquema declarado, em uma única passagem
+sobre os bytes, e RendererOrjson), para corpos de /grade-ideal com matrizes de tamanhos diferentes.
+Também mede o cálculo da versão de uma matriz enviada por inteiro, que serializa a matriz de forma canônica.
+
+Uso:
+    python -m benchmarks.serializacao [--tamanhos 100 1000 10000] [--repeticoes 20]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import time
+from collections.abc import Callable
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+from ninja.renderers import JSONRenderer  # noqa: E402
+
+from benchmarks.geradores import gerar_historico_academico, gerar_matriz_horaria  # noqa: E402
+from jailmaker.schemas import ADAPTADOR_GRADE_IDEAL  # noqa: E402
+from jailmaker.serializacao import RendererOrjson  # noqa: E402
+from jailmaker.service.versao_svc import versao_matriz_horaria  # noqa: E402
+
+
+def versao_matriz_horaria_json(matriz_horaria: list[dict]) -> str:
+    """Cálculo da versão da matriz com o json da biblioteca padrão, mantido apenas como referência."""
+    conteudo = json.dumps(matriz_horaria, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:16]
+
+
+def medir(funcao: Callable[[], object], repeticoes: int) -> float:
+    """Executa `funcao` repetidas vezes e retorna a latência mediana em milissegundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    renderer_padrao, renderer_orjson = JSONRenderer(), RendererOrjson()
+    historico_academico = gerar_historico_academico(0.5)
+
+    print(f"{'ofertas':>8}{'etapa':>13}{'KiB':>9}{'antes (ms)':>12}{'depois (ms)':>13}{'speedup':>9}")
+    for tamanho in args.tamanhos:
+        dados = {"matriz_horaria": gerar_matriz_horaria(tamanho), "historico_academico": historico_academico}
+        corpo = json.dumps(dados).encode("utf-8")
+        if ADAPTADOR_GRADE_IDEAL.validate_json(corpo) != json.loads(corpo):
+            raise AssertionError("O corpo validado difere do corpo decodificado pelo json")
+        if versao_matriz_horaria(dados["matriz_horaria"]) != versao_matriz_horaria_json(dados["matriz_horaria"]):
+            raise AssertionError("A versão calculada com o orjson difere da calculada com o json")
+
+        etapas = {
+            # Antes, o corpo era apenas decodificado; agora é decodificado e validado pelo esquema na mesma passagem
+            # (pelo pydantic-core, não pelo orjson).
+            "requisicao": (
+                lambda corpo=corpo: json.loads(corpo),
+                lambda corpo=corpo: ADAPTADOR_GRADE_IDEAL.validate_json(corpo),
+            ),
+            "versao": (
+                lambda dados=dados: versao_matriz_horaria_json(dados["matriz_horaria"]),
+                lambda dados=dados: versao_matriz_horaria(dados["matriz_horaria"]),
+            ),
+            # O HttpResponse codifica em UTF-8 o texto produzido pelo renderer padrão.
+            "resposta": (
+                lambda dados=dados: renderer_padrao.render(None, dados, response_status=200).encode("utf-8"),
+                lambda dados=dados: renderer_orjson.render(None, dados, response_status=200),
+            ),
+        }
+        for etapa, (antes, depois) in etapas.items():
+            ms_antes, ms_depois = medir(antes, args.repeticoes), medir(depois, args.repeticoes)
+            print(
+                f"{tamanho:>8}{etapa:>13}{len(corpo) / 1024:>9.0f}{ms_antes:>12.2f}{ms_depois:>13.2f}"
+                f"{ms_antes / ms_depois:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Suíte de benchmarks do backend, com detecção de regressões em relação a uma linha de base local.
+
+Mede, sobre dados sintéticos:
+- a construção do modelo base da grade ideal, por etapa (filtragem, índice de horários, restrições, objetivo),
+  para matrizes de 100 a 10.000 ofertas;
+- a geração da grade ideal por etapa (histórico, instanciação, resolução) para estudantes em diferentes
+  estágios do curso;
+- a leitura de históricos acadêmicos em PDF (LeitorHistoricoAcademico.from_pdf);
+- a leitura da planilha da matriz horária (LeitorMatrizHoraria.ler), incluindo o xlsx.
+
+Os resultados são latências medianas em milissegundos. Com --salvar, passam a ser a linha de base; sem ele,
+são comparados com a linha de base existente e o processo termina com código 1 se alguma medida piorar
+mais que a tolerância. Gerações da grade ideal em que alguma resolução não chegou ao ótimo (ex.: parou no
+--tempo-limite) medem o tempo limite, e não a resolução: elas são listadas à parte, com o status, e ficam fora
+dos resultados e da comparação.
+
+Uso:
+    python -m benchmarks.suite [--tamanhos 100 1000 10000] [--repeticoes 5] [--tempo-limite 10] [--salvar]
+        [--tolerancia 0.25]
+"""
+
+import argparse
+import io
+import json
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+
+from benchmarks.geradores import (
+    gerar_historico_academico,
+    gerar_matriz_horaria,
+    gerar_pdf_historico,
+    gerar_planilha_matriz_horaria,
+)
+from jailmaker.service.grade_ideal_svc import GeradorGradeIdeal, ModeloBaseGradeIdeal, ParametrosSolver
+from jailmaker.service.historico_academico_svc import LeitorHistoricoAcademico
+from jailmaker.service.matriz_horaria_svc import LeitorMatrizHoraria
+
+LINHA_DE_BASE = Path(__file__).resolve().parent / "linha_de_base.json"
+PROGRESSOS = (0.0, 0.5, 0.9)
+PAGINAS_PDF = (1, 5, 20)
+FATORES_PLANILHA = (1, 10)
+# Diferença absoluta mínima (ms) para que uma piora seja considerada regressão, evitando ruído em medidas curtas.
+DIFERENCA_MINIMA_MS = 1.0
+
+
+def medir_etapas(funcao: Callable[[], dict[str, float]], repeticoes: int) -> dict[str, float]:
+    """
+    Executa `funcao` repetidas vezes e retorna a mediana (ms) de cada etapa dos tempos (em segundos) que ela retorna.
+    """
+    execucoes = [funcao() for _ in range(repeticoes)]
+    return {etapa: statistics.median(tempos[etapa] for tempos in execucoes) * 1000 for etapa in execucoes[0]}
+
+
+def medir(funcao: Callable[[], object], repeticoes: int) -> float:
+    """Executa `funcao` repetidas vezes e retorna a latência mediana em milissegundos."""
+
+    def cronometrar() -> dict[str, float]:
+        inicio = time.perf_counter()
+        funcao()
+        return {"total": time.perf_counter() - inicio}
+
+    return medir_etapas(cronometrar, repeticoes)["total"]
+
+
+def benchmark_grade_ideal(
+    tamanhos: list[int], repeticoes: int, parametros_solver: ParametrosSolver
+) -> tuple[dict[str, float], dict[str, str]]:
+    """
+    Mede a construção do modelo base e a geração da grade ideal por etapa, para cada tamanho de matriz.
+
+    Returns:
+        Os resultados e, à parte, as gerações em que alguma resolução não chegou ao ótimo, com os status obtidos.
+    """
+    resultados = {}
+    limitadas = {}
+    for tamanho in tamanhos:
+        matriz_horaria = gerar_matriz_horaria(tamanho)
+        construir = partial(_construir_modelo_base, matriz_horaria)
+        for etapa, ms in medir_etapas(construir, repeticoes).items():
+            resultados[f"grade_ideal/{tamanho}/construcao/{etapa}"] = ms
+
+        for progresso in PROGRESSOS:
+            status = []
+            gerar = partial(
+                _gerar_grade_ideal, matriz_horaria, gerar_historico_academico(progresso), parametros_solver, status
+            )
+            # A primeira geração constrói o modelo base, que as seguintes reaproveitam.
+            gerar()
+            status.clear()
+            tempos = medir_etapas(gerar, repeticoes)
+
+            prefixo = f"grade_ideal/{tamanho}/progresso_{progresso:.1f}"
+            nao_otimos = sorted(set(status) - {"OPTIMAL"})
+            if nao_otimos:
+                limitadas[prefixo] = ", ".join(nao_otimos)
+                continue
+            for etapa, ms in tempos.items():
+                resultados[f"{prefixo}/{etapa}"] = ms
+    return resultados, limitadas
+
+
+def _construir_modelo_base(matriz_horaria: list[dict]) -> dict[str, float]:
+    """Constrói o modelo base (sem cache) e retorna os tempos de cada etapa."""
+    return ModeloBaseGradeIdeal(matriz_horaria).tempos
+
+
+def _gerar_grade_ideal(
+    matriz_horaria: list[dict],
+    historico_academico: list[dict],
+    parametros_solver: ParametrosSolver,
+    status: list[str],
+) -> dict[str, float]:
+    """
+    Gera a grade ideal, acrescenta o status da resolução a `status` (OPTIMAL se não houve resolução, por falta
+    de ofertas elegíveis) e retorna os tempos de cada etapa.
+    """
+    gerador = GeradorGradeIdeal(matriz_horaria, historico_academico, parametros_solver=parametros_solver)
+    gerador.gerar()
+    status.append(gerador.estatisticas["status"] if gerador.estatisticas is not None else "OPTIMAL")
+    return gerador.tempos
+
+
+def benchmark_historico_academico(repeticoes: int) -> dict:
+    """Mede a leitura de históricos acadêmicos em PDF de diferentes tamanhos."""
+    resultados = {}
+    for num_paginas in PAGINAS_PDF:
+        conteudo = gerar_pdf_historico(num_paginas)
+        resultados[f"historico_academico/{num_paginas}_paginas"] = medir(
+            lambda conteudo=conteudo: LeitorHistoricoAcademico.from_pdf(io.BytesIO(conteudo)), repeticoes
+        )
+    return resultados
+
+
+def benchmark_matriz_horaria(repeticoes: int) -> dict:
+    """Mede a leitura de planilhas xlsx da matriz horária ampliadas sinteticamente."""
+    resultados = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        for fator in FATORES_PLANILHA:
+            path = Path(diretorio) / f"matriz_{fator}.xlsx"
+            gerar_planilha_matriz_horaria(fator).to_excel(path, index=False)
+            resultados[f"matriz_horaria/fator_{fator}"] = medir(LeitorMatrizHoraria(str(path)).ler, repeticoes)
+    return resultados
+
+
+def comparar(resultados: dict[str, float], linha_de_base: dict[str, float], tolerancia: float) -> list[str]:
+    """
+    Compara os resultados com a linha de base.
+
+    Returns:
+        As medidas que pioraram mais que a tolerância (e mais que DIFERENCA_MINIMA_MS).
+    """
+    return [
+        nome
+        for nome, ms in resultados.items()
+        if nome in linha_de_base
+        and ms > linha_de_base[nome] * (1 + tolerancia)
+        and ms - linha_de_base[nome] > DIFERENCA_MINIMA_MS
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--num-workers", type=int, default=8, help="Workers do CP-SAT em cada resolução.")
+    parser.add_argument("--tempo-limite", type=float, default=10.0, help="Tempo limite (s) de cada resolução.")
+    parser.add_argument("--salvar", action="store_true", help="Grava os resultados como a nova linha de base.")
+    parser.add_argument("--tolerancia", type=float, default=0.25, help="Piora relativa tolerada (0.25 = 25%%).")
+    parser.add_argument("--linha-de-base", type=Path, default=LINHA_DE_BASE)
+    args = parser.parse_args()
+
+    parametros_solver = ParametrosSolver(tempo_limite=args.tempo_limite, num_workers=args.num_workers)
+    resultados_grade_ideal, limitadas = benchmark_grade_ideal(args.tamanhos, args.repeticoes, parametros_solver)
+    resultados = {
+        **resultados_grade_ideal,
+        **benchmark_historico_academico(args.repeticoes),
+        **benchmark_matriz_horaria(args.repeticoes),
+    }
+
+    linha_de_base = {}
+    if args.linha_de_base.exists():
+        linha_de_base = json.loads(args.linha_de_base.read_text(encoding="utf-8"))["resultados"]
+
+    regressoes = comparar(resultados, linha_de_base, args.tolerancia)
+    print(f"{'medida':<52}{'atual (ms)':>12}{'base (ms)':>12}{'variação':>10}")
+    for nome, ms in resultados.items():
+        base = linha_de_base.get(nome)
+        variacao = f"{(ms / base - 1) * 100:+.0f}%" if base else "-"
+        marcador = "  REGRESSÃO" if nome in regressoes else ""
+        print(f"{nome:<52}{ms:>12.2f}{base if base is not None else float('nan'):>12.2f}{variacao:>10}{marcador}")
+    for prefixo, status in limitadas.items():
+        print(f"{prefixo:<52}  sem ótimo em {args.tempo_limite:g} s ({status}), fora da comparação")
+
+    if args.salvar:
+        args.linha_de_base.write_text(
+            json.dumps({"criada_em": time.time(), "resultados": resultados, "limitadas": limitadas}, indent=2),
+            encoding="utf-8",
+        )
+        print(f"Linha de base gravada em {args.linha_de_base}")
+    elif regressoes:
+        print(f"{len(regressoes)} regressão(ões) acima de {args.tolerancia:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 from corsheaders.defaults import default_headers, default_methods
@@ -33,6 +34,8 @@ CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
 CORS_ALLOW_HEADERS = list(default_headers)
 CORS_ALLOW_METHODS = list(default_methods)
+# Total de ofertas das consultas paginadas de /matriz-horaria.
+CORS_EXPOSE_HEADERS = ["X-Total-Count"]
 
 
 # Application definition
@@ -50,6 +53,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "jailmaker.middleware.MetricasMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -131,3 +135,136 @@ STATIC_URL = "static/"
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+
+# Grade ideal: parâmetros do solver CP-SAT
+# TEMPO_LIMITE e NUM_WORKERS são os padrões de cada resolução; os valores informados por requisição
+# (?tempo_limite=...&num_workers=...) são limitados por TEMPO_LIMITE_MAXIMO e NUM_WORKERS_MAXIMO.
+
+JAILMAKER_SOLVER = {
+    "TEMPO_LIMITE": 10.0,
+    "TEMPO_LIMITE_MAXIMO": 30.0,
+    "NUM_WORKERS": 8,
+    "NUM_WORKERS_MAXIMO": 8,
+    "DETERMINISTICO": False,
+}
+
+
+# Grade ideal: cache de resultados
+# As grades ótimas são mantidas em um cache LRU local com TTL, indexado pela versão da matriz e pelo conjunto
+# de ofertas elegíveis. Com CACHE_DJANGO definido (um alias de CACHES), o cache do Django é usado no lugar,
+# permitindo compartilhar os resultados entre processos. DELETE /grade-ideal/cache esvazia o cache (com CACHE_DJANGO,
+# o alias inteiro, que deve ser dedicado às grades).
+
+JAILMAKER_CACHE_GRADE_IDEAL = {
+    "TAMANHO_MAXIMO": 1024,
+    "TTL": 3600,
+    "CACHE_DJANGO": None,
+}
+
+
+# Grade ideal em lote
+# As resoluções de /grade-ideal/lote são distribuídas em um pool de MAX_WORKERS processos (None para um por CPU).
+# Cada resolução usa NUM_WORKERS_SOLVER workers do CP-SAT, para que o pool não dispute os mesmos núcleos.
+
+JAILMAKER_LOTE = {
+    "MAX_WORKERS": None,
+    "NUM_WORKERS_SOLVER": 1,
+    "MAX_HISTORICOS": 1000,
+}
+
+
+# Controle de admissão
+# /grade-ideal, /grade-ideal/alternativas e /historico-academico são views assíncronas: as resoluções e as leituras
+# de PDF rodam em pools dedicados de MAX_CONCORRENCIA threads, sem ocupar os workers que atendem as leituras baratas
+# (ex.: /matriz-horaria) quando servidas por core/asgi.py. Com MAX_CONCORRENCIA + MAX_FILA requisições em andamento,
+# as seguintes recebem 503 com Retry-After: RETRY_AFTER; as que não terminam em PRAZO segundos (incluindo a espera
+# na fila) recebem 504. O PRAZO do solver deve ser maior que JAILMAKER_SOLVER["TEMPO_LIMITE_MAXIMO"].
+# Cada /grade-ideal/lote ocupa uma vaga do pool do solver enquanto o lote é transmitido, sem PRAZO.
+
+JAILMAKER_ADMISSAO = {
+    "SOLVER": {"MAX_CONCORRENCIA": 2, "MAX_FILA": 8, "PRAZO": 45.0},
+    "HISTORICO": {"MAX_CONCORRENCIA": 2, "MAX_FILA": 16, "PRAZO": 30.0},
+    "RETRY_AFTER": 5,
+}
+
+
+# Sessões de simulação da grade ideal
+# /grade-ideal/sessoes mantém em memória o modelo de cada estudante para edições incrementais (fixar ou excluir
+# ofertas, excluir professores, bloquear dias). São mantidas até MAX_SESSOES sessões por processo (descartando as
+# usadas há mais tempo), e cada sessão expira após TTL segundos sem uso. Com vários processos, as requisições de uma
+# sessão devem ser encaminhadas ao processo que a criou.
+
+JAILMAKER_SESSOES = {
+    "MAX_SESSOES": 500,
+    "TTL": 15 * 60,
+}
+
+
+# Histórico acadêmico: leitura assíncrona
+# Com ?assincrono=true, os PDFs enviados são lidos por um pool local de MAX_WORKERS threads (ou processos, com
+# USAR_PROCESSOS), com até MAX_FILA uploads aguardando; os resultados ficam disponíveis por TTL_RESULTADOS segundos.
+
+JAILMAKER_TAREFAS_HISTORICO = {
+    "MAX_WORKERS": 2,
+    "MAX_FILA": 32,
+    "TTL_RESULTADOS": 600,
+    "USAR_PROCESSOS": False,
+}
+
+
+# Histórico acadêmico: cache de PDFs já lidos
+# Os resultados são indexados pelo SHA-256 do PDF e pela versão do parser, em um cache LRU em memória com até
+# TAMANHO_MAXIMO itens e, com DIRETORIO definido, também em disco, limitado a TAMANHO_MAXIMO_DISCO bytes.
+
+JAILMAKER_CACHE_HISTORICO = {
+    "TAMANHO_MAXIMO": 256,
+    "DIRETORIO": None,
+    "TAMANHO_MAXIMO_DISCO": 64 * 1024 * 1024,
+}
+
+# Matrizes horárias compiladas
+# `manage.py compilar_matriz` converte as planilhas xlsx em artefatos versionados pelo hash da planilha
+# (JSON da matriz e arrays .npy mapeáveis em memória), gravados em DIRETORIO_ARTEFATOS. O diretório é verificado a cada
+# INTERVALO_VERIFICACAO segundos e as novas versões publicadas são registradas sem reiniciar os workers.
+# As consultas filtradas de /matriz-horaria usam as ofertas importadas no banco (DATABASES; ver `manage.py migrate`)
+# por `manage.py importar_matriz` ou `manage.py sincronizar_matriz`. Cada nova versão da matriz precisa ser importada:
+# até lá, as consultas filtradas dessa versão respondem 404.
+
+JAILMAKER_MATRIZES = {
+    "DIRETORIO_ARTEFATOS": BASE_DIR / "artefatos" / "matrizes",
+    "INTERVALO_VERIFICACAO": 5,
+}
+
+# Matriz horária: sincronização com o Google Sheets
+# `manage.py sincronizar_matriz` lê a aba ABA (a primeira, se None) da planilha PLANILHA_ID com a conta de serviço
+# do arquivo CREDENCIAIS e publica a matriz em DIRETORIO_ARTEFATOS com o nome NOME_MATRIZ. Com --continuo, a revisão
+# da planilha é consultada a cada INTERVALO segundos e apenas os blocos de horário alterados são convertidos de novo.
+
+JAILMAKER_PLANILHA = {
+    "PLANILHA_ID": os.environ.get("JAILMAKER_PLANILHA_ID"),
+    "ABA": os.environ.get("JAILMAKER_PLANILHA_ABA"),
+    "CREDENCIAIS": os.environ.get("JAILMAKER_PLANILHA_CREDENCIAIS"),
+    "NOME_MATRIZ": "planilha",
+    "INTERVALO": 30,
+}
+
+# Currículos
+# Um arquivo JSON por curso em DIRETORIO ({"nome": ..., "disciplinas": [...], "prerequisitos": {...}}), identificado
+# pelo nome do arquivo no parâmetro `curso` da grade ideal (CURSO_PADRAO quando omitido). O diretório é verificado a
+# cada INTERVALO_VERIFICACAO segundos e os currículos alterados são recarregados sem reiniciar os workers.
+
+JAILMAKER_CURRICULOS = {
+    "DIRETORIO": BASE_DIR / "jailmaker" / "files" / "curriculos",
+    "CURSO_PADRAO": "ciencia_da_computacao",
+    "INTERVALO_VERIFICACAO": 5,
+}
+
+# Métricas
+# A duração das requisições e das suas etapas (leitura do JSON, construção do modelo, restrições, resolução,
+# leitura do PDF...) é agregada em histogramas expostos em /api/metrics, no formato texto do Prometheus.
+# Com SERVER_TIMING, as etapas de cada requisição também são informadas no cabeçalho Server-Timing da resposta.
+
+JAILMAKER_METRICAS = {
+    "SERVER_TIMING": True,
+}
@@ -0,0 +1,42 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from jailmaker.service.grade_ideal_svc import GeradorGradeIdeal
+
+MATRIZ_PADRAO = Path(__file__).resolve().parents[2] / "files" / "matriz_2024_2.json"
+
+
+class Command(BaseCommand):
+    help = "Compara as formulações de conflito do modelo da grade ideal (restrições e tempo de resolução)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "historico",
+            nargs="?",
+            type=Path,
+            help="Arquivo JSON com o histórico acadêmico (lista de disciplinas ou resposta de /historico-academico).",
+        )
+        parser.add_argument("--matriz", type=Path, default=MATRIZ_PADRAO, help="Arquivo JSON da matriz horária.")
+
+    def handle(self, *args, **options):
+        matriz_horaria = json.loads(options["matriz"].read_text(encoding="utf-8"))
+        historico_academico = []
+        if options["historico"]:
+            historico_academico = json.loads(options["historico"].read_text(encoding="utf-8"))
+            if isinstance(historico_academico, dict):
+                historico_academico = historico_academico["disciplinas"]
+
+        resultados = GeradorGradeIdeal(matriz_horaria, historico_academico).comparar_formulacoes()
+
+        self.stdout.write(
+            f"{'formulação':<18}{'variáveis':>10}{'restrições':>12}{'construção (ms)':>17}"
+            f"{'resolução (ms)':>16}  {'status':<10}{'objetivo':>9}"
+        )
+        for resultado in resultados:
+            self.stdout.write(
+                f"{resultado['formulacao']:<18}{resultado['variaveis']:>10}{resultado['restricoes']:>12}"
+                f"{resultado['tempo_construcao'] * 1000:>17.2f}{resultado['tempo_resolucao'] * 1000:>16.2f}"
+                f"  {resultado['status']:<10}{resultado['valor_objetivo']:>9.0f}"
+            )
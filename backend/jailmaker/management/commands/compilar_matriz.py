@@ -0,0 +1,35 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jailmaker.service.artefato_matriz_svc import compilar_matriz
+
+PLANILHA_PADRAO = Path(__file__).resolve().parents[2] / "files" / "matriz_2024_2.xlsx"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compila a planilha xlsx da matriz horária em um artefato versionado (JSON e arrays .npy mapeáveis em "
+        "memória). A compilação só é refeita quando a planilha muda."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("planilha", nargs="?", type=Path, default=PLANILHA_PADRAO, help="Planilha xlsx da matriz.")
+        parser.add_argument("--nome", help="Nome da matriz (padrão: nome do arquivo sem extensão).")
+        parser.add_argument(
+            "--destino",
+            type=Path,
+            default=settings.JAILMAKER_MATRIZES["DIRETORIO_ARTEFATOS"],
+            help="Diretório raiz dos artefatos.",
+        )
+        parser.add_argument("--forcar", action="store_true", help="Recompila mesmo que a versão já exista.")
+
+    def handle(self, *args, **options):
+        diretorio, compilado = compilar_matriz(
+            options["planilha"], options["destino"], nome=options["nome"], forcar=options["forcar"]
+        )
+        if compilado:
+            self.stdout.write(self.style.SUCCESS(f"Matriz compilada em {diretorio}"))
+        else:
+            self.stdout.write(f"Matriz já compilada em {diretorio}")
@@ -0,0 +1,45 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jailmaker.models import MatrizHoraria
+from jailmaker.service.artefato_matriz_svc import carregar_artefato
+
+MATRIZ_PADRAO = Path(__file__).resolve().parents[2] / "files" / "matriz_2024_2.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa uma matriz horária (arquivo JSON ou artefato compilado) para o banco, onde é consultada pelos filtros "
+        "de /matriz-horaria. A importação só é refeita quando a matriz muda."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("matriz", nargs="?", type=Path, default=MATRIZ_PADRAO, help="Arquivo JSON da matriz.")
+        parser.add_argument("--nome", default="atual", help='Nome da matriz (padrão: "atual", a de /matriz-horaria).')
+        parser.add_argument("--artefato", help="Importa a versão atual do artefato compilado com este nome.")
+        parser.add_argument(
+            "--destino",
+            type=Path,
+            default=settings.JAILMAKER_MATRIZES["DIRETORIO_ARTEFATOS"],
+            help="Diretório raiz dos artefatos.",
+        )
+
+    def handle(self, *args, **options):
+        if options["artefato"]:
+            artefato = carregar_artefato(options["destino"], options["artefato"])
+            importada, nova = MatrizHoraria.objects.importar(
+                artefato.matriz_horaria, artefato.nome, artefato.versao_matriz
+            )
+        else:
+            matriz_horaria = json.loads(options["matriz"].read_text(encoding="utf-8"))
+            importada, nova = MatrizHoraria.objects.importar(matriz_horaria, options["nome"])
+
+        if nova:
+            self.stdout.write(
+                self.style.SUCCESS(f"Matriz {importada} importada com {importada.ofertas.count()} ofertas")
+            )
+        else:
+            self.stdout.write(f"Matriz {importada} já importada")
@@ -0,0 +1,82 @@
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jailmaker.models import MatrizHoraria
+from jailmaker.service.artefato_matriz_svc import carregar_artefato
+from jailmaker.service.sincronizacao_planilha_svc import (
+    ClienteGoogleSheets,
+    ClientePlanilhaLocal,
+    ResultadoSincronizacao,
+    SincronizadorMatriz,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Sincroniza a matriz horária com a planilha do Google Sheets (ou com uma planilha xlsx local) e publica cada "
+        "nova versão como artefato, importando-a também para o banco (ver importar_matriz). Apenas os blocos de "
+        "horário alterados desde a sincronização anterior são convertidos novamente."
+    )
+
+    def add_arguments(self, parser):
+        configuracao = settings.JAILMAKER_PLANILHA
+        parser.add_argument("--planilha-id", default=configuracao["PLANILHA_ID"], help="Identificador da planilha.")
+        parser.add_argument("--aba", default=configuracao["ABA"], help="Título da aba (padrão: a primeira).")
+        parser.add_argument(
+            "--credenciais", type=Path, default=configuracao["CREDENCIAIS"], help="JSON da conta de serviço."
+        )
+        parser.add_argument("--xlsx", type=Path, help="Sincroniza a partir de uma planilha xlsx local.")
+        parser.add_argument("--nome", default=configuracao["NOME_MATRIZ"], help="Nome da matriz publicada.")
+        parser.add_argument(
+            "--destino",
+            type=Path,
+            default=settings.JAILMAKER_MATRIZES["DIRETORIO_ARTEFATOS"],
+            help="Diretório raiz dos artefatos.",
+        )
+        parser.add_argument("--continuo", action="store_true", help="Sincroniza a cada --intervalo segundos.")
+        parser.add_argument(
+            "--intervalo", type=float, default=configuracao["INTERVALO"], help="Intervalo entre sincronizações (s)."
+        )
+        parser.add_argument("--forcar", action="store_true", help="Converte a planilha inteira na primeira vez.")
+
+    def handle(self, *args, **options):
+        if options["xlsx"]:
+            cliente = ClientePlanilhaLocal.de_xlsx(options["xlsx"])
+        elif options["planilha_id"]:
+            cliente = ClienteGoogleSheets(
+                options["planilha_id"], aba=options["aba"], credenciais=options["credenciais"]
+            )
+        else:
+            raise CommandError("Informe --planilha-id (ou JAILMAKER_PLANILHA_ID) ou --xlsx")
+
+        sincronizador = SincronizadorMatriz(cliente, options["destino"], options["nome"])
+        forcar = options["forcar"]
+        while True:
+            try:
+                resultado = sincronizador.sincronizar(forcar=forcar)
+                if resultado.versao is not None:
+                    artefato = carregar_artefato(options["destino"], options["nome"], resultado.versao)
+                    MatrizHoraria.objects.importar(artefato.matriz_horaria, artefato.nome, artefato.versao_matriz)
+                self._relatar(resultado)
+                forcar = False
+            except Exception as exc:
+                if not options["continuo"]:
+                    raise CommandError(f"Falha ao sincronizar a matriz: {exc}") from exc
+                self.stderr.write(f"Falha ao sincronizar a matriz: {exc}")
+            if not options["continuo"]:
+                break
+            time.sleep(options["intervalo"])
+
+    def _relatar(self, resultado: ResultadoSincronizacao) -> None:
+        if resultado.versao is None:
+            self.stdout.write(f"Matriz sem alterações (revisão {resultado.revisao})")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Matriz publicada na versão {resultado.versao} com {resultado.ofertas} ofertas "
+                f"({resultado.blocos_alterados} de {resultado.blocos} blocos convertidos, revisão {resultado.revisao})"
+            )
+        )
@@ -0,0 +1,54 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from jailmaker.service.metricas_svc import METRICAS, coletar_etapas, server_timing
+
+METRICAS.descrever("jailmaker_requisicoes_total", "counter", "Requisições atendidas, por rota, método e status.")
+METRICAS.descrever("jailmaker_requisicao_duracao_segundos", "histogram", "Duração das requisições, por rota e método.")
+
+
+class MetricasMiddleware:
+    """
+    Mede a duração de cada requisição e as etapas registradas durante o seu processamento, agregando-as
+    nas métricas de /api/metrics e, se JAILMAKER_METRICAS["SERVER_TIMING"], informando-as no cabeçalho
+    Server-Timing da resposta. Funciona tanto sob WSGI quanto sob ASGI, sem forçar as views assíncronas
+    a rodarem em threads.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+        self.assincrono = iscoroutinefunction(get_response)
+        if self.assincrono:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.assincrono:
+            return self.__acall__(request)
+        inicio = time.perf_counter()
+        with coletar_etapas() as etapas:
+            resposta = self.get_response(request)
+        return self._registrar(request, resposta, etapas, time.perf_counter() - inicio)
+
+    async def __acall__(self, request):
+        inicio = time.perf_counter()
+        with coletar_etapas() as etapas:
+            resposta = await self.get_response(request)
+        return self._registrar(request, resposta, etapas, time.perf_counter() - inicio)
+
+    def _registrar(self, request, resposta, etapas: list[tuple[str, float]], duracao: float):
+        """Agrega a requisição nas métricas e informa as suas etapas no cabeçalho Server-Timing."""
+        # A rota (com os parâmetros não substituídos) mantém baixa a quantidade de séries.
+        rota = request.resolver_match.route if request.resolver_match else "nao_encontrada"
+        METRICAS.incrementar(
+            "jailmaker_requisicoes_total", rota=rota, metodo=request.method, status=str(resposta.status_code)
+        )
+        METRICAS.observar("jailmaker_requisicao_duracao_segundos", duracao, rota=rota, metodo=request.method)
+
+        if settings.JAILMAKER_METRICAS["SERVER_TIMING"]:
+            resposta["Server-Timing"] = server_timing([*etapas, ("total", duracao)])
+        return resposta
@@ -0,0 +1,86 @@
+# Generated by Django 5.1.2 on 2026-10-18 17:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="MatrizHoraria",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("nome", models.CharField(max_length=100)),
+                ("versao", models.CharField(max_length=64)),
+                ("importada_em", models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(fields=("nome", "versao"), name="matriz_horaria_nome_versao")],
+            },
+        ),
+        migrations.CreateModel(
+            name="Oferta",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("posicao", models.PositiveIntegerField()),
+                ("nome_normalizado", models.CharField(max_length=200)),
+                ("curso", models.CharField(blank=True, max_length=50)),
+                ("termo", models.PositiveSmallIntegerField(null=True)),
+                ("dados", models.JSONField()),
+                (
+                    "matriz",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="ofertas",
+                        to="jailmaker.matrizhoraria",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["posicao"],
+            },
+        ),
+        migrations.CreateModel(
+            name="HorarioOferta",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("dia", models.CharField(max_length=10)),
+                ("inicio", models.PositiveSmallIntegerField()),
+                ("fim", models.PositiveSmallIntegerField()),
+                (
+                    "oferta",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="horarios", to="jailmaker.oferta"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="oferta",
+            index=models.Index(fields=["matriz", "nome_normalizado"], name="oferta_matriz_disciplina"),
+        ),
+        migrations.AddIndex(
+            model_name="oferta",
+            index=models.Index(fields=["matriz", "curso", "termo"], name="oferta_matriz_curso_termo"),
+        ),
+        migrations.AddIndex(
+            model_name="oferta",
+            index=models.Index(fields=["matriz", "termo"], name="oferta_matriz_termo"),
+        ),
+        migrations.AddConstraint(
+            model_name="oferta",
+            constraint=models.UniqueConstraint(fields=("matriz", "posicao"), name="oferta_matriz_posicao"),
+        ),
+        migrations.AddIndex(
+            model_name="horariooferta",
+            index=models.Index(fields=["oferta", "dia", "inicio", "fim"], name="horario_oferta_dia_intervalo"),
+        ),
+        migrations.AddIndex(
+            model_name="horariooferta",
+            index=models.Index(fields=["dia", "inicio", "fim"], name="horario_dia_intervalo"),
+        ),
+    ]
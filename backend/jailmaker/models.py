@@ -0,0 +1,176 @@
+from django.db import models, transaction
+
+from jailmaker.service.disciplinas_svc import normalizar_nome
+from jailmaker.service.indice_horario_svc import horario_para_minutos
+from jailmaker.service.versao_svc import versao_matriz_horaria
+
+
+def _intervalo(horario: str) -> tuple[int, int]:
+    """Converte um horário no formato "HHhMM - HHhMM" no início e no fim em minutos."""
+    inicio, fim = horario.split(" - ")
+    return horario_para_minutos(inicio), horario_para_minutos(fim)
+
+
+class MatrizHorariaQuerySet(models.QuerySet):
+    def importar(
+        self, matriz_horaria: list[dict], nome: str, versao: str | None = None
+    ) -> tuple["MatrizHoraria", bool]:
+        """
+        Importa a matriz horária para o banco, com uma linha por oferta e uma por horário de cada oferta.
+        Cada versão é importada uma única vez por nome, e as versões anteriores com o mesmo nome são mantidas,
+        para que as consultas de processos que ainda servem uma versão anterior continuem respondendo.
+
+        Args:
+            matriz_horaria: Lista de dicionários com as ofertas, no formato da API.
+            nome: Nome da matriz.
+            versao: Versão da matriz, se já conhecida (calculada a partir do conteúdo se omitida).
+
+        Returns:
+            A matriz importada e se ela foi importada agora.
+        """
+        versao = versao or versao_matriz_horaria(matriz_horaria)
+        matriz = self.filter(nome=nome, versao=versao).first()
+        if matriz is not None:
+            return matriz, False
+
+        with transaction.atomic():
+            matriz, importada = self.get_or_create(nome=nome, versao=versao)
+            if not importada:
+                return matriz, False
+
+            ofertas = Oferta.objects.bulk_create(
+                [
+                    Oferta(
+                        matriz=matriz,
+                        posicao=posicao,
+                        nome_normalizado=normalizar_nome(dados["nome"].upper()),
+                        curso=dados.get("curso") or "",
+                        termo=int(dados["termo"]) if str(dados.get("termo") or "").isdigit() else None,
+                        dados=dados,
+                    )
+                    for posicao, dados in enumerate(matriz_horaria)
+                ],
+                batch_size=500,
+            )
+            HorarioOferta.objects.bulk_create(
+                [
+                    HorarioOferta(oferta=oferta, dia=dia.upper(), inicio=inicio, fim=fim)
+                    for oferta in ofertas
+                    for dia, (inicio, fim) in zip(
+                        oferta.dados["dias"], map(_intervalo, oferta.dados["horarios"]), strict=False
+                    )
+                ],
+                batch_size=500,
+            )
+        return matriz, True
+
+
+class MatrizHoraria(models.Model):
+    """
+    Versão de uma matriz horária importada para o banco (ver `manage.py importar_matriz`), identificada
+    pelo nome e pela versão.
+    """
+
+    nome = models.CharField(max_length=100)
+    versao = models.CharField(max_length=64)
+    importada_em = models.DateTimeField(auto_now_add=True)
+
+    objects = MatrizHorariaQuerySet.as_manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["nome", "versao"], name="matriz_horaria_nome_versao")]
+
+    def __str__(self) -> str:
+        return f"{self.nome} ({self.versao})"
+
+
+class OfertaQuerySet(models.QuerySet):
+    def filtrar(
+        self,
+        curso: str | None = None,
+        termo: int | None = None,
+        disciplina: str | None = None,
+        dia: str | None = None,
+        inicio: int | None = None,
+        fim: int | None = None,
+    ) -> "OfertaQuerySet":
+        """
+        Filtra as ofertas pelos critérios informados (os omitidos não filtram). O dia e a janela de horário
+        se aplicam a um mesmo horário da oferta: ela é mantida se algum dos seus horários for no dia informado
+        e estiver inteiramente dentro da janela.
+
+        Args:
+            curso: Curso da oferta, como na matriz (ex.: "BCT-I").
+            termo: Período (termo) da oferta.
+            disciplina: Trecho do nome da disciplina (ex.: "banco" encontra "BANCO DE DADOS"), sem diferenciar
+                maiúsculas e minúsculas.
+            dia: Dia da semana, em maiúsculas (ex.: "TERÇA").
+            inicio: Início da janela de horário, em minutos.
+            fim: Fim da janela de horário, em minutos.
+
+        Returns:
+            As ofertas filtradas.
+        """
+        ofertas = self
+        if curso is not None:
+            ofertas = ofertas.filter(curso=curso)
+        if termo is not None:
+            ofertas = ofertas.filter(termo=termo)
+        if disciplina is not None:
+            ofertas = ofertas.filter(nome_normalizado__contains=normalizar_nome(disciplina.upper()))
+        if dia is not None or inicio is not None or fim is not None:
+            horarios = HorarioOferta.objects.filter(oferta=models.OuterRef("pk"))
+            if dia is not None:
+                horarios = horarios.filter(dia=dia)
+            if inicio is not None:
+                horarios = horarios.filter(inicio__gte=inicio)
+            if fim is not None:
+                horarios = horarios.filter(fim__lte=fim)
+            ofertas = ofertas.filter(models.Exists(horarios))
+        return ofertas
+
+
+class Oferta(models.Model):
+    """
+    Oferta de uma matriz horária importada, identificada pela sua posição na matriz. O dicionário original
+    da oferta é mantido em `dados`, para que as consultas retornem as ofertas no mesmo formato da matriz completa.
+    """
+
+    matriz = models.ForeignKey(MatrizHoraria, on_delete=models.CASCADE, related_name="ofertas")
+    posicao = models.PositiveIntegerField()
+    nome_normalizado = models.CharField(max_length=200)
+    curso = models.CharField(max_length=50, blank=True)
+    termo = models.PositiveSmallIntegerField(null=True)
+    dados = models.JSONField()
+
+    objects = OfertaQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["posicao"]
+        constraints = [models.UniqueConstraint(fields=["matriz", "posicao"], name="oferta_matriz_posicao")]
+        indexes = [
+            models.Index(fields=["matriz", "nome_normalizado"], name="oferta_matriz_disciplina"),
+            models.Index(fields=["matriz", "curso", "termo"], name="oferta_matriz_curso_termo"),
+            models.Index(fields=["matriz", "termo"], name="oferta_matriz_termo"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dados['nome']} ({self.dados.get('turma', self.posicao)})"
+
+
+class HorarioOferta(models.Model):
+    """Horário de uma oferta: o dia da semana e o intervalo, com o início e o fim em minutos."""
+
+    oferta = models.ForeignKey(Oferta, on_delete=models.CASCADE, related_name="horarios")
+    dia = models.CharField(max_length=10)
+    inicio = models.PositiveSmallIntegerField()
+    fim = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["oferta", "dia", "inicio", "fim"], name="horario_oferta_dia_intervalo"),
+            models.Index(fields=["dia", "inicio", "fim"], name="horario_dia_intervalo"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dia} {self.inicio // 60:02d}h{self.inicio % 60:02d} - {self.fim // 60:02d}h{self.fim % 60:02d}"
@@ -0,0 +1,148 @@
+from typing import Any, NotRequired, TypedDict
+
+from pydantic import ConfigDict, TypeAdapter
+
+
+class Oferta(TypedDict):
+    """Oferta de uma disciplina na matriz horária (apenas os campos usados pelo solver são obrigatórios)."""
+
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    nome: str
+    professor: str
+    horarios: list[str]
+    dias: list[str]
+    turma: NotRequired[str]
+    curso: NotRequired[str | None]
+    termo: NotRequired[str | int | None]
+
+
+class DisciplinaHistorico(TypedDict):
+    """Disciplina cursada no histórico acadêmico (os demais campos lidos do PDF são mantidos)."""
+
+    __pydantic_config__ = ConfigDict(extra="allow")
+
+    nome: str
+    situacao: str
+
+
+class RequisicaoGradeIdeal(TypedDict):
+    """Corpo de /grade-ideal e /grade-ideal/alternativas: a matriz (ou `matriz_id`) e o histórico acadêmico."""
+
+    matriz_horaria: NotRequired[list[Oferta]]
+    matriz_id: NotRequired[str | int]
+    historico_academico: list[DisciplinaHistorico]
+
+
+class RequisicaoLote(TypedDict):
+    """Corpo de /grade-ideal/lote: a matriz (ou `matriz_id`) e os históricos acadêmicos dos estudantes."""
+
+    matriz_horaria: NotRequired[list[Oferta]]
+    matriz_id: NotRequired[str | int]
+    historicos_academicos: list[list[DisciplinaHistorico]]
+
+
+class EstatisticasSolver(TypedDict):
+    """Estatísticas de uma resolução do CP-SAT (tempos em segundos)."""
+
+    status: str
+    tempo_parede: float
+    tempo_usuario: float
+    ramificacoes: int
+    conflitos: int
+    valor_objetivo: float | None
+    limite_objetivo: float | None
+
+
+class GradeIdealComEstatisticas(TypedDict):
+    """Resposta de /grade-ideal com `estatisticas=true`."""
+
+    grade: list[Oferta]
+    estatisticas: EstatisticasSolver | None
+    em_cache: bool
+    coalescida: bool
+
+
+class GradeAlternativa(TypedDict):
+    """Uma das grades de /grade-ideal/alternativas, com o seu valor objetivo."""
+
+    grade: list[Oferta]
+    valor_objetivo: int
+
+
+class AlternativasComEstatisticas(TypedDict):
+    """Resposta de /grade-ideal/alternativas com `estatisticas=true`: as estatísticas de cada resolução."""
+
+    alternativas: list[GradeAlternativa]
+    estatisticas: list[EstatisticasSolver]
+
+
+class EdicaoSessao(TypedDict, total=False):
+    """
+    Corpo da edição de uma sessão de simulação: ofertas (pela posição na matriz horária) a fixar, liberar,
+    excluir ou incluir, professores a excluir ou incluir e dias da semana a bloquear ou desbloquear.
+    """
+
+    fixar: list[int]
+    liberar: list[int]
+    excluir: list[int]
+    incluir: list[int]
+    excluir_professores: list[str]
+    incluir_professores: list[str]
+    bloquear_dias: list[str]
+    desbloquear_dias: list[str]
+
+
+class RestricoesSessao(TypedDict):
+    """Restrições acumuladas pelas edições de uma sessão de simulação."""
+
+    fixadas: list[int]
+    excluidas: list[int]
+    professores_excluidos: list[str]
+    dias_bloqueados: list[str]
+
+
+class Sessao(TypedDict):
+    """Estado de uma sessão de simulação: a grade atual (e as posições das suas ofertas na matriz) e as restrições."""
+
+    id: str
+    grade: list[Oferta]
+    indices: list[int]
+    restricoes: RestricoesSessao
+    estatisticas: EstatisticasSolver | None
+    resolucoes: int
+    criada_em: float
+    expira_em: float | None
+
+
+# Os corpos das requisições são decodificados e validados em uma única passagem sobre os bytes (pelo pydantic-core),
+# resultando nos mesmos dicionários e listas consumidos pelos serviços.
+ADAPTADOR_GRADE_IDEAL = TypeAdapter(RequisicaoGradeIdeal)
+ADAPTADOR_LOTE = TypeAdapter(RequisicaoLote)
+ADAPTADOR_EDICAO_SESSAO = TypeAdapter(EdicaoSessao)
+
+
+def corpo_openapi(adaptador: TypeAdapter) -> dict:
+    """
+    Monta o `requestBody` da documentação OpenAPI de uma operação a partir do esquema JSON do adaptador,
+    com as definições internas ($defs) substituídas no local em que são referenciadas.
+
+    Args:
+        adaptador: Adaptador do tipo do corpo da requisição.
+
+    Returns:
+        Dicionário para o `openapi_extra` da operação.
+    """
+    esquema = adaptador.json_schema()
+    definicoes = esquema.pop("$defs", {})
+
+    def expandir(valor: Any) -> Any:
+        if isinstance(valor, dict):
+            if "$ref" in valor:
+                return expandir(definicoes[valor["$ref"].rsplit("/", 1)[-1]])
+            return {chave: expandir(item) for chave, item in valor.items()}
+        if isinstance(valor, list):
+            return [expandir(item) for item in valor]
+        return valor
+
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": expandir(esquema)}}}}
@@ -0,0 +1,45 @@
+from typing import Any
+
+import orjson
+from ninja.parser import Parser
+from ninja.renderers import BaseRenderer
+from ninja.responses import NinjaJSONEncoder
+
+# Opções do orjson nas respostas: chaves não textuais (como no json da biblioteca padrão) e arrays do numpy.
+OPCOES_ORJSON = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+_CODIFICADOR_NINJA = NinjaJSONEncoder()
+
+
+def _converter(valor: Any) -> Any:
+    """Converte os tipos que o orjson não serializa (modelos do pydantic, Decimal etc.) como o codificador do Ninja."""
+    return _CODIFICADOR_NINJA.default(valor)
+
+
+def serializar(dados: Any) -> bytes:
+    """
+    Serializa os dados em JSON (UTF-8, sem espaços) com o orjson.
+
+    Args:
+        dados: Dados a serializar.
+
+    Returns:
+        O JSON codificado em bytes.
+    """
+    return orjson.dumps(dados, default=_converter, option=OPCOES_ORJSON)
+
+
+class ParserOrjson(Parser):
+    """Decodifica os corpos JSON das requisições com o orjson."""
+
+    def parse_body(self, request) -> Any:
+        return orjson.loads(request.body)
+
+
+class RendererOrjson(BaseRenderer):
+    """Serializa as respostas com o orjson, sem a passagem intermediária por `str` do json da biblioteca padrão."""
+
+    media_type = "application/json"
+
+    def render(self, request, data: Any, *, response_status: int) -> bytes:
+        return serializar(data)
@@ -0,0 +1,131 @@
+import asyncio
+import contextvars
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from jailmaker.service.tarefas_svc import FilaCheia
+
+
+class PrazoEsgotado(Exception):
+    """Indica que a execução não terminou dentro do prazo da requisição."""
+
+
+class ControleAdmissao:
+    """
+    Executa funções bloqueantes (resolução da grade ideal, leitura de PDFs) a partir de views assíncronas,
+    em um pool dedicado de threads que limita quantas executam ao mesmo tempo.
+    Requisições além da capacidade do pool e da fila são rejeitadas imediatamente, em vez de acumularem,
+    e cada execução tem um prazo que inclui a espera na fila.
+    """
+
+    def __init__(self, nome: str, max_concorrencia: int, max_fila: int, prazo: float) -> None:
+        """
+        Inicializa o controle.
+
+        Args:
+            nome: Nome do pool (usado no nome das threads e nas métricas).
+            max_concorrencia: Quantidade de funções executadas simultaneamente.
+            max_fila: Quantidade máxima de funções aguardando execução.
+            prazo: Tempo máximo (em segundos) entre a admissão e o fim da execução.
+        """
+        self.nome = nome
+        self.max_concorrencia = max_concorrencia
+        self.max_fila = max_fila
+        self.prazo = prazo
+        self._executor = ThreadPoolExecutor(max_workers=max_concorrencia, thread_name_prefix=f"jailmaker-{nome}")
+        self._lock = threading.Lock()
+        self._em_andamento = 0
+        self.admitidas = 0
+        self.rejeitadas = 0
+        self.prazos_esgotados = 0
+
+    async def executar(self, funcao: Callable[..., Any], *args: Any) -> Any:
+        """
+        Executa `funcao(*args)` no pool, no contexto (variáveis de contexto) da requisição, e aguarda o resultado
+        sem bloquear o event loop.
+
+        Returns:
+            O resultado da função.
+
+        Raises:
+            FilaCheia: Se o pool e a fila estiverem ocupados.
+            PrazoEsgotado: Se a execução não terminar dentro do prazo. Uma função que ainda aguardava na fila
+                é cancelada; uma que já executava roda até o fim, e o seu resultado é descartado.
+        """
+        self._admitir()
+        future = self._executor.submit(contextvars.copy_context().run, funcao, *args)
+        future.add_done_callback(self._finalizar)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.prazo)
+        except TimeoutError:
+            with self._lock:
+                self.prazos_esgotados += 1
+            raise PrazoEsgotado(f"A requisição não foi concluída em {self.prazo:g} segundos") from None
+
+    def reservar(self) -> "Reserva":
+        """
+        Reserva uma vaga do pool para um trabalho executado fora dele (ex.: um lote resolvido no pool de processos),
+        que passa a contar na concorrência e na fila como as funções executadas pelo pool. A vaga fica ocupada
+        até a reserva ser liberada, sem prazo.
+
+        Returns:
+            A reserva, a ser liberada ao fim do trabalho (ou usada como gerenciador de contexto).
+
+        Raises:
+            FilaCheia: Se o pool e a fila estiverem ocupados.
+        """
+        self._admitir()
+        return Reserva(self._finalizar)
+
+    def metricas(self) -> dict[str, int]:
+        """Retorna a ocupação do pool e os contadores de admissões, rejeições e prazos esgotados."""
+        with self._lock:
+            executando = min(self._em_andamento, self.max_concorrencia)
+            return {
+                "max_concorrencia": self.max_concorrencia,
+                "max_fila": self.max_fila,
+                "executando": executando,
+                "aguardando": self._em_andamento - executando,
+                "admitidas": self.admitidas,
+                "rejeitadas": self.rejeitadas,
+                "prazos_esgotados": self.prazos_esgotados,
+            }
+
+    def _admitir(self) -> None:
+        """Ocupa uma vaga do pool ou da fila, rejeitando a execução se ambos estiverem ocupados."""
+        with self._lock:
+            if self._em_andamento >= self.max_concorrencia + self.max_fila:
+                self.rejeitadas += 1
+                raise FilaCheia(f"Servidor sobrecarregado ({self.max_fila} requisições aguardando execução)")
+            self._em_andamento += 1
+            self.admitidas += 1
+
+    def _finalizar(self, _future: Future | None = None) -> None:
+        """Libera a vaga da execução quando ela termina ou é cancelada."""
+        with self._lock:
+            self._em_andamento -= 1
+
+
+class Reserva:
+    """Vaga reservada em um ControleAdmissao (ver `ControleAdmissao.reservar`), liberada uma única vez."""
+
+    def __init__(self, liberar: Callable[[], None]) -> None:
+        self._liberar = liberar
+        self._lock = threading.Lock()
+        self.liberada = False
+
+    def liberar(self) -> None:
+        """Libera a vaga; chamadas seguintes não têm efeito."""
+        with self._lock:
+            if self.liberada:
+                return
+            self.liberada = True
+        self._liberar()
+
+    def __enter__(self) -> "Reserva":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.liberar()
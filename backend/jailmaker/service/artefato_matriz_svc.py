@@ -0,0 +1,268 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from jailmaker.service.curriculos_svc import curriculo_padrao
+from jailmaker.service.indice_horario_svc import IndiceHorario
+from jailmaker.service.matriz_horaria_svc import LeitorMatrizHoraria
+from jailmaker.service.versao_svc import versao_matriz_horaria
+
+# Versão do formato do artefato; artefatos em outro formato são recompilados.
+VERSAO_FORMATO = 1
+
+ARQUIVO_MANIFESTO = "manifesto.json"
+ARQUIVO_MATRIZ = "matriz.json"
+ARQUIVO_ATUAL = "ATUAL"
+ARRAYS = ("ofertas", "dias", "inicios", "fins", "disciplinas")
+
+
+class ArtefatoMatriz:
+    """
+    Matriz horária compilada: o JSON da matriz e a sua forma colunar (intervalos de horário e identificadores
+    das disciplinas de cada oferta), com os arrays mapeados em memória a partir dos arquivos .npy.
+    Processos que carregam o mesmo artefato compartilham as páginas dos arrays.
+    """
+
+    def __init__(self, diretorio: Path) -> None:
+        """
+        Carrega o artefato do diretório informado. O JSON da matriz só é lido no primeiro acesso a `matriz_horaria`.
+
+        Args:
+            diretorio: Diretório da versão compilada.
+        """
+        self.diretorio = Path(diretorio)
+        self.manifesto = json.loads((self.diretorio / ARQUIVO_MANIFESTO).read_text(encoding="utf-8"))
+        self.nome: str = self.manifesto["nome"]
+        self.versao: str = self.manifesto["versao"]
+        self.versao_matriz: str = self.manifesto["versao_matriz"]
+        self.arrays = {nome: np.load(self.diretorio / f"{nome}.npy", mmap_mode="r") for nome in ARRAYS}
+        self._matriz_horaria: list[dict] | None = None
+
+    @property
+    def matriz_horaria(self) -> list[dict]:
+        """Lista de dicionários com as ofertas da matriz, no formato da API."""
+        if self._matriz_horaria is None:
+            self._matriz_horaria = json.loads((self.diretorio / ARQUIVO_MATRIZ).read_text(encoding="utf-8"))
+        return self._matriz_horaria
+
+    def indice_horario(self) -> IndiceHorario:
+        """Retorna o índice de horários de todas as ofertas da matriz, sobre os arrays mapeados em memória."""
+        return IndiceHorario.de_arrays(
+            self.manifesto["num_ofertas"],
+            self.arrays["ofertas"],
+            self.arrays["dias"],
+            self.arrays["inicios"],
+            self.arrays["fins"],
+        )
+
+
+def compilar_matriz(origem: Path, destino: Path, nome: str | None = None, forcar: bool = False) -> tuple[Path, bool]:
+    """
+    Compila uma planilha xlsx da matriz horária em um artefato versionado pelo hash da planilha, em
+    `<destino>/<nome>/<versão>`. A compilação é pulada se a versão já existir no formato atual.
+    Ao final, `<destino>/<nome>/ATUAL` passa a apontar para a versão compilada.
+
+    Args:
+        origem: Caminho da planilha xlsx.
+        destino: Diretório raiz dos artefatos.
+        nome: Nome da matriz (padrão: nome do arquivo de origem sem extensão).
+        forcar: Se verdadeiro, recompila mesmo que a versão já exista, em um novo diretório da versão.
+
+    Returns:
+        O diretório da versão e se ela foi (re)compilada.
+    """
+    origem = Path(origem)
+    nome = nome or origem.stem
+    versao = _hash_arquivo(origem)[:16]
+
+    def escrever(diretorio: Path) -> None:
+        inicio = time.perf_counter()
+        leitor = LeitorMatrizHoraria(str(origem))
+        _escrever_artefato(leitor.para_registros(leitor.ler()), diretorio, nome, versao, origem.name, inicio)
+
+    return _publicar(Path(destino) / nome, versao, escrever, forcar)
+
+
+def publicar_matriz(
+    matriz_horaria: list[dict],
+    destino: Path,
+    nome: str,
+    origem: str,
+    revisao: str | None = None,
+    versao: str | None = None,
+) -> tuple[Path, bool]:
+    """
+    Publica uma matriz horária já convertida (ex.: sincronizada de uma planilha on-line) como artefato versionado
+    pelo conteúdo da matriz, em `<destino>/<nome>/<versão>`, com o mesmo formato e a mesma troca atômica de
+    `compilar_matriz`. A gravação é pulada se a versão já existir no formato atual.
+
+    Args:
+        matriz_horaria: Lista de dicionários com as ofertas, no formato da API.
+        destino: Diretório raiz dos artefatos.
+        nome: Nome da matriz.
+        origem: Descrição da origem da matriz, registrada no manifesto.
+        revisao: Revisão da origem da qual a matriz foi obtida, registrada no manifesto.
+        versao: Versão da matriz, se já conhecida (calculada a partir do conteúdo se omitida).
+
+    Returns:
+        O diretório da versão e se ela foi gravada.
+    """
+    versao = versao or versao_matriz_horaria(matriz_horaria)
+
+    def escrever(diretorio: Path) -> None:
+        _escrever_artefato(matriz_horaria, diretorio, nome, versao, origem, time.perf_counter(), revisao=revisao)
+
+    return _publicar(Path(destino) / nome, versao, escrever)
+
+
+def revisao_publicada(destino: Path, nome: str) -> str | None:
+    """
+    Retorna a revisão da origem registrada no manifesto da versão atual da matriz, ou None se a matriz
+    não tiver sido publicada ou não tiver revisão registrada.
+    """
+    try:
+        return carregar_artefato(destino, nome).manifesto.get("revisao")
+    except (OSError, ValueError):
+        return None
+
+
+def carregar_artefato(destino: Path, nome: str, versao: str | None = None) -> ArtefatoMatriz:
+    """
+    Carrega um artefato compilado.
+
+    Args:
+        destino: Diretório raiz dos artefatos.
+        nome: Nome da matriz.
+        versao: Versão a carregar, pelo nome do seu diretório (padrão: a apontada por ATUAL).
+
+    Returns:
+        O artefato carregado.
+    """
+    diretorio_nome = Path(destino) / nome
+    versao = versao or (diretorio_nome / ARQUIVO_ATUAL).read_text(encoding="utf-8").strip()
+    return ArtefatoMatriz(diretorio_nome / versao)
+
+
+def _publicar(
+    diretorio_nome: Path, versao: str, escrever: Callable[[Path], None], forcar: bool = False
+) -> tuple[Path, bool]:
+    """
+    Grava a versão com `escrever` em um diretório temporário renomeado ao final, se ela ainda não existir
+    (ou se `forcar`), e aponta ATUAL para ela. Leitores nunca veem uma versão incompleta.
+    Um diretório já existente da versão nunca é alterado, pois pode estar em uso (com os arrays mapeados em
+    memória) por outros processos: a nova gravação recebe um diretório próprio, `<versão>-<sufixo>`, e a troca
+    é feita apenas em ATUAL. O diretório substituído permanece no disco.
+    """
+    diretorio_versao = _diretorio_publicado(diretorio_nome, versao)
+    gravado = forcar or not _artefato_valido(diretorio_versao)
+    if gravado:
+        diretorio_nome.mkdir(parents=True, exist_ok=True)
+        temporario = Path(tempfile.mkdtemp(dir=diretorio_nome, prefix=f".{versao}-"))
+        try:
+            temporario.chmod(0o755)
+            escrever(temporario)
+            diretorio_versao = diretorio_nome / versao
+            if diretorio_versao.exists():
+                diretorio_versao = diretorio_nome / temporario.name.removeprefix(".")
+            temporario.rename(diretorio_versao)
+        except BaseException:
+            shutil.rmtree(temporario, ignore_errors=True)
+            raise
+
+    _escrever_atomicamente(diretorio_nome / ARQUIVO_ATUAL, diretorio_versao.name.encode())
+    return diretorio_versao, gravado
+
+
+def _diretorio_publicado(diretorio_nome: Path, versao: str) -> Path:
+    """
+    Retorna o diretório em que a versão está publicada: o apontado por ATUAL, se for uma gravação dessa versão,
+    ou `<versão>`.
+    """
+    try:
+        atual = (diretorio_nome / ARQUIVO_ATUAL).read_text(encoding="utf-8").strip()
+    except OSError:
+        atual = None
+    if atual is not None and atual.startswith(f"{versao}-") and _artefato_valido(diretorio_nome / atual):
+        return diretorio_nome / atual
+    return diretorio_nome / versao
+
+
+def _escrever_artefato(
+    matriz_horaria: list[dict],
+    diretorio: Path,
+    nome: str,
+    versao: str,
+    origem: str,
+    inicio: float,
+    revisao: str | None = None,
+) -> None:
+    """Grava o JSON da matriz, os arrays colunares e o manifesto no diretório informado."""
+    indice = IndiceHorario(matriz_horaria)
+    # Identificadores das disciplinas no currículo padrão (-1 para disciplinas fora dele).
+    curriculo = curriculo_padrao()
+    disciplinas = np.array(
+        [
+            -1 if (identificador := curriculo.id_disciplina(oferta["nome"])) is None else identificador
+            for oferta in matriz_horaria
+        ],
+        dtype=np.int32,
+    )
+
+    (diretorio / ARQUIVO_MATRIZ).write_text(json.dumps(matriz_horaria, ensure_ascii=False, indent=4), encoding="utf-8")
+    for nome_array, array in (
+        ("ofertas", indice.ofertas),
+        ("dias", indice.dias),
+        ("inicios", indice.inicios),
+        ("fins", indice.fins),
+        ("disciplinas", disciplinas),
+    ):
+        np.save(diretorio / f"{nome_array}.npy", array)
+
+    manifesto = {
+        "nome": nome,
+        "versao": versao,
+        "versao_matriz": versao_matriz_horaria(matriz_horaria),
+        "formato": VERSAO_FORMATO,
+        "origem": origem,
+        "revisao": revisao,
+        "compilado_em": time.time(),
+        "tempo_compilacao": time.perf_counter() - inicio,
+        "num_ofertas": len(matriz_horaria),
+        "num_intervalos": len(indice.ofertas),
+    }
+    (diretorio / ARQUIVO_MANIFESTO).write_text(json.dumps(manifesto, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _artefato_valido(diretorio: Path) -> bool:
+    """Verifica se o diretório contém um artefato completo no formato atual."""
+    try:
+        manifesto = json.loads((diretorio / ARQUIVO_MANIFESTO).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    arquivos = [ARQUIVO_MATRIZ, *(f"{nome}.npy" for nome in ARRAYS)]
+    return manifesto.get("formato") == VERSAO_FORMATO and all((diretorio / arquivo).exists() for arquivo in arquivos)
+
+
+def _hash_arquivo(path: Path) -> str:
+    """Calcula o SHA-256 hexadecimal do conteúdo do arquivo."""
+    sha256 = hashlib.sha256()
+    with Path(path).open("rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            sha256.update(bloco)
+    return sha256.hexdigest()
+
+
+def _escrever_atomicamente(path: Path, conteudo: bytes) -> None:
+    """Grava o arquivo por meio de um arquivo temporário renomeado, para que leitores nunca o vejam incompleto."""
+    descritor, temporario = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}-")
+    with os.fdopen(descritor, "wb") as arquivo:
+        arquivo.write(conteudo)
+    Path(temporario).chmod(0o644)
+    Path(temporario).replace(path)
@@ -0,0 +1,343 @@
+import gzip
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import orjson
+
+
+class EntradaArquivoJson(NamedTuple):
+    """
+    Conteúdo de um arquivo JSON mantido em memória, já decodificado, serializado e comprimido.
+    """
+
+    dados: Any
+    corpo: bytes
+    corpo_gzip: bytes
+    etag: str
+    ultima_modificacao: float
+
+
+class CacheArquivoJson:
+    """
+    Mantém em memória o conteúdo de um arquivo JSON para evitar leitura de disco e
+    (de)serialização a cada requisição. A entrada é invalidada quando o mtime ou o
+    hash do conteúdo do arquivo mudam.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Inicializa o cache para o arquivo informado. Nada é lido até a primeira chamada de `obter`.
+
+        Args:
+            path: Caminho do arquivo JSON.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._assinatura: tuple[int, int] | None = None
+        self._entrada: EntradaArquivoJson | None = None
+
+    def obter(self) -> EntradaArquivoJson:
+        """
+        Retorna a entrada atual do cache, recarregando o arquivo somente se ele tiver sido alterado.
+
+        Returns:
+            Entrada com os dados decodificados, o corpo serializado, o corpo comprimido e o ETag.
+        """
+        stat = self.path.stat()
+        assinatura = (stat.st_mtime_ns, stat.st_size)
+        entrada = self._entrada
+        if entrada is not None and assinatura == self._assinatura:
+            return entrada
+
+        with self._lock:
+            if self._entrada is not None and assinatura == self._assinatura:
+                return self._entrada
+
+            conteudo = self.path.read_bytes()
+            etag = f'"{hashlib.sha256(conteudo).hexdigest()[:32]}"'
+            if self._entrada is not None and self._entrada.etag == etag:
+                # Apenas o mtime mudou (ex.: `touch`); o conteúdo já está em memória.
+                self._entrada = self._entrada._replace(ultima_modificacao=stat.st_mtime)
+            else:
+                dados = orjson.loads(conteudo)
+                corpo = orjson.dumps(dados)
+                self._entrada = EntradaArquivoJson(
+                    dados=dados,
+                    corpo=corpo,
+                    corpo_gzip=gzip.compress(corpo, compresslevel=9, mtime=0),
+                    etag=etag,
+                    ultima_modificacao=stat.st_mtime,
+                )
+            self._assinatura = assinatura
+            return self._entrada
+
+
+class CacheLRU:
+    """
+    Cache em memória limitado por quantidade de itens, com descarte do item usado há mais tempo (LRU)
+    e expiração opcional por tempo de vida (TTL). Seguro para uso entre threads.
+    """
+
+    def __init__(
+        self,
+        tamanho_maximo: int,
+        ttl: float | None = None,
+        ao_descartar: Callable[[Hashable, Any], None] | None = None,
+    ) -> None:
+        """
+        Inicializa o cache.
+
+        Args:
+            tamanho_maximo: Quantidade máxima de itens mantidos.
+            ttl: Tempo de vida de cada item em segundos (None para não expirar).
+            ao_descartar: Função chamada com a chave e o valor de cada item descartado por falta de espaço
+                (ex.: para remover um arquivo associado ao item), fora do lock do cache.
+        """
+        self.tamanho_maximo = tamanho_maximo
+        self.ttl = ttl
+        self.ao_descartar = ao_descartar
+        self._lock = threading.Lock()
+        self._itens: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartados = 0
+        self.expirados = 0
+
+    def obter(self, chave: Hashable) -> Any | None:
+        """
+        Retorna o valor armazenado para a chave, ou None se ele não existir ou tiver expirado.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None and item[0] is not None and item[0] <= time.monotonic():
+                del self._itens[chave]
+                self.expirados += 1
+                item = None
+
+            if item is None:
+                self.falhas += 1
+                return None
+
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[1]
+
+    def armazenar(self, chave: Hashable, valor: Any) -> None:
+        """
+        Armazena o valor para a chave, descartando os itens usados há mais tempo se o cache estiver cheio.
+        """
+        expira_em = time.monotonic() + self.ttl if self.ttl is not None else None
+        descartados = []
+        with self._lock:
+            self._itens[chave] = (expira_em, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                chave_descartada, (_, valor_descartado) = self._itens.popitem(last=False)
+                descartados.append((chave_descartada, valor_descartado))
+                self.descartados += 1
+
+        if self.ao_descartar is not None:
+            for chave_descartada, valor_descartado in descartados:
+                self.ao_descartar(chave_descartada, valor_descartado)
+
+    def remover(self, chave: Hashable) -> bool:
+        """Remove o item da chave, retornando se ele existia."""
+        with self._lock:
+            return self._itens.pop(chave, None) is not None
+
+    def limpar(self) -> None:
+        """Remove todos os itens do cache, mantendo os contadores."""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> dict[str, int | float | None]:
+        """Retorna a ocupação do cache e os contadores de acertos, falhas, descartes e expirações."""
+        with self._lock:
+            return {
+                "itens": len(self._itens),
+                "tamanho_maximo": self.tamanho_maximo,
+                "ttl": self.ttl,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "descartados": self.descartados,
+                "expirados": self.expirados,
+            }
+
+
+class CacheDjango:
+    """
+    Adapta um cache do framework de cache do Django (ex.: `caches["default"]`) à interface de CacheLRU,
+    permitindo compartilhar os itens entre processos. Os contadores são mantidos localmente.
+    """
+
+    def __init__(self, cache: Any, ttl: float | None = None, prefixo: str = "jailmaker") -> None:
+        """
+        Inicializa o adaptador.
+
+        Args:
+            cache: Instância de cache do Django.
+            ttl: Tempo de vida de cada item em segundos (None para não expirar).
+            prefixo: Prefixo aplicado às chaves no cache do Django.
+        """
+        self.cache = cache
+        self.ttl = ttl
+        self.prefixo = prefixo
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable) -> Any | None:
+        """Retorna o valor armazenado para a chave, ou None se ele não existir ou tiver expirado."""
+        valor = self.cache.get(f"{self.prefixo}:{chave}")
+        with self._lock:
+            if valor is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+        return valor
+
+    def armazenar(self, chave: Hashable, valor: Any) -> None:
+        """Armazena o valor para a chave com o TTL configurado."""
+        self.cache.set(f"{self.prefixo}:{chave}", valor, timeout=self.ttl)
+
+    def limpar(self) -> None:
+        """
+        Remove todos os itens do cache do Django, mantendo os contadores. O cache inteiro é esvaziado,
+        não apenas as chaves com o prefixo: o alias usado deve ser dedicado a este adaptador.
+        """
+        self.cache.clear()
+
+    def estatisticas(self) -> dict[str, int | float | None]:
+        """Retorna os contadores locais de acertos e falhas."""
+        with self._lock:
+            return {"ttl": self.ttl, "acertos": self.acertos, "falhas": self.falhas}
+
+
+class CacheDisco:
+    """
+    Cache de valores serializáveis em JSON mantido em um diretório, um arquivo por chave,
+    limitado pelo tamanho total em bytes. Ao exceder o limite, descarta os arquivos acessados há mais tempo.
+    """
+
+    def __init__(self, diretorio: Path, tamanho_maximo_bytes: int) -> None:
+        """
+        Inicializa o cache, criando o diretório se necessário.
+
+        Args:
+            diretorio: Diretório onde os arquivos do cache são mantidos.
+            tamanho_maximo_bytes: Tamanho total máximo dos arquivos do cache.
+        """
+        self.diretorio = Path(diretorio)
+        self.diretorio.mkdir(parents=True, exist_ok=True)
+        self.tamanho_maximo_bytes = tamanho_maximo_bytes
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.descartados = 0
+
+    def obter(self, chave: str) -> Any | None:
+        """Retorna o valor armazenado para a chave, ou None se ele não existir."""
+        path = self._path(chave)
+        try:
+            valor = orjson.loads(path.read_bytes())
+            os.utime(path)
+        except (OSError, ValueError):
+            valor = None
+
+        with self._lock:
+            if valor is None:
+                self.falhas += 1
+            else:
+                self.acertos += 1
+        return valor
+
+    def armazenar(self, chave: str, valor: Any) -> None:
+        """Armazena o valor para a chave e descarta os arquivos mais antigos se o limite for excedido."""
+        conteudo = orjson.dumps(valor)
+        descritor, temporario = tempfile.mkstemp(dir=self.diretorio, suffix=".tmp")
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(conteudo)
+        Path(temporario).replace(self._path(chave))
+        self._descartar_excedente()
+
+    def limpar(self) -> None:
+        """Remove todos os arquivos do cache, mantendo os contadores."""
+        with self._lock:
+            for arquivo in self.diretorio.glob("*.json"):
+                arquivo.unlink(missing_ok=True)
+
+    def estatisticas(self) -> dict[str, int]:
+        """Retorna a ocupação do diretório e os contadores de acertos, falhas e descartes."""
+        arquivos = list(self.diretorio.glob("*.json"))
+        with self._lock:
+            return {
+                "itens": len(arquivos),
+                "bytes": sum(arquivo.stat().st_size for arquivo in arquivos),
+                "tamanho_maximo_bytes": self.tamanho_maximo_bytes,
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "descartados": self.descartados,
+            }
+
+    def _path(self, chave: str) -> Path:
+        return self.diretorio / f"{chave}.json"
+
+    def _descartar_excedente(self) -> None:
+        """Remove os arquivos com acesso mais antigo até que o total caiba no limite."""
+        with self._lock:
+            arquivos = []
+            for arquivo in self.diretorio.glob("*.json"):
+                try:
+                    stat = arquivo.stat()
+                except OSError:
+                    continue
+                arquivos.append((stat.st_mtime, stat.st_size, arquivo))
+
+            total = sum(tamanho for _mtime, tamanho, _arquivo in arquivos)
+            for _mtime, tamanho, arquivo in sorted(arquivos, key=lambda item: item[0]):
+                if total <= self.tamanho_maximo_bytes:
+                    break
+                arquivo.unlink(missing_ok=True)
+                total -= tamanho
+                self.descartados += 1
+
+
+class CacheEmCamadas:
+    """
+    Combina caches em camadas (ex.: memória e disco): a leitura consulta as camadas em ordem e promove
+    o valor encontrado para as camadas anteriores; a escrita é feita em todas as camadas.
+    """
+
+    def __init__(self, *camadas: Any) -> None:
+        self.camadas = camadas
+
+    def obter(self, chave: Hashable) -> Any | None:
+        """Retorna o valor da primeira camada que o possuir, ou None se nenhuma o possuir."""
+        for posicao, camada in enumerate(self.camadas):
+            valor = camada.obter(chave)
+            if valor is not None:
+                for anterior in self.camadas[:posicao]:
+                    anterior.armazenar(chave, valor)
+                return valor
+        return None
+
+    def armazenar(self, chave: Hashable, valor: Any) -> None:
+        """Armazena o valor em todas as camadas."""
+        for camada in self.camadas:
+            camada.armazenar(chave, valor)
+
+    def limpar(self) -> None:
+        """Remove todos os itens de todas as camadas."""
+        for camada in self.camadas:
+            camada.limpar()
+
+    def estatisticas(self) -> list[dict]:
+        """Retorna as estatísticas de cada camada, em ordem."""
+        return [camada.estatisticas() for camada in self.camadas]
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+from collections.abc import Awaitable, Callable
+from concurrent.futures import Future
+from typing import Any
+
+
+class Coalescedor:
+    """
+    Camada "single-flight": enquanto uma execução para uma chave está em andamento, as chamadas com a mesma chave
+    aguardam o resultado dela em vez de iniciarem a sua própria. A execução é compartilhada apenas enquanto está
+    em andamento; chamadas posteriores iniciam uma nova (resultados duradouros ficam a cargo dos caches).
+    Funciona entre event loops diferentes (uma future do `concurrent.futures` é compartilhada entre eles).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._em_andamento: dict[str, Future] = {}
+        self.executadas = 0
+        self.coalescidas = 0
+
+    async def executar(self, chave: str, funcao: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Executa `funcao()`, ou aguarda a execução já em andamento para a mesma chave.
+        Erros da execução são repassados a todas as chamadas que a aguardavam.
+
+        Args:
+            chave: Chave que identifica chamadas equivalentes.
+            funcao: Função assíncrona que produz o resultado.
+
+        Returns:
+            O resultado e se ele veio de uma execução iniciada por outra chamada.
+        """
+        with self._lock:
+            future = self._em_andamento.get(chave)
+            coalescida = future is not None
+            if coalescida:
+                self.coalescidas += 1
+            else:
+                future = self._em_andamento[chave] = Future()
+                self.executadas += 1
+
+        if coalescida:
+            # O shield evita que o cancelamento de uma chamada que aguarda cancele a future compartilhada.
+            return await asyncio.shield(asyncio.wrap_future(future)), True
+
+        try:
+            resultado = await funcao()
+        except BaseException as exc:
+            future.set_exception(exc if isinstance(exc, Exception) else RuntimeError("A execução foi cancelada"))
+            raise
+        else:
+            future.set_result(resultado)
+            return resultado, False
+        finally:
+            with self._lock:
+                del self._em_andamento[chave]
+
+    def estatisticas(self) -> dict[str, int]:
+        """Retorna a quantidade de execuções em andamento e os contadores de execuções e chamadas coalescidas."""
+        with self._lock:
+            return {
+                "em_andamento": len(self._em_andamento),
+                "executadas": self.executadas,
+                "coalescidas": self.coalescidas,
+            }
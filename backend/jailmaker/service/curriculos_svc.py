@@ -0,0 +1,211 @@
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from jailmaker.service.disciplinas_svc import normalizar_nome
+from jailmaker.service.prerequisitos_svc import GrafoPrerequisitos
+
+# Currículos distribuídos com o projeto, um arquivo JSON por curso.
+DIRETORIO_CURRICULOS = Path(__file__).resolve().parent.parent / "files" / "curriculos"
+CURSO_PADRAO = "ciencia_da_computacao"
+
+
+class CurriculoNaoEncontrado(Exception):
+    """Indica que o curso informado não corresponde a nenhum currículo registrado."""
+
+
+class Curriculo:
+    """
+    Currículo de um curso, com as estruturas de consulta usadas pela grade ideal pré-calculadas na construção:
+    o identificador inteiro de cada disciplina (do currículo e dos pré-requisitos), o conjunto de disciplinas
+    do currículo, as máscaras de bits dos pré-requisitos e o grafo de pré-requisitos com os pesos de cada critério.
+    Os identificadores são atribuídos em ordem alfabética, para que sejam estáveis entre processos.
+    """
+
+    def __init__(self, curso: str, nome: str, disciplinas: list[str], prerequisitos: dict[str, list[str]]) -> None:
+        """
+        Constrói o currículo.
+
+        Args:
+            curso: Identificador do curso (nome do arquivo do currículo).
+            nome: Nome do curso.
+            disciplinas: Nomes das disciplinas do currículo.
+            prerequisitos: Pré-requisitos diretos de cada disciplina.
+
+        Raises:
+            ValueError: Se houver um ciclo de pré-requisitos.
+        """
+        self.curso = curso
+        self.nome = nome
+        self.disciplinas = list(disciplinas)
+        self.prerequisitos = {disciplina: list(prereqs) for disciplina, prereqs in prerequisitos.items()}
+        conteudo = json.dumps([sorted(disciplinas), prerequisitos], sort_keys=True, ensure_ascii=False)
+        self.versao = hashlib.sha256(conteudo.encode("utf-8")).hexdigest()[:16]
+
+        nomes = set(disciplinas) | set(prerequisitos)
+        for prereqs in prerequisitos.values():
+            nomes.update(prereqs)
+        # Identificador inteiro de cada disciplina conhecida (currículo e pré-requisitos), pelo nome normalizado.
+        self.ids = {nome: identificador for identificador, nome in enumerate(sorted(map(normalizar_nome, nomes)))}
+        self.nomes = tuple(self.ids)
+        self.ids_curriculo = frozenset(self.ids[normalizar_nome(nome)] for nome in disciplinas)
+
+        # Máscara de bits dos pré-requisitos diretos de cada disciplina, indexada pelo identificador.
+        self.mascaras_prerequisitos = tuple(
+            sum(1 << self.ids[normalizar_nome(prereq)] for prereq in set(prerequisitos.get(nome, ())))
+            for nome in self.nomes
+        )
+        # Quantidade de disciplinas das quais cada disciplina é pré-requisito direto, indexada pelo identificador.
+        self.frequencias_prerequisito = tuple(
+            sum(prereqs.count(nome) for prereqs in prerequisitos.values()) for nome in self.nomes
+        )
+        self.grafo = GrafoPrerequisitos(self.mascaras_prerequisitos, self.frequencias_prerequisito, self.nomes)
+
+    @classmethod
+    def de_arquivo(cls, path: Path) -> "Curriculo":
+        """
+        Carrega o currículo de um arquivo JSON com as chaves "nome", "disciplinas" e "prerequisitos".
+        O identificador do curso é o nome do arquivo sem extensão.
+        """
+        path = Path(path)
+        dados = json.loads(path.read_text(encoding="utf-8"))
+        return cls(path.stem, dados["nome"], dados["disciplinas"], dados.get("prerequisitos", {}))
+
+    def para_arquivo(self, path: Path) -> None:
+        """
+        Grava o currículo no formato lido por `de_arquivo`, por meio de um arquivo temporário renomeado.
+        O identificador do curso é o nome do arquivo, que deve ser `<curso>.json`.
+        """
+        path = Path(path)
+        temporario = path.with_name(f".{path.name}.tmp")
+        dados = {"nome": self.nome, "disciplinas": self.disciplinas, "prerequisitos": self.prerequisitos}
+        temporario.write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+        temporario.replace(path)
+
+    def id_disciplina(self, nome: str) -> int | None:
+        """
+        Retorna o identificador inteiro da disciplina, ou None se ela não pertencer ao currículo nem for pré-requisito.
+
+        Args:
+            nome: Nome da disciplina, normalizado ou não.
+        """
+        return self.ids.get(normalizar_nome(nome))
+
+    def pesos(self, criterio: str = "diretos") -> tuple[int, ...]:
+        """Retorna o peso de cada disciplina no objetivo da grade ideal (ver `GrafoPrerequisitos.pesos`)."""
+        return self.grafo.pesos(criterio)
+
+    def para_dict(self) -> dict[str, str | int]:
+        """Resume o currículo: curso, nome, versão e quantidade de disciplinas."""
+        return {
+            "curso": self.curso,
+            "nome": self.nome,
+            "versao": self.versao,
+            "disciplinas": len(self.ids_curriculo),
+        }
+
+
+@lru_cache(maxsize=1)
+def curriculo_padrao() -> Curriculo:
+    """Retorna o currículo do curso padrão distribuído com o projeto, carregado uma única vez por processo."""
+    return Curriculo.de_arquivo(DIRETORIO_CURRICULOS / f"{CURSO_PADRAO}.json")
+
+
+class RegistroCurriculos:
+    """
+    Registro dos currículos dos cursos, carregados de um diretório com um arquivo JSON por curso.
+    O diretório é verificado a cada `intervalo_verificacao` segundos: currículos novos ou alterados são
+    construídos sem bloquear as consultas e o conjunto de currículos é substituído de uma só vez, de modo que
+    as requisições em andamento continuam com os currículos que já obtiveram e nenhum worker precisa ser reiniciado.
+    Um arquivo inválido não derruba o currículo anterior do mesmo curso; o erro fica disponível em `erros`.
+    """
+
+    def __init__(self, diretorio: Path, curso_padrao: str = CURSO_PADRAO, intervalo_verificacao: float = 5.0) -> None:
+        """
+        Inicializa o registro, carregando os currículos do diretório.
+
+        Args:
+            diretorio: Diretório com os arquivos JSON dos currículos.
+            curso_padrao: Curso usado quando a requisição não informa um.
+            intervalo_verificacao: Intervalo mínimo (em segundos) entre verificações do diretório.
+        """
+        self.diretorio = Path(diretorio)
+        self.curso_padrao = curso_padrao
+        self.intervalo_verificacao = intervalo_verificacao
+        self.erros: dict[str, str] = {}
+        self.recargas = 0
+        self._lock = threading.Lock()
+        self._curriculos: dict[str, Curriculo] = {}
+        self._assinaturas: dict[str, tuple[int, int]] = {}
+        self._verificado_em = float("-inf")
+        self.recarregar()
+
+    def obter(self, curso: str | None = None) -> Curriculo:
+        """
+        Retorna o currículo do curso informado (ou do curso padrão), recarregando o diretório se o intervalo
+        de verificação tiver passado.
+
+        Raises:
+            CurriculoNaoEncontrado: Se não houver currículo para o curso.
+        """
+        if time.monotonic() - self._verificado_em >= self.intervalo_verificacao:
+            self.recarregar()
+        curso = curso or self.curso_padrao
+        curriculo = self._curriculos.get(curso)
+        if curriculo is None:
+            raise CurriculoNaoEncontrado(f"Currículo não encontrado: {curso}")
+        return curriculo
+
+    def recarregar(self) -> list[str]:
+        """
+        Verifica o diretório e reconstrói os currículos cujos arquivos foram criados ou alterados
+        (pela data de modificação e pelo tamanho). Currículos cujos arquivos foram removidos deixam o registro.
+        Se outra thread já estiver recarregando, retorna sem esperar.
+
+        Returns:
+            Os cursos (re)carregados.
+        """
+        if not self._lock.acquire(blocking=False):
+            return []
+        try:
+            self._verificado_em = time.monotonic()
+            curriculos: dict[str, Curriculo] = {}
+            assinaturas: dict[str, tuple[int, int]] = {}
+            recarregados = []
+            for path in sorted(self.diretorio.glob("*.json")):
+                curso = path.stem
+                estado = path.stat()
+                assinaturas[curso] = (estado.st_mtime_ns, estado.st_size)
+                if curso in self._curriculos and self._assinaturas.get(curso) == assinaturas[curso]:
+                    curriculos[curso] = self._curriculos[curso]
+                    continue
+                try:
+                    curriculos[curso] = Curriculo.de_arquivo(path)
+                except Exception as exc:
+                    self.erros[curso] = str(exc)
+                    if curso in self._curriculos:
+                        curriculos[curso] = self._curriculos[curso]
+                    continue
+                self.erros.pop(curso, None)
+                recarregados.append(curso)
+
+            self._curriculos, self._assinaturas = curriculos, assinaturas
+            self.erros = {curso: erro for curso, erro in self.erros.items() if curso in assinaturas}
+            self.recargas += bool(recarregados)
+            return recarregados
+        finally:
+            self._lock.release()
+
+    def listar(self) -> list[dict]:
+        """Lista os currículos registrados e os arquivos inválidos, com o erro da última carga."""
+        registrados = [
+            {**curriculo.para_dict(), "padrao": curso == self.curso_padrao, "erro": self.erros.get(curso)}
+            for curso, curriculo in self._curriculos.items()
+        ]
+        invalidos = [
+            {"curso": curso, "erro": erro} for curso, erro in self.erros.items() if curso not in self._curriculos
+        ]
+        return registrados + invalidos
@@ -0,0 +1,89 @@
+import re
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from jailmaker.service.curriculos_svc import Curriculo
+
+PADRAO_REOF = re.compile(r"\s*\(\s*REOF\s*\)", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def normalizar_nome(nome: str) -> str:
+    """
+    Remove sufixos indesejados, como as variações de "(REOF)", do nome da disciplina.
+    O resultado é memorizado, já que os mesmos nomes se repetem entre ofertas e requisições.
+
+    Args:
+        nome: Nome original da disciplina.
+
+    Returns:
+        Nome normalizado.
+    """
+    # Remove qualquer ocorrência de "(REOF)" com possíveis espaços antes ou depois.
+    return PADRAO_REOF.sub("", nome).strip()
+
+
+class Oferta:
+    """
+    Registro compacto de uma oferta da matriz horária usada no modelo da grade ideal.
+
+    Attributes:
+        indice: Posição da oferta na matriz horária.
+        disciplina: Identificador inteiro da disciplina.
+        dados: Dicionário original da oferta, devolvido na grade.
+    """
+
+    __slots__ = ("indice", "disciplina", "dados")
+
+    def __init__(self, indice: int, disciplina: int, dados: dict) -> None:
+        self.indice = indice
+        self.disciplina = disciplina
+        self.dados = dados
+
+
+class SituacaoEstudante:
+    """
+    Disciplinas concluídas e indisponíveis (concluídas ou em andamento) de um estudante, como máscaras de bits
+    sobre os identificadores das disciplinas de um currículo.
+    """
+
+    __slots__ = ("curriculo", "feitas", "indisponiveis")
+
+    def __init__(self, historico_academico: list[dict], curriculo: "Curriculo") -> None:
+        """
+        Processa o histórico acadêmico. Disciplinas fora do currículo e dos pré-requisitos são ignoradas,
+        pois não afetam a elegibilidade de nenhuma oferta.
+
+        Args:
+            historico_academico: Lista de dicionários com as chaves "nome" e "situacao".
+            curriculo: Currículo do curso do estudante.
+        """
+        self.curriculo = curriculo
+        self.feitas = 0
+        self.indisponiveis = 0
+        for disciplina in historico_academico:
+            identificador = curriculo.id_disciplina(disciplina["nome"])
+            if identificador is None:
+                continue
+            if disciplina["situacao"] == "APROVADO":
+                self.feitas |= 1 << identificador
+                self.indisponiveis |= 1 << identificador
+            elif disciplina["situacao"] == "EM CURSO":
+                self.indisponiveis |= 1 << identificador
+
+    def elegivel(self, disciplina: int) -> bool:
+        """
+        Verifica se uma disciplina pode ser escolhida: não foi concluída nem está em andamento
+        e todos os seus pré-requisitos foram cumpridos.
+
+        Args:
+            disciplina: Identificador inteiro da disciplina.
+        """
+        if self.indisponiveis >> disciplina & 1:
+            return False
+        return self.curriculo.mascaras_prerequisitos[disciplina] & ~self.feitas == 0
+
+    def elegibilidade(self) -> list[bool]:
+        """Calcula a elegibilidade de todas as disciplinas conhecidas do currículo, indexada pelo identificador."""
+        return [self.elegivel(disciplina) for disciplina in range(len(self.curriculo.nomes))]
@@ -0,0 +1,319 @@
+import asyncio
+import atexit
+import multiprocessing
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any
+
+from ortools.sat.python import cp_model
+
+from jailmaker.service.artefato_matriz_svc import carregar_artefato, publicar_matriz
+from jailmaker.service.cache_svc import CacheLRU
+from jailmaker.service.curriculos_svc import Curriculo
+from jailmaker.service.grade_ideal_svc import GeradorGradeIdeal, ParametrosSolver
+from jailmaker.service.indice_horario_svc import IndiceHorario
+from jailmaker.service.versao_svc import versao_matriz_horaria
+
+# Nome com que as matrizes dos lotes são publicadas como artefatos para os processos do pool.
+NOME_MATRIZ_LOTE = "lote"
+# Subdiretório em que os currículos dos lotes são publicados, em `<versão>/<curso>.json`.
+DIRETORIO_CURRICULOS_LOTE = "curriculos"
+
+_executor: ProcessPoolExecutor | None = None
+_max_workers_executor: int | None = None
+_lock_executor = threading.Lock()
+
+# Quantidade de versões de matriz mantidas publicadas para os processos do pool.
+MAX_MATRIZES_PUBLICADAS = 8
+
+# Diretório temporário com as matrizes publicadas para os processos do pool, as versões publicadas (as usadas
+# há mais tempo são removidas do disco), quantos lotes usam cada versão e as versões descartadas ainda em uso,
+# removidas quando o último lote que as usa termina.
+_diretorio_matrizes: Path | None = None
+_matrizes_em_uso: Counter[str] = Counter()
+_matrizes_descartadas: set[str] = set()
+# Versões de currículo publicadas (só mudam quando um arquivo de currículo é alterado; cada uma ocupa poucos KB).
+_curriculos_publicados: set[str] = set()
+_lock_matrizes = threading.Lock()
+
+# Matrizes carregadas em cada processo do pool, pela versão: a lista de ofertas e o índice de horários.
+_matrizes_worker = CacheLRU(4)
+# Currículos carregados em cada processo do pool, pelo curso e pela versão.
+_curriculos_worker = CacheLRU(4)
+
+
+def obter_executor(max_workers: int) -> ProcessPoolExecutor:
+    """
+    Retorna o pool de processos compartilhado para resoluções em lote, criando-o na primeira chamada.
+    Os processos são iniciados com "spawn" (o ortools mantém threads próprias, o que torna o fork inseguro)
+    e já carregam o ortools ao iniciar.
+
+    Args:
+        max_workers: Quantidade de processos do pool (usada apenas na criação).
+
+    Returns:
+        O pool de processos.
+    """
+    global _executor, _max_workers_executor
+    with _lock_executor:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_inicializar_worker,
+            )
+            _max_workers_executor = max_workers
+        return _executor
+
+
+def _substituir_executor(quebrado: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """
+    Descarta um pool quebrado (um processo morreu, ex.: por falta de memória, e o pool passou a rejeitar
+    submissões com BrokenProcessPool) e retorna um novo pool compartilhado, com a mesma quantidade de processos.
+    Se outro lote já tiver substituído o pool, retorna o que o substituiu.
+    """
+    global _executor
+    with _lock_executor:
+        if _executor is quebrado:
+            _executor = None
+    quebrado.shutdown(wait=False, cancel_futures=True)
+    return obter_executor(_max_workers_executor)
+
+
+async def resolver_em_lote(
+    matriz_horaria: list[dict],
+    historicos_academicos: list[list[dict]],
+    parametros_solver: ParametrosSolver,
+    executor: ProcessPoolExecutor,
+    cache: Any | None = None,
+    versao_matriz: str | None = None,
+    curriculo: Curriculo | None = None,
+    indice_horario: IndiceHorario | None = None,
+) -> AsyncIterator[dict]:
+    """
+    Gera a grade ideal de vários estudantes para a mesma matriz horária, distribuindo as resoluções
+    entre os processos do pool e produzindo os resultados na ordem em que ficam prontos.
+    Estudantes com o mesmo conjunto de ofertas elegíveis são resolvidos uma única vez, e grades
+    já presentes no cache são retornadas imediatamente.
+
+    A matriz e o currículo não são enviados a cada resolução: eles são publicados uma única vez em um diretório
+    temporário, que cada processo do pool carrega (a matriz com o índice de horários mapeado em memória)
+    na primeira resolução da versão. As chaves são calculadas à medida que os históricos são percorridos,
+    e cada resolução é submetida assim que a sua chave é conhecida, enquanto as já concluídas são produzidas.
+
+    O gerador é assíncrono: as resoluções são aguardadas sem bloquear o event loop, e o cálculo das chaves
+    e o acesso ao cache rodam em threads. Se a iteração for interrompida (ex.: a tarefa da resposta foi
+    cancelada porque o cliente desconectou), as resoluções que ainda não começaram são canceladas.
+    Se um processo do pool morrer, as resoluções em andamento nele produzem erro e o pool é substituído
+    por um novo, que recebe as resoluções seguintes.
+
+    Args:
+        matriz_horaria: Lista de dicionários contendo as disciplinas disponíveis.
+        historicos_academicos: Lista com o histórico acadêmico de cada estudante.
+        parametros_solver: Parâmetros do solver CP-SAT.
+        executor: Pool de processos que executa as resoluções.
+        cache: Cache de grades ideais (interface de CacheLRU), consultado e alimentado com grades ótimas.
+        versao_matriz: Versão da matriz horária, se já conhecida (calculada uma única vez se omitida).
+        curriculo: Currículo do curso dos estudantes (o currículo padrão se omitido).
+        indice_horario: Índice de horários das ofertas, se já calculado (usado no cálculo das chaves).
+
+    Yields:
+        Dicionários com o índice do histórico e a grade ideal, ou com o índice e a mensagem de erro.
+    """
+    versao_matriz = versao_matriz or await asyncio.to_thread(versao_matriz_horaria, matriz_horaria)
+    diretorio = await asyncio.to_thread(_publicar_para_workers, matriz_horaria, versao_matriz, curriculo)
+    versao_curriculo = (curriculo.curso, curriculo.versao) if curriculo is not None else None
+    pendentes: dict[str, list[int]] = {}
+    resolvidas: dict[str, list[dict]] = {}
+    futures: dict[asyncio.Future, str] = {}
+    try:
+        for indice, historico_academico in enumerate(historicos_academicos):
+            try:
+                chave = await asyncio.to_thread(
+                    _chave_canonica, matriz_horaria, historico_academico, versao_matriz, indice_horario, curriculo
+                )
+            except Exception as exc:
+                yield {"indice": indice, "erro": str(exc)}
+                continue
+
+            if chave in resolvidas:
+                yield {"indice": indice, "grade": resolvidas[chave]}
+            elif chave in pendentes:
+                pendentes[chave].append(indice)
+            else:
+                em_cache = await asyncio.to_thread(cache.obter, chave) if cache is not None else None
+                if em_cache is not None:
+                    resolvidas[chave] = em_cache[0]
+                    yield {"indice": indice, "grade": em_cache[0]}
+                else:
+                    pendentes[chave] = [indice]
+                    argumentos = (diretorio, versao_matriz, historico_academico, parametros_solver, versao_curriculo)
+                    try:
+                        future = executor.submit(_resolver, *argumentos)
+                    except BrokenProcessPool:
+                        executor = await asyncio.to_thread(_substituir_executor, executor)
+                        future = executor.submit(_resolver, *argumentos)
+                    futures[asyncio.wrap_future(future)] = chave
+
+            concluidas = [future for future in futures if future.done()]
+            for future in concluidas:
+                for resultado in await _produzir_resultados(future, futures.pop(future), pendentes, resolvidas, cache):
+                    yield resultado
+
+        while futures:
+            concluidas, _ = await asyncio.wait(futures, return_when=asyncio.FIRST_COMPLETED)
+            for future in concluidas:
+                for resultado in await _produzir_resultados(future, futures.pop(future), pendentes, resolvidas, cache):
+                    yield resultado
+    finally:
+        for future in futures:
+            future.cancel()
+        _liberar_matriz(versao_matriz)
+
+
+def _chave_canonica(
+    matriz_horaria: list[dict],
+    historico_academico: list[dict],
+    versao_matriz: str,
+    indice_horario: IndiceHorario | None,
+    curriculo: Curriculo | None,
+) -> str:
+    """Calcula a chave canônica da grade ideal de um estudante, que identifica resoluções equivalentes."""
+    return GeradorGradeIdeal(
+        matriz_horaria,
+        historico_academico,
+        versao_matriz=versao_matriz,
+        indice_horario=indice_horario,
+        curriculo=curriculo,
+    ).chave_canonica()
+
+
+async def _produzir_resultados(
+    future: asyncio.Future,
+    chave: str,
+    pendentes: dict[str, list[int]],
+    resolvidas: dict[str, list[dict]],
+    cache: Any | None,
+) -> list[dict]:
+    """Retorna o resultado de uma resolução concluída para cada histórico que aguardava a chave."""
+    indices = pendentes.pop(chave)
+    try:
+        grade_ideal, estatisticas = future.result()
+    except Exception as exc:
+        return [{"indice": indice, "erro": str(exc)} for indice in indices]
+
+    if cache is not None and estatisticas is not None and estatisticas["status"] == "OPTIMAL":
+        await asyncio.to_thread(cache.armazenar, chave, (grade_ideal, estatisticas))
+    resolvidas[chave] = grade_ideal
+    return [{"indice": indice, "grade": grade_ideal} for indice in indices]
+
+
+def _publicar_para_workers(matriz_horaria: list[dict], versao_matriz: str, curriculo: Curriculo | None = None) -> Path:
+    """
+    Publica a matriz e o currículo no diretório temporário lido pelos processos do pool, uma única vez
+    por versão, e retorna o diretório, marcando a versão da matriz como em uso até `_liberar_matriz`.
+    Apenas as MAX_MATRIZES_PUBLICADAS versões de matriz usadas mais recentemente ficam no disco;
+    o diretório é removido ao fim do processo.
+    """
+    global _diretorio_matrizes
+    with _lock_matrizes:
+        if _diretorio_matrizes is None:
+            _diretorio_matrizes = Path(tempfile.mkdtemp(prefix="jailmaker-lote-"))
+            atexit.register(shutil.rmtree, _diretorio_matrizes, ignore_errors=True)
+        if _matrizes_publicadas.obter(versao_matriz) is None:
+            publicar_matriz(matriz_horaria, _diretorio_matrizes, NOME_MATRIZ_LOTE, "lote", versao=versao_matriz)
+            _matrizes_descartadas.discard(versao_matriz)
+            _matrizes_publicadas.armazenar(versao_matriz, True)
+        if curriculo is not None and curriculo.versao not in _curriculos_publicados:
+            diretorio_curriculo = _diretorio_matrizes / DIRETORIO_CURRICULOS_LOTE / curriculo.versao
+            diretorio_curriculo.mkdir(parents=True, exist_ok=True)
+            curriculo.para_arquivo(diretorio_curriculo / f"{curriculo.curso}.json")
+            _curriculos_publicados.add(curriculo.versao)
+        _matrizes_em_uso[versao_matriz] += 1
+        return _diretorio_matrizes
+
+
+def _liberar_matriz(versao_matriz: str) -> None:
+    """Marca o fim de um lote que usava a versão, removendo-a do disco se ela já tiver sido descartada."""
+    with _lock_matrizes:
+        _matrizes_em_uso[versao_matriz] -= 1
+        if _matrizes_em_uso[versao_matriz] <= 0:
+            del _matrizes_em_uso[versao_matriz]
+            if versao_matriz in _matrizes_descartadas:
+                _matrizes_descartadas.discard(versao_matriz)
+                _remover_matriz(versao_matriz)
+
+
+def _descartar_matriz(versao_matriz: str, _publicada: bool) -> None:
+    """
+    Remove do disco uma versão descartada de `_matrizes_publicadas`, ou adia a remoção até o fim dos lotes
+    que ainda a usam. Chamada com `_lock_matrizes` adquirido, dentro de `_publicar_para_workers`.
+    """
+    if _matrizes_em_uso[versao_matriz] > 0:
+        _matrizes_descartadas.add(versao_matriz)
+    else:
+        _remover_matriz(versao_matriz)
+
+
+def _remover_matriz(versao_matriz: str) -> None:
+    """Remove o diretório da versão publicada para os processos do pool."""
+    shutil.rmtree(_diretorio_matrizes / NOME_MATRIZ_LOTE / versao_matriz, ignore_errors=True)
+
+
+_matrizes_publicadas = CacheLRU(MAX_MATRIZES_PUBLICADAS, ao_descartar=_descartar_matriz)
+
+
+def _resolver(
+    diretorio: Path,
+    versao_matriz: str,
+    historico_academico: list[dict],
+    parametros_solver: ParametrosSolver,
+    versao_curriculo: tuple[str, str] | None = None,
+) -> tuple[list[dict], dict | None]:
+    """
+    Resolve a grade ideal de um estudante dentro de um processo do pool.
+    A matriz publicada (com o seu índice de horários) e o currículo, identificado pelo curso e pela versão,
+    são carregados na primeira resolução da versão, e o modelo base da matriz fica em memória no processo;
+    todos são reaproveitados pelas resoluções seguintes.
+    """
+    carregada = _matrizes_worker.obter(versao_matriz)
+    if carregada is None:
+        artefato = carregar_artefato(diretorio, NOME_MATRIZ_LOTE, versao_matriz)
+        carregada = (artefato.matriz_horaria, artefato.indice_horario())
+        _matrizes_worker.armazenar(versao_matriz, carregada)
+    matriz_horaria, indice_horario = carregada
+
+    curriculo = None
+    if versao_curriculo is not None:
+        curriculo = _curriculos_worker.obter(versao_curriculo)
+        if curriculo is None:
+            curso, versao = versao_curriculo
+            curriculo = Curriculo.de_arquivo(diretorio / DIRETORIO_CURRICULOS_LOTE / versao / f"{curso}.json")
+            _curriculos_worker.armazenar(versao_curriculo, curriculo)
+
+    gerador = GeradorGradeIdeal(
+        matriz_horaria,
+        historico_academico,
+        parametros_solver=parametros_solver,
+        versao_matriz=versao_matriz,
+        indice_horario=indice_horario,
+        curriculo=curriculo,
+    )
+    grade_ideal = gerador.gerar()
+    return grade_ideal, gerador.estatisticas
+
+
+def _inicializar_worker() -> None:
+    """
+    Aquece o processo do pool resolvendo um modelo trivial, para que as bibliotecas nativas do ortools
+    já estejam carregadas quando a primeira resolução chegar.
+    """
+    model = cp_model.CpModel()
+    model.Maximize(model.NewBoolVar("aquecimento"))
+    cp_model.CpSolver().Solve(model)
@@ -1,258 +1,591 @@
-import re
+import hashlib
+import threading
+import time
+from collections.abc import Iterable
+from typing import NamedTuple
 
 from ortools.sat.python import cp_model
 
-from jailmaker.constants import CURRICULO_CCOMP, PREREQUISITOS_MAP
+from jailmaker.service.cache_svc import CacheLRU
+from jailmaker.service.curriculos_svc import Curriculo, curriculo_padrao
+from jailmaker.service.disciplinas_svc import Oferta, SituacaoEstudante
+from jailmaker.service.indice_horario_svc import IndiceHorario
+from jailmaker.service.metricas_svc import registrar_etapa
+from jailmaker.service.prerequisitos_svc import CRITERIOS_PESO
+from jailmaker.service.versao_svc import versao_matriz_horaria
 
+FORMULACOES_CONFLITO = ("pares", "cliques", "sem_sobreposicao")
 
-class GeradorGradeIdeal:
+# Modelos base já construídos, por (versão da matriz, versão do currículo, formulação, critério de peso).
+_MODELOS_BASE = CacheLRU(tamanho_maximo=8)
+_LOCK_MODELOS_BASE = threading.Lock()
+
+
+class ParametrosSolver(NamedTuple):
     """
-    Classe responsável por montar grades horárias ideais para estudantes
-    com base no histórico acadêmico e na matriz horária disponível.
+    Parâmetros de execução do solver CP-SAT.
+
+    Attributes:
+        tempo_limite: Tempo máximo de resolução em segundos (None para não limitar).
+        num_workers: Quantidade de workers de busca (None para o padrão do CP-SAT).
+        deterministico: Se verdadeiro, a busca é intercalada entre os workers e o tempo limite também é aplicado
+            em tempo determinístico, de modo que a mesma entrada produz sempre a mesma grade (desde que a busca
+            termine pelo limite determinístico, e não pelo tempo de parede, que continua valendo).
     """
 
-    def __init__(self, matriz_horaria: list[dict], historico_academico: list[dict]):
-        """
-        Inicializa o GeradorGradeIdeal com a matriz horária disponível e o histórico do estudante.
+    tempo_limite: float | None = None
+    num_workers: int | None = None
+    deterministico: bool = False
 
-        Args:
-            matriz_horaria: Lista de dicionários contendo as disciplinas disponíveis.
-            historico_academico: Lista de dicionários contendo as disciplinas já cursadas pelo estudante.
+    def criar_solver(self, tempo_limite: float | None = None) -> cp_model.CpSolver:
         """
-        self.matriz_horaria = matriz_horaria
-        self.historico_academico = historico_academico
-        self._disciplinas_feitas: set[str] = set()
-        self._disciplinas_disponiveis: list[dict] = []
-        self._disciplinas_indisponiveis: set[str] = set()
+        Cria um solver CP-SAT configurado com estes parâmetros.
 
-    def gerar(self) -> list[dict]:
-        """
-        Monta a grade ideal baseada no histórico do estudante e na matriz horária atual.
+        Args:
+            tempo_limite: Tempo limite a usar no lugar do configurado (ex.: o tempo restante de um orçamento).
 
         Returns:
-            Lista de disciplinas que compõem a grade ideal.
+            Solver configurado.
         """
-        self._filtrar_disciplinas_disponiveis()
-
-        if not self._disciplinas_disponiveis:
-            return []
+        solver = cp_model.CpSolver()
+        tempo_limite = self.tempo_limite if tempo_limite is None else tempo_limite
+        if self.num_workers is not None:
+            solver.parameters.num_workers = self.num_workers
+        if tempo_limite is not None:
+            solver.parameters.max_time_in_seconds = tempo_limite
+        if self.deterministico:
+            solver.parameters.interleave_search = True
+            if tempo_limite is not None:
+                solver.parameters.max_deterministic_time = tempo_limite
+        return solver
+
+
+class ModeloBaseGradeIdeal:
+    """
+    Parte do modelo da grade ideal que independe do estudante: as variáveis de cada disciplina do currículo
+    ofertada na matriz, as restrições de conflito de horário e de mesma disciplina e o objetivo.
+    É construída uma única vez por versão da matriz horária e do currículo e reaproveitada entre requisições,
+    que apenas clonam o modelo e fixam em 0 as ofertas não elegíveis para o estudante.
+    """
 
-        self._processar_historico()
+    def __init__(
+        self,
+        matriz_horaria: list[dict],
+        formulacao: str = "cliques",
+        versao: str | None = None,
+        indice_horario: IndiceHorario | None = None,
+        pesos: str = "diretos",
+        curriculo: Curriculo | None = None,
+        registrar_etapas: bool = True,
+    ) -> None:
+        """
+        Constrói o modelo base para a matriz horária informada.
 
-        model = cp_model.CpModel()
-        disciplina_vars = self._criar_variaveis_disciplinas(model)
+        Args:
+            matriz_horaria: Lista de dicionários contendo as disciplinas disponíveis.
+            formulacao: Formulação das restrições de conflito de horário (uma de FORMULACOES_CONFLITO).
+            versao: Versão da matriz horária, se já conhecida (calculada a partir do conteúdo se omitida).
+            indice_horario: Índice de horários de todas as ofertas da matriz, se já compilado
+                (construído a partir das disciplinas disponíveis se omitido).
+            pesos: Critério de peso das disciplinas no objetivo (um de CRITERIOS_PESO).
+            curriculo: Currículo do curso (o currículo padrão se omitido).
+            registrar_etapas: Se verdadeiro, registra os tempos de cada etapa nas métricas de etapas.
+        """
+        inicio = time.perf_counter()
+        self.versao = versao or versao_matriz_horaria(matriz_horaria)
+        self.formulacao = formulacao
+        self.pesos = pesos
+        self.curriculo = curriculo or curriculo_padrao()
+        # Tempo (em segundos) de cada etapa da construção.
+        self.tempos: dict[str, float] = {"versao": time.perf_counter() - inicio}
+
+        etapa = time.perf_counter()
+        self._filtrar_disciplinas_disponiveis(matriz_horaria)
+        self.tempos["filtragem"] = time.perf_counter() - etapa
+
+        etapa = time.perf_counter()
+        self._indice_horario = (
+            indice_horario.selecionar(self.indices) if indice_horario is not None else IndiceHorario(self.disciplinas)
+        )
+        self.tempos["indice_horario"] = time.perf_counter() - etapa
+
+        etapa = time.perf_counter()
+        self.model = cp_model.CpModel()
+        self.variaveis = self._criar_variaveis_disciplinas(self.model)
+        self._aplicar_restricao_conflitos(self.model, self.variaveis, formulacao)
+        self._aplicar_restricao_mesma_disciplina(self.model, self.variaveis)
+        self.tempos["restricoes"] = time.perf_counter() - etapa
+
+        etapa = time.perf_counter()
+        self._definir_objetivo(self.model)
+        self.tempos["objetivo"] = time.perf_counter() - etapa
+        self.tempo_construcao = time.perf_counter() - inicio
+        if registrar_etapas:
+            for nome, duracao in self.tempos.items():
+                registrar_etapa(f"modelo_base.{nome}", duracao)
+
+    @classmethod
+    def obter(
+        cls,
+        matriz_horaria: list[dict],
+        formulacao: str = "cliques",
+        versao: str | None = None,
+        indice_horario: IndiceHorario | None = None,
+        pesos: str = "diretos",
+        curriculo: Curriculo | None = None,
+    ) -> "ModeloBaseGradeIdeal":
+        """
+        Retorna o modelo base da matriz horária, construindo-o apenas na primeira vez que a versão da matriz
+        é vista com a versão do currículo.
 
-        self._aplicar_restricao_disciplinas_indisponiveis(model, disciplina_vars)
-        self._aplicar_restricao_pre_requisitos(model, disciplina_vars)
-        self._aplicar_restricao_conflitos(model, disciplina_vars)
-        self._aplicar_restricao_mesma_disciplina(model, disciplina_vars)
+        Args:
+            matriz_horaria: Lista de dicionários contendo as disciplinas disponíveis.
+            formulacao: Formulação das restrições de conflito de horário.
+            versao: Versão da matriz horária, se já conhecida (calculada a partir do conteúdo se omitida).
+            indice_horario: Índice de horários de todas as ofertas da matriz, se já compilado.
+            pesos: Critério de peso das disciplinas no objetivo.
+            curriculo: Currículo do curso (o currículo padrão se omitido).
 
-        # Calcula quantas vezes cada disciplina é pré-requisito de outras disciplinas.
-        frequencia_prereq = {}
-        for prereqs in PREREQUISITOS_MAP.values():
-            for prereq in prereqs:
-                nome_normalizado = self._normalizar_nome(prereq)
-                frequencia_prereq[nome_normalizado] = frequencia_prereq.get(nome_normalizado, 0) + 1
+        Returns:
+            O modelo base, compartilhado entre as requisições.
+        """
+        versao = versao or versao_matriz_horaria(matriz_horaria)
+        curriculo = curriculo or curriculo_padrao()
+        chave = (versao, curriculo.versao, formulacao, pesos)
+        modelo_base = _MODELOS_BASE.obter(chave)
+        if modelo_base is None:
+            with _LOCK_MODELOS_BASE:
+                modelo_base = _MODELOS_BASE.obter(chave)
+                if modelo_base is None:
+                    modelo_base = cls(matriz_horaria, formulacao, versao, indice_horario, pesos, curriculo)
+                    _MODELOS_BASE.armazenar(chave, modelo_base)
+        return modelo_base
+
+    def instanciar(self, posicoes_fixadas: Iterable[int]) -> cp_model.CpModel:
+        """
+        Cria uma cópia do modelo base com as variáveis das posições informadas fixadas em 0.
+        O modelo base não é alterado, podendo ser instanciado concorrentemente.
 
-        # Cada disciplina recebe um peso = 1 (valor base) + quantidade de vezes que ela aparece como pré-requisito.
-        objetivo = []
-        for disciplina in self._disciplinas_disponiveis:
-            chave = f"{disciplina['nome']}_{disciplina['professor']}"
-            nome_normalizado = self._normalizar_nome(disciplina["nome"])
-            peso = 1 + frequencia_prereq.get(nome_normalizado, 0)
-            objetivo.append(peso * disciplina_vars[chave])
+        Args:
+            posicoes_fixadas: Posições (em `disciplinas`) das ofertas que não podem ser escolhidas.
 
-        # Objetivo: maximizar a soma ponderada das disciplinas selecionadas.
-        model.Maximize(sum(objetivo))
+        Returns:
+            O modelo do estudante, pronto para ser resolvido.
+        """
+        model = self.model.Clone()
+        variaveis_proto = model.Proto().variables
+        for posicao in posicoes_fixadas:
+            variaveis_proto[self.variaveis[posicao].Index()].domain[:] = [0, 0]
+        return model
 
-        # Executa a otimização do modelo.
-        solver = cp_model.CpSolver()
-        status = solver.Solve(model)
+    def reduzir(self, posicoes: list[int]) -> "ModeloBaseGradeIdeal":
+        """
+        Constrói um novo modelo (fora do cache de modelos base) apenas com as ofertas das posições informadas,
+        reaproveitando o índice de horários já compilado. Um modelo reduzido às ofertas elegíveis de um estudante
+        é muito menor que o modelo base e pode ser resolvido repetidamente sem o custo da pré-resolução
+        das variáveis fixadas em 0.
 
-        # Processa os resultados.
-        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-            return [
-                disciplina
-                for disciplina in self._disciplinas_disponiveis
-                if solver.Value(disciplina_vars[f"{disciplina['nome']}_{disciplina['professor']}"]) == 1
-            ]
-        return []
+        Args:
+            posicoes: Posições (em `disciplinas`) das ofertas mantidas.
 
-    def _filtrar_disciplinas_disponiveis(self) -> None:
-        """
-        Filtra as disciplinas disponíveis conforme o currículo de Ciência da Computação.
-        Utiliza o nome normalizado para comparar com o currículo.
+        Returns:
+            O modelo reduzido, cujas ofertas têm como `indice` a posição em `posicoes`.
         """
-        self._disciplinas_disponiveis = [
-            disciplina
-            for disciplina in self.matriz_horaria
-            if self._normalizar_nome(disciplina["nome"]) in CURRICULO_CCOMP
-        ]
-
-    def _processar_historico(self) -> None:
+        return ModeloBaseGradeIdeal(
+            [self.disciplinas[posicao] for posicao in posicoes],
+            self.formulacao,
+            versao=self.versao,
+            indice_horario=self._indice_horario.selecionar(posicoes),
+            pesos=self.pesos,
+            curriculo=self.curriculo,
+            registrar_etapas=False,
+        )
+
+    def _filtrar_disciplinas_disponiveis(self, matriz_horaria: list[dict]) -> None:
         """
-        Processa o histórico do estudante para identificar disciplinas já concluídas
-        ou em andamento, utilizando o nome normalizado para garantir a comparação correta.
+        Filtra as disciplinas disponíveis conforme o currículo do curso,
+        registrando cada oferta com o identificador inteiro da sua disciplina.
         """
-        for disciplina in self.historico_academico:
-            nome_normalizado = self._normalizar_nome(disciplina["nome"])
-            if disciplina["situacao"] == "APROVADO":
-                self._disciplinas_feitas.add(nome_normalizado)
-                self._disciplinas_indisponiveis.add(nome_normalizado)
-            elif disciplina["situacao"] == "EM CURSO":
-                self._disciplinas_indisponiveis.add(nome_normalizado)
-
-    def _criar_variaveis_disciplinas(self, model: cp_model.CpModel) -> dict[str, cp_model.IntVar]:
+        self.ofertas: list[Oferta] = []
+        ids_curriculo = self.curriculo.ids_curriculo
+        for indice, disciplina in enumerate(matriz_horaria):
+            identificador = self.curriculo.id_disciplina(disciplina["nome"])
+            if identificador in ids_curriculo:
+                self.ofertas.append(Oferta(indice, identificador, disciplina))
+        self.indices = [oferta.indice for oferta in self.ofertas]
+        self.ids_disciplinas = [oferta.disciplina for oferta in self.ofertas]
+        self.disciplinas = [oferta.dados for oferta in self.ofertas]
+
+    def _criar_variaveis_disciplinas(self, model: cp_model.CpModel) -> list[cp_model.IntVar]:
         """
-        Cria variáveis booleanas para cada disciplina disponível.
+        Cria uma variável booleana para cada oferta disponível. Turmas diferentes da mesma disciplina com o mesmo
+        professor têm variáveis próprias, de modo que a restrição de mesma disciplina escolhe no máximo uma delas.
 
         Args:
             model: O modelo de programação por restrições.
 
         Returns:
-            Dicionário que mapeia uma chave única para cada disciplina à sua variável booleana.
+            Lista de variáveis booleanas, na ordem de `disciplinas`.
         """
-        disciplina_vars = {}
-        for disciplina in self._disciplinas_disponiveis:
-            chave = f"{disciplina['nome']}_{disciplina['professor']}"
-            disciplina_vars[chave] = model.NewBoolVar(chave)
-        return disciplina_vars
+        return [
+            model.NewBoolVar(f"{oferta.dados['nome']}_{oferta.dados['professor']}_{posicao}")
+            for posicao, oferta in enumerate(self.ofertas)
+        ]
 
-    def _aplicar_restricao_disciplinas_indisponiveis(
-        self, model: cp_model.CpModel, disciplina_vars: dict[str, cp_model.IntVar]
+    def _aplicar_restricao_conflitos(
+        self, model: cp_model.CpModel, variaveis: list[cp_model.IntVar], formulacao: str
     ) -> None:
         """
-        Impõe a restrição de que disciplinas já concluídas ou em andamento não podem ser escolhidas.
+        Impõe restrição para evitar conflitos de dias ou horários entre as disciplinas.
+        Os conflitos são obtidos do índice compilado de horários, conforme a formulação escolhida:
+
+        - "pares": uma restrição x1 + x2 <= 1 para cada par de disciplinas em conflito;
+        - "cliques": uma restrição "no máximo uma" para cada conjunto maximal de disciplinas
+          que se sobrepõem mutuamente em um dia;
+        - "sem_sobreposicao": intervalos opcionais com AddNoOverlap para cada dia da semana.
 
         Args:
             model: O modelo de programação por restrições.
-            disciplina_vars: Dicionário com as variáveis de decisão.
+            variaveis: Variáveis de decisão de cada oferta, na ordem de `disciplinas`.
+            formulacao: Formulação das restrições de conflito.
         """
-        for disciplina in self._disciplinas_disponiveis:
-            chave = f"{disciplina['nome']}_{disciplina['professor']}"
-            if self._normalizar_nome(disciplina["nome"]) in self._disciplinas_indisponiveis:
-                model.Add(disciplina_vars[chave] == 0)
+        indice = self._indice_horario
+
+        if formulacao == "pares":
+            for i, j in indice.pares_em_conflito().tolist():
+                model.Add(variaveis[i] + variaveis[j] <= 1)
+        elif formulacao == "cliques":
+            for clique in indice.cliques_maximais():
+                model.AddAtMostOne(variaveis[i] for i in clique)
+        else:
+            for dia, intervalos in indice.intervalos_por_dia().items():
+                model.AddNoOverlap(
+                    model.NewOptionalFixedSizeIntervalVar(inicio, fim - inicio, variaveis[i], f"intervalo_{dia}_{i}")
+                    for i, inicio, fim in intervalos
+                )
 
-    def _aplicar_restricao_pre_requisitos(
-        self, model: cp_model.CpModel, disciplina_vars: dict[str, cp_model.IntVar]
-    ) -> None:
+    def _aplicar_restricao_mesma_disciplina(self, model: cp_model.CpModel, variaveis: list[cp_model.IntVar]) -> None:
         """
-        Impõe a restrição para garantir que os pré-requisitos das disciplinas foram cumpridos.
-        Utiliza o nome normalizado para realizar a verificação com o PREREQUISITOS_MAP.
+        Impõe restrição para não escolher a mesma disciplina ministrada por professores diferentes.
 
         Args:
             model: O modelo de programação por restrições.
-            disciplina_vars: Dicionário com as variáveis de decisão.
+            variaveis: Variáveis de decisão de cada oferta, na ordem de `disciplinas`.
         """
-        for disciplina in self._disciplinas_disponiveis:
-            chave = f"{disciplina['nome']}_{disciplina['professor']}"
-            nome_normalizado = self._normalizar_nome(disciplina["nome"])
-            if nome_normalizado in PREREQUISITOS_MAP:
-                prereqs = PREREQUISITOS_MAP[nome_normalizado]
-                if not all(prereq in self._disciplinas_feitas for prereq in prereqs):
-                    model.Add(disciplina_vars[chave] == 0)
+        posicoes_por_disciplina: dict[int, list[int]] = {}
+        for posicao, identificador in enumerate(self.ids_disciplinas):
+            posicoes_por_disciplina.setdefault(identificador, []).append(posicao)
 
-    def _aplicar_restricao_conflitos(
-        self, model: cp_model.CpModel, disciplina_vars: dict[str, cp_model.IntVar]
-    ) -> None:
+        for posicoes in posicoes_por_disciplina.values():
+            if len(posicoes) > 1:
+                model.Add(sum(variaveis[posicao] for posicao in posicoes) <= 1)
+
+    def _definir_objetivo(self, model: cp_model.CpModel) -> None:
         """
-        Impõe restrição para evitar conflitos de dias ou horários entre as disciplinas.
+        Define o objetivo de maximizar a soma ponderada das disciplinas selecionadas.
+        Os pesos vêm do grafo de pré-requisitos do currículo, pré-calculados conforme o critério do modelo;
+        no critério padrão, cada disciplina recebe um peso = 1 (valor base) + quantidade de vezes que ela
+        aparece como pré-requisito.
 
         Args:
             model: O modelo de programação por restrições.
-            disciplina_vars: Dicionário com as variáveis de decisão.
         """
-        for i, disciplina1 in enumerate(self._disciplinas_disponiveis):
-            for j, disciplina2 in enumerate(self._disciplinas_disponiveis):
-                if i < j and self._tem_conflito_de_dia_ou_horario(disciplina1, disciplina2):
-                    chave1 = f"{disciplina1['nome']}_{disciplina1['professor']}"
-                    chave2 = f"{disciplina2['nome']}_{disciplina2['professor']}"
-                    model.Add(disciplina_vars[chave1] + disciplina_vars[chave2] <= 1)
+        pesos = self.curriculo.pesos(self.pesos)
+        model.Maximize(
+            sum(
+                pesos[identificador] * variavel
+                for variavel, identificador in zip(self.variaveis, self.ids_disciplinas, strict=True)
+            )
+        )
 
-    def _aplicar_restricao_mesma_disciplina(
-        self, model: cp_model.CpModel, disciplina_vars: dict[str, cp_model.IntVar]
-    ) -> None:
+
+class GeradorGradeIdeal:
+    """
+    Classe responsável por montar grades horárias ideais para estudantes
+    com base no histórico acadêmico e na matriz horária disponível.
+    """
+
+    def __init__(
+        self,
+        matriz_horaria: list[dict],
+        historico_academico: list[dict],
+        formulacao: str = "cliques",
+        parametros_solver: ParametrosSolver | None = None,
+        versao_matriz: str | None = None,
+        indice_horario: IndiceHorario | None = None,
+        pesos: str = "diretos",
+        curriculo: Curriculo | None = None,
+    ):
         """
-        Impõe restrição para não escolher a mesma disciplina ministrada por professores diferentes.
+        Inicializa o GeradorGradeIdeal com a matriz horária disponível e o histórico do estudante.
 
         Args:
-            model: O modelo de programação por restrições.
-            disciplina_vars: Dicionário com as variáveis de decisão.
-        """
-        nome_para_disciplinas: dict[str, list[dict]] = {}
-        for disciplina in self._disciplinas_disponiveis:
-            nome_normalizado = self._normalizar_nome(disciplina["nome"])
-            if nome_normalizado not in nome_para_disciplinas:
-                nome_para_disciplinas[nome_normalizado] = []
-            nome_para_disciplinas[nome_normalizado].append(disciplina)
-
-        for _nome, disciplinas in nome_para_disciplinas.items():
-            if len(disciplinas) > 1:
-                model.Add(
-                    sum(
-                        disciplina_vars[f"{disciplina['nome']}_{disciplina['professor']}"] for disciplina in disciplinas
-                    )
-                    <= 1
-                )
+            matriz_horaria: Lista de dicionários contendo as disciplinas disponíveis.
+            historico_academico: Lista de dicionários contendo as disciplinas já cursadas pelo estudante.
+            formulacao: Formulação das restrições de conflito de horário (uma de FORMULACOES_CONFLITO).
+            parametros_solver: Parâmetros do solver CP-SAT (padrões do CP-SAT se omitido).
+            versao_matriz: Versão da matriz horária, se já conhecida (ex.: de uma matriz registrada no servidor).
+            indice_horario: Índice de horários de todas as ofertas da matriz, se já compilado.
+            pesos: Critério de peso das disciplinas no objetivo (um de CRITERIOS_PESO).
+            curriculo: Currículo do curso do estudante (o currículo padrão se omitido).
+        """
+        if formulacao not in FORMULACOES_CONFLITO:
+            raise ValueError(f"Formulação de conflitos inválida: {formulacao}")
+        if pesos not in CRITERIOS_PESO:
+            raise ValueError(f"Critério de peso inválido: {pesos}")
 
-    @staticmethod
-    def _tem_conflito_de_dia_ou_horario(disciplina1: dict, disciplina2: dict) -> bool:
+        self.matriz_horaria = matriz_horaria
+        self.historico_academico = historico_academico
+        self.formulacao = formulacao
+        self.parametros_solver = parametros_solver or ParametrosSolver()
+        self.versao_matriz = versao_matriz
+        self.indice_horario = indice_horario
+        self.pesos = pesos
+        self.curriculo = curriculo or curriculo_padrao()
+        self.estatisticas: dict | list[dict] | None = None
+        # Tempo (em segundos) de cada etapa da preparação e da última resolução.
+        self.tempos: dict[str, float] = {}
+        self._modelo_base: ModeloBaseGradeIdeal | None = None
+        self._situacao: SituacaoEstudante | None = None
+        self._disciplinas_disponiveis: list[dict] = []
+
+    def gerar(self) -> list[dict]:
         """
-        Verifica se duas disciplinas possuem conflito de dia ou horário.
+        Monta a grade ideal baseada no histórico do estudante e na matriz horária atual.
 
-        Args:
-            disciplina1: Primeira disciplina para verificação.
-            disciplina2: Segunda disciplina para verificação.
+        Após a resolução, as estatísticas do solver ficam disponíveis em `estatisticas`.
 
         Returns:
-            True se houver conflito, False caso contrário.
+            Lista de disciplinas que compõem a grade ideal.
         """
-        dias_em_comum = set(disciplina1["dias"]).intersection(set(disciplina2["dias"]))
-        if not dias_em_comum:
-            return False
+        self._preparar()
 
-        for dia in dias_em_comum:
-            dia_idx1 = disciplina1["dias"].index(dia)
-            dia_idx2 = disciplina2["dias"].index(dia)
+        if not self._disciplinas_disponiveis:
+            return []
 
-            horario1_start, horario1_end = disciplina1["horarios"][dia_idx1].split(" - ")
-            horario2_start, horario2_end = disciplina2["horarios"][dia_idx2].split(" - ")
+        inicio = time.perf_counter()
+        model = self._modelo_base.instanciar(self._posicoes_inelegiveis())
+        variaveis = self._modelo_base.variaveis
+        self._registrar_tempo("instanciacao", inicio)
 
-            horario1_start_min = GeradorGradeIdeal._horario_para_minutos(horario1_start)
-            horario1_end_min = GeradorGradeIdeal._horario_para_minutos(horario1_end)
-            horario2_start_min = GeradorGradeIdeal._horario_para_minutos(horario2_start)
-            horario2_end_min = GeradorGradeIdeal._horario_para_minutos(horario2_end)
+        # Executa a otimização do modelo.
+        inicio = time.perf_counter()
+        solver = self.parametros_solver.criar_solver()
+        status = solver.Solve(model)
+        self._registrar_tempo("resolucao", inicio)
+        self.estatisticas = self.coletar_estatisticas(solver, status)
 
-            if not (horario1_end_min <= horario2_start_min or horario2_end_min <= horario1_start_min):
-                return True
+        # Processa os resultados.
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return [
+                disciplina
+                for disciplina, variavel in zip(self._disciplinas_disponiveis, variaveis, strict=True)
+                if solver.Value(variavel) == 1
+            ]
+        return []
+
+    def chave_canonica(self) -> str:
+        """
+        Calcula uma chave que identifica o problema de otimização do estudante.
+        A grade ideal depende apenas das versões da matriz horária e do currículo e de quais ofertas são elegíveis
+        (do currículo, ainda não cursadas e com os pré-requisitos cumpridos), de modo que estudantes
+        com históricos diferentes, mas com o mesmo conjunto de ofertas elegíveis, compartilham a mesma chave.
 
-        return False
+        Com um critério de peso diferente do padrão, o critério também faz parte da chave.
 
-    @staticmethod
-    def _horario_para_minutos(horario_str: str) -> int:
+        Returns:
+            Chave canônica no formato "<versão da matriz>:<versão do currículo>:<hash das ofertas elegíveis>"
+            (ou "<versão da matriz>:<versão do currículo>:<critério de peso>:<hash das ofertas elegíveis>").
+        """
+        self._preparar()
+        elegibilidade = self._situacao.elegibilidade()
+        elegiveis = [str(oferta.indice) for oferta in self._modelo_base.ofertas if elegibilidade[oferta.disciplina]]
+        hash_elegiveis = hashlib.sha256(",".join(elegiveis).encode()).hexdigest()
+        prefixo = f"{self._modelo_base.versao}:{self.curriculo.versao}"
+        if self.pesos != "diretos":
+            return f"{prefixo}:{self.pesos}:{hash_elegiveis}"
+        return f"{prefixo}:{hash_elegiveis}"
+
+    def impressao_digital(self) -> str:
         """
-        Converte uma string de horário no formato "HHhMM" para minutos.
+        Calcula uma impressão digital da requisição sem construir o modelo base: as versões da matriz horária
+        e do currículo, a formulação, o critério de peso, os parâmetros do solver e as disciplinas concluídas
+        e indisponíveis do estudante. Requisições com a mesma impressão digital produzem a mesma grade ideal.
+
+        Returns:
+            O SHA-256 hexadecimal da impressão digital.
+        """
+        self.versao_matriz = self.versao_matriz or versao_matriz_horaria(self.matriz_horaria)
+        situacao = SituacaoEstudante(self.historico_academico, self.curriculo)
+        partes = (
+            self.versao_matriz,
+            self.curriculo.versao,
+            self.formulacao,
+            self.pesos,
+            repr(tuple(self.parametros_solver)),
+            f"{situacao.feitas:x}",
+            f"{situacao.indisponiveis:x}",
+        )
+        return hashlib.sha256(":".join(partes).encode()).hexdigest()
+
+    def gerar_alternativas(self, k: int) -> list[dict[str, int | list[dict]]]:
+        """
+        Monta as k melhores grades distintas a partir de uma única construção do modelo.
+        Após cada solução, adiciona um corte que a proíbe e resolve novamente o mesmo modelo.
+        O tempo limite dos parâmetros do solver é o orçamento total de todas as resoluções,
+        e as estatísticas de cada resolução ficam disponíveis em `estatisticas`.
 
         Args:
-            horario_str: String no formato "HHhMM" (ex: "14h30").
+            k: Quantidade máxima de grades a retornar.
 
         Returns:
-            Quantidade total de minutos.
+            Lista, em ordem decrescente de valor objetivo, de dicionários com a grade e o seu valor objetivo.
         """
-        hora, minuto = map(int, horario_str.split("h"))
-        return hora * 60 + minuto
+        self._preparar()
+
+        if not self._disciplinas_disponiveis:
+            return []
+
+        model = self._modelo_base.instanciar(self._posicoes_inelegiveis())
+        variaveis = self._modelo_base.variaveis
+
+        alternativas = []
+        self.estatisticas = []
+        tempo_limite = self.parametros_solver.tempo_limite
+        inicio = time.perf_counter()
+        while len(alternativas) < k:
+            tempo_restante = None
+            if tempo_limite is not None:
+                tempo_restante = tempo_limite - (time.perf_counter() - inicio)
+                if tempo_restante <= 0:
+                    break
+
+            solver = self.parametros_solver.criar_solver(tempo_restante)
+            status = solver.Solve(model)
+            self.estatisticas.append(self.coletar_estatisticas(solver, status))
+            if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                break
+
+            alternativas.append(
+                {
+                    "grade": [
+                        disciplina
+                        for disciplina, variavel in zip(self._disciplinas_disponiveis, variaveis, strict=True)
+                        if solver.Value(variavel) == 1
+                    ],
+                    "valor_objetivo": round(solver.ObjectiveValue()),
+                }
+            )
+
+            # Corte: a próxima solução deve diferir da atual em ao menos uma variável.
+            model.AddBoolOr(variavel.Not() if solver.Value(variavel) else variavel for variavel in variaveis)
+
+        return alternativas
+
+    def comparar_formulacoes(self) -> list[dict]:
+        """
+        Constrói (sem reaproveitar modelos base) e resolve o modelo com cada uma das formulações de conflito,
+        para comparação.
+
+        Returns:
+            Lista com, para cada formulação, a quantidade de variáveis e restrições do modelo,
+            o tempo de construção e de resolução (em segundos), o status e o valor objetivo.
+        """
+        self._preparar()
+
+        resultados = []
+        for formulacao in FORMULACOES_CONFLITO:
+            inicio = time.perf_counter()
+            model = ModeloBaseGradeIdeal(
+                self.matriz_horaria, formulacao, pesos=self.pesos, curriculo=self.curriculo
+            ).instanciar(self._posicoes_inelegiveis())
+            tempo_construcao = time.perf_counter() - inicio
+
+            solver = self.parametros_solver.criar_solver()
+            status = solver.Solve(model)
+            proto = model.Proto()
+            resultados.append(
+                {
+                    "formulacao": formulacao,
+                    "variaveis": len(proto.variables),
+                    "restricoes": len(proto.constraints),
+                    "tempo_construcao": tempo_construcao,
+                    "tempo_resolucao": solver.WallTime(),
+                    "status": solver.StatusName(status),
+                    "valor_objetivo": solver.ObjectiveValue(),
+                }
+            )
+        return resultados
+
+    def preparar_modelo(self) -> tuple[ModeloBaseGradeIdeal, list[int]]:
+        """
+        Obtém o modelo base da matriz horária e as ofertas que o estudante não pode escolher, para quem precisa
+        manter e resolver repetidamente o modelo do estudante (ex.: as sessões de simulação).
+
+        Returns:
+            O modelo base e as posições (em `ModeloBaseGradeIdeal.disciplinas`) das ofertas inelegíveis.
+        """
+        self._preparar()
+        return self._modelo_base, self._posicoes_inelegiveis()
 
     @staticmethod
-    def _normalizar_nome(nome: str) -> str:
+    def coletar_estatisticas(solver: cp_model.CpSolver, status: int) -> dict[str, str | int | float | None]:
         """
-        Remove sufixos indesejados, como as variações de "(REOF)", do nome da disciplina.
+        Coleta as estatísticas de uma resolução do CP-SAT.
 
         Args:
-            nome: Nome original da disciplina.
+            solver: Solver após a resolução.
+            status: Status retornado pela resolução.
 
         Returns:
-            Nome normalizado.
+            Dicionário com status, tempos (em segundos), ramificações, conflitos, valor objetivo e limite do objetivo.
         """
-        # Remove qualquer ocorrência de "(REOF)" com possíveis espaços antes ou depois.
-        nome = re.sub(r"\s*\(\s*REOF\s*\)", "", nome, flags=re.IGNORECASE)
-        return nome.strip()
+        encontrou_solucao = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        return {
+            "status": solver.StatusName(status),
+            "tempo_parede": solver.WallTime(),
+            "tempo_usuario": solver.UserTime(),
+            "ramificacoes": solver.NumBranches(),
+            "conflitos": solver.NumConflicts(),
+            "valor_objetivo": solver.ObjectiveValue() if encontrou_solucao else None,
+            "limite_objetivo": solver.BestObjectiveBound() if encontrou_solucao else None,
+        }
+
+    def _preparar(self) -> None:
+        """
+        Obtém o modelo base da matriz horária (com as disciplinas disponíveis) e processa o histórico,
+        uma única vez por instância.
+        """
+        if self._modelo_base is not None:
+            return
+        inicio = time.perf_counter()
+        self._modelo_base = ModeloBaseGradeIdeal.obter(
+            self.matriz_horaria, self.formulacao, self.versao_matriz, self.indice_horario, self.pesos, self.curriculo
+        )
+        self._disciplinas_disponiveis = self._modelo_base.disciplinas
+        self._registrar_tempo("modelo_base", inicio)
+
+        inicio = time.perf_counter()
+        self._situacao = SituacaoEstudante(self.historico_academico, self.curriculo)
+        self._registrar_tempo("historico", inicio)
+
+    def _registrar_tempo(self, etapa: str, inicio: float) -> None:
+        """Registra em `tempos` (e nas métricas de etapas) o tempo decorrido desde `inicio` na etapa informada."""
+        self.tempos[etapa] = time.perf_counter() - inicio
+        registrar_etapa(f"grade_ideal.{etapa}", self.tempos[etapa])
+
+    def _posicoes_inelegiveis(self) -> list[int]:
+        """
+        Lista as ofertas que o estudante não pode escolher: disciplinas já concluídas ou em andamento
+        e disciplinas cujos pré-requisitos não foram cumpridos.
+        A elegibilidade é calculada uma única vez por disciplina e consultada pelo identificador de cada oferta.
+
+        Returns:
+            Posições das ofertas (em `ModeloBaseGradeIdeal.disciplinas`) a fixar em 0.
+        """
+        elegibilidade = self._situacao.elegibilidade()
+        return [
+            posicao
+            for posicao, identificador in enumerate(self._modelo_base.ids_disciplinas)
+            if not elegibilidade[identificador]
+        ]
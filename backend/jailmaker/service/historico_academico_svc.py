@@ -1,7 +1,35 @@
+import hashlib
+import io
 import re
+import time
+from collections.abc import Iterable, Iterator
 
 from pypdf import PdfReader
 
+from jailmaker.service.metricas_svc import registrar_etapa
+
+# Versão do parser: deve ser incrementada sempre que a saída de `from_pdf` mudar,
+# invalidando os resultados mantidos em cache.
+VERSAO_PARSER = 2
+
+# Expressões regulares pré-compiladas, aplicadas linha a linha.
+PADROES_ALUNO = {
+    "matricula": re.compile(r"Matrícula: (\d+)"),
+    "nome": re.compile(r"Nome: ([^\n]+)"),
+    "curso": re.compile(r"Curso: ([^\n]+)"),
+    "coeficiente_rendimento": re.compile(r"Coeficiente de Rendimento: ([\d.]+)"),
+}
+PADRAO_INICIO_LINHA_DISCIPLINA = re.compile(r"^\d{4}\s")
+PADRAO_INICIO_NUMERICO = re.compile(r"^\d")
+PADRAO_LINHA_DISCIPLINA = re.compile(r"^\d{4}\s+\d+\s+\d+")
+PADRAO_CAMPOS_INICIAIS = re.compile(r"(\d{4})\s+(\d+)\s+(\d+)\s+([A-Z])\s+([A-Z][A-Z]?)\s+(\d+)\s+")
+
+CAMPOS_INICIAIS = ("ano", "semestre", "termo", "turno", "turma", "codigo")
+CAMPOS_FINAIS = ("categoria", "faltas", "frequencia", "creditos", "carga_horaria", "conceito", "situacao")
+MARCADORES_FINAL = ("CURSO", "APROVADO", "REPROV./FREQ", "CUMPRIDO", "REPROVADO")
+CASOS_ESPECIAIS = {("NÃO", "CUMPRIDO"): "NÃO CUMPRIDO", ("EM", "CURSO"): "EM CURSO"}
+MAPEAMENTO_SITUACAO = {"REPROV./FREQ": "REPROVADO", "CUMPRIDO": "APROVADO", "NÃO CUMPRIDO": "REPROVADO"}
+
 
 class LeitorHistoricoAcademico:
     """
@@ -10,60 +38,67 @@ class LeitorHistoricoAcademico:
     """
 
     @staticmethod
-    def _extrair_informacoes_aluno(texto: str) -> dict[str, str | float]:
-        """Extrai informações básicas do aluno usando expressões regulares."""
-        padroes = {
-            "matricula": r"Matrícula: (\d+)",
-            "nome": r"Nome: ([^\n]+)",
-            "curso": r"Curso: ([^\n]+)",
-            "coeficiente_rendimento": r"Coeficiente de Rendimento: ([\d.]+)",
-        }
-
-        info = {}
-        for chave, padrao in padroes.items():
-            resultado = re.search(padrao, texto)
-            if resultado:
-                info[chave] = (
-                    resultado.group(1).strip() if chave != "coeficiente_rendimento" else float(resultado.group(1))
-                )
-
-        return info
+    def _extrair_linhas(leitor: PdfReader, tempos: dict[str, float]) -> Iterator[str]:
+        """
+        Extrai o texto das páginas sob demanda, uma página por vez, produzindo as suas linhas.
+        O tempo gasto na extração é acumulado em `tempos["extracao"]`.
+        """
+        for pagina in leitor.pages:
+            inicio = time.perf_counter()
+            texto = pagina.extract_text()
+            tempos["extracao"] += time.perf_counter() - inicio
+            yield from texto.split("\n")
+
+    @staticmethod
+    def _extrair_informacoes_aluno(linhas: Iterable[str], info: dict[str, str | float]) -> Iterator[str]:
+        """
+        Extrai informações básicas do aluno usando expressões regulares, à medida que as linhas passam.
+        Cada informação é a primeira ocorrência encontrada; as linhas são repassadas sem alteração.
+        """
+        pendentes = dict(PADROES_ALUNO)
+        for linha in linhas:
+            if pendentes:
+                for chave, padrao in list(pendentes.items()):
+                    resultado = padrao.search(linha)
+                    if resultado:
+                        info[chave] = (
+                            resultado.group(1).strip()
+                            if chave != "coeficiente_rendimento"
+                            else float(resultado.group(1))
+                        )
+                        del pendentes[chave]
+            yield linha
 
     @staticmethod
-    def _mesclar_linhas_quebradas(linhas: list[str]) -> list[str]:
+    def _mesclar_linhas_quebradas(linhas: Iterable[str]) -> Iterator[str]:
         """Combina linhas quebradas em linhas completas de disciplinas."""
-        linhas_mescladas = []
         linha_atual = ""
 
         for linha in linhas:
-            if re.match(r"^\d{4}\s", linha):
+            if PADRAO_INICIO_LINHA_DISCIPLINA.match(linha):
                 if linha_atual:
-                    linhas_mescladas.append(linha_atual.strip())
+                    yield linha_atual.strip()
                 linha_atual = linha
-            elif linha.strip() and not re.match(r"^\d", linha) and linha_atual:
+            elif linha.strip() and not PADRAO_INICIO_NUMERICO.match(linha) and linha_atual:
                 linha_atual = f"{linha_atual.strip()} {linha.strip()}"
             elif not linha.strip() or "Ano" in linha or "HISTÓRICO" in linha:
                 if linha_atual:
-                    linhas_mescladas.append(linha_atual.strip())
+                    yield linha_atual.strip()
                 linha_atual = ""
 
         if linha_atual:
-            linhas_mescladas.append(linha_atual.strip())
-
-        return linhas_mescladas
+            yield linha_atual.strip()
 
     @staticmethod
     def _analisar_disciplina(linha: str) -> dict[str, str] | None:
         """Converte uma linha de disciplina em um dicionário estruturado."""
-        padrao_inicio = r"(\d{4})\s+(\d+)\s+(\d+)\s+([A-Z])\s+([A-Z][A-Z]?)\s+(\d+)\s+"
-        resultado_inicio = re.match(padrao_inicio, linha)
+        resultado_inicio = PADRAO_CAMPOS_INICIAIS.match(linha)
 
         if not resultado_inicio:
             return None
 
         # Extrai campos iniciais
-        campos = ["ano", "semestre", "termo", "turno", "turma", "codigo"]
-        info_inicial = dict(zip(campos, resultado_inicio.groups(), strict=False))
+        info_inicial = dict(zip(CAMPOS_INICIAIS, resultado_inicio.groups(), strict=False))
 
         resto_linha = linha[resultado_inicio.end() :].strip()
         partes = resto_linha.split("UNIDADE CURRICULAR")
@@ -76,8 +111,7 @@ class LeitorHistoricoAcademico:
         campos = info_restante.split()
 
         # Encontra o índice final
-        marcadores_final = ["CURSO", "APROVADO", "REPROV./FREQ", "CUMPRIDO", "REPROVADO"]
-        final = next((campos.index(marcador) for marcador in marcadores_final if marcador in campos), len(campos))
+        final = next((campos.index(marcador) for marcador in MARCADORES_FINAL if marcador in campos), len(campos))
         campos = campos[: final + 1]
 
         # Processa grupo e campos específicos
@@ -87,8 +121,7 @@ class LeitorHistoricoAcademico:
         campos = campos[tamanho_grupo:]
 
         # Normalização de alguns campos específicos
-        casos_especiais = {("NÃO", "CUMPRIDO"): "NÃO CUMPRIDO", ("EM", "CURSO"): "EM CURSO"}
-        for caso, substituicao in casos_especiais.items():
+        for caso, substituicao in CASOS_ESPECIAIS.items():
             if campos[-2:] == list(caso):
                 campos[-2:] = [substituicao]
 
@@ -99,30 +132,51 @@ class LeitorHistoricoAcademico:
             campos.insert(2, "-")
 
         # Mapeamento de situações
-        mapeamento_situacao = {"REPROV./FREQ": "REPROVADO", "CUMPRIDO": "APROVADO", "NÃO CUMPRIDO": "REPROVADO"}
-        campos[6] = mapeamento_situacao.get(campos[6], campos[6])
+        campos[6] = MAPEAMENTO_SITUACAO.get(campos[6], campos[6])
 
         # Campos finais
-        campos_finais = ["categoria", "faltas", "frequencia", "creditos", "carga_horaria", "conceito", "situacao"]
-        info_inicial.update(zip(campos_finais, campos, strict=False))
+        info_inicial.update(zip(CAMPOS_FINAIS, campos, strict=False))
 
         return info_inicial
 
     @classmethod
     def from_pdf(cls, path: str) -> dict[str, dict | list[dict]]:
-        """Converte um PDF de histórico acadêmico para um dicionário JSON."""
+        """
+        Converte um PDF de histórico acadêmico para um dicionário JSON.
+        O texto flui em um pipeline de geradores (páginas -> linhas -> informações do aluno -> linhas mescladas
+        -> disciplinas), sem montar o texto completo do PDF em memória.
+        São registradas as etapas de abertura do PDF, extração do texto e análise das linhas.
+        """
+        inicio = time.perf_counter()
         leitor = PdfReader(path)
-        texto_completo = "\n".join(pagina.extract_text() for pagina in leitor.pages)
-
-        info_aluno = cls._extrair_informacoes_aluno(texto_completo)
-        linhas = texto_completo.split("\n")
-        linhas_mescladas = cls._mesclar_linhas_quebradas(linhas)
+        tempos = {"abertura": time.perf_counter() - inicio, "extracao": 0.0}
 
+        inicio = time.perf_counter()
+        info_encontrada: dict[str, str | float] = {}
+        linhas = cls._extrair_informacoes_aluno(cls._extrair_linhas(leitor, tempos), info_encontrada)
         disciplinas = [
             disciplina
-            for linha in linhas_mescladas
-            if re.match(r"^\d{4}\s+\d+\s+\d+", linha)
+            for linha in cls._mesclar_linhas_quebradas(linhas)
+            if PADRAO_LINHA_DISCIPLINA.match(linha)
             if (disciplina := cls._analisar_disciplina(linha))
         ]
 
+        tempos["analise"] = time.perf_counter() - inicio - tempos["extracao"]
+        for etapa, duracao in tempos.items():
+            registrar_etapa(f"historico_pdf.{etapa}", duracao)
+
+        info_aluno = {chave: info_encontrada[chave] for chave in PADROES_ALUNO if chave in info_encontrada}
         return {"informacoes_aluno": info_aluno, "disciplinas": disciplinas}
+
+    @classmethod
+    def from_bytes(cls, conteudo: bytes) -> dict[str, dict | list[dict]]:
+        """Converte o conteúdo de um PDF de histórico acadêmico para um dicionário JSON."""
+        return cls.from_pdf(io.BytesIO(conteudo))
+
+    @staticmethod
+    def chave_conteudo(conteudo: bytes) -> str:
+        """
+        Calcula a chave de cache de um PDF: a versão do parser e o SHA-256 do conteúdo.
+        Uploads do mesmo arquivo produzem a mesma chave, e uma nova versão do parser invalida as anteriores.
+        """
+        return f"v{VERSAO_PARSER}-{hashlib.sha256(conteudo).hexdigest()}"
@@ -0,0 +1,198 @@
+import numpy as np
+
+DIAS_SEMANA = ("SEGUNDA", "TERÇA", "QUARTA", "QUINTA", "SEXTA", "SÁBADO", "DOMINGO")
+
+
+class IndiceHorario:
+    """
+    Índice compilado dos horários de uma lista de disciplinas ofertadas.
+    Cada par (dia, horário) é convertido uma única vez em um intervalo (dia, início, fim) em minutos,
+    armazenado em arrays NumPy, permitindo detectar conflitos sem reprocessar strings.
+    """
+
+    def __init__(self, disciplinas: list[dict]) -> None:
+        """
+        Compila os horários das disciplinas informadas.
+
+        Args:
+            disciplinas: Lista de dicionários com as chaves "dias" e "horarios".
+        """
+        dias_idx = {dia: idx for idx, dia in enumerate(DIAS_SEMANA)}
+        ofertas, dias, inicios, fins = [], [], [], []
+        for oferta, disciplina in enumerate(disciplinas):
+            for dia, horario in zip(disciplina["dias"], disciplina["horarios"], strict=False):
+                inicio, fim = map(horario_para_minutos, horario.split(" - "))
+                if fim <= inicio:
+                    # Intervalos vazios não ocupam horário e não geram conflitos.
+                    continue
+                ofertas.append(oferta)
+                dias.append(dias_idx.setdefault(dia, len(dias_idx)))
+                inicios.append(inicio)
+                fins.append(fim)
+
+        self.num_ofertas = len(disciplinas)
+        self.ofertas = np.array(ofertas, dtype=np.int32)
+        self.dias = np.array(dias, dtype=np.int8)
+        self.inicios = np.array(inicios, dtype=np.int16)
+        self.fins = np.array(fins, dtype=np.int16)
+
+    @classmethod
+    def de_arrays(
+        cls, num_ofertas: int, ofertas: np.ndarray, dias: np.ndarray, inicios: np.ndarray, fins: np.ndarray
+    ) -> "IndiceHorario":
+        """
+        Cria o índice a partir de arrays já compilados (ex.: mapeados em memória de um artefato da matriz),
+        sem copiá-los.
+
+        Args:
+            num_ofertas: Quantidade de ofertas indexadas.
+            ofertas: Índice da oferta de cada intervalo.
+            dias: Índice do dia (em DIAS_SEMANA) de cada intervalo.
+            inicios: Início de cada intervalo em minutos.
+            fins: Fim de cada intervalo em minutos.
+
+        Returns:
+            O índice.
+        """
+        indice = cls.__new__(cls)
+        indice.num_ofertas = num_ofertas
+        indice.ofertas = ofertas
+        indice.dias = dias
+        indice.inicios = inicios
+        indice.fins = fins
+        return indice
+
+    def selecionar(self, posicoes: list[int]) -> "IndiceHorario":
+        """
+        Restringe o índice às ofertas informadas, renumerando-as conforme a sua posição na lista.
+
+        Args:
+            posicoes: Índices das ofertas a manter.
+
+        Returns:
+            Novo índice com os intervalos das ofertas selecionadas.
+        """
+        novas_posicoes = np.full(self.num_ofertas, -1, dtype=np.int32)
+        novas_posicoes[np.asarray(posicoes, dtype=np.int64)] = np.arange(len(posicoes), dtype=np.int32)
+        ofertas = novas_posicoes[self.ofertas]
+        mantidos = ofertas >= 0
+        return IndiceHorario.de_arrays(
+            len(posicoes), ofertas[mantidos], self.dias[mantidos], self.inicios[mantidos], self.fins[mantidos]
+        )
+
+    def pares_em_conflito(self) -> np.ndarray:
+        """
+        Calcula todos os pares de ofertas com sobreposição de horário em algum dia.
+        Para cada dia, os intervalos são ordenados pelo início e, com uma busca binária sobre os fins,
+        obtém-se de uma vez todos os intervalos posteriores que começam antes do fim de cada um.
+        O custo é O(n log n + k), sendo k o número de pares em conflito.
+
+        Returns:
+            Array (k, 2) com os índices das ofertas em conflito, com o menor índice na primeira coluna.
+        """
+        blocos = []
+        for dia in np.unique(self.dias):
+            ordem = np.flatnonzero(self.dias == dia)
+            ordem = ordem[np.argsort(self.inicios[ordem], kind="stable")]
+            inicios = self.inicios[ordem]
+            fins = self.fins[ordem]
+
+            # Intervalos j > i (na ordem pelo início) sobrepõem i quando começam antes do fim de i.
+            limites = np.searchsorted(inicios, fins, side="left")
+            quantidades = np.maximum(limites - np.arange(len(ordem)) - 1, 0)
+            total = int(quantidades.sum())
+            if total == 0:
+                continue
+
+            a = np.repeat(np.arange(len(ordem)), quantidades)
+            deslocamentos = np.arange(total) - np.repeat(np.cumsum(quantidades) - quantidades, quantidades)
+            b = a + 1 + deslocamentos
+            blocos.append(np.column_stack((self.ofertas[ordem[a]], self.ofertas[ordem[b]])))
+
+        if not blocos:
+            return np.empty((0, 2), dtype=np.int32)
+
+        pares = np.concatenate(blocos)
+        pares = pares[pares[:, 0] != pares[:, 1]]
+        pares.sort(axis=1)
+
+        # Remove pares repetidos (ofertas que conflitam em mais de um dia).
+        n = self.num_ofertas
+        chaves = np.unique(pares[:, 0].astype(np.int64) * n + pares[:, 1])
+        return np.column_stack((chaves // n, chaves % n)).astype(np.int32)
+
+    def cliques_maximais(self) -> list[tuple[int, ...]]:
+        """
+        Calcula, para cada dia, os conjuntos maximais de ofertas que se sobrepõem mutuamente.
+        Em um grafo de intervalos, cada clique maximal corresponde ao conjunto de intervalos ativos
+        no instante em que um fim sucede um início na varredura dos eventos ordenados.
+
+        Returns:
+            Lista de tuplas ordenadas com os índices das ofertas de cada clique (com ao menos duas ofertas),
+            sem repetições entre dias.
+        """
+        cliques: dict[tuple[int, ...], None] = {}
+        for dia in np.unique(self.dias):
+            selecionados = np.flatnonzero(self.dias == dia)
+            instantes = np.concatenate((self.fins[selecionados], self.inicios[selecionados]))
+            # No mesmo instante, fins vêm antes de inícios: um intervalo que termina às 10h00 não conflita
+            # com outro que começa às 10h00.
+            inicio_evento = np.repeat((False, True), len(selecionados))
+            ofertas = np.tile(self.ofertas[selecionados], 2)
+
+            ativos: dict[int, int] = {}
+            adicionou = False
+            for evento in np.lexsort((inicio_evento, instantes)).tolist():
+                oferta = int(ofertas[evento])
+                if inicio_evento[evento]:
+                    ativos[oferta] = ativos.get(oferta, 0) + 1
+                    adicionou = True
+                    continue
+
+                if adicionou and len(ativos) > 1:
+                    cliques.setdefault(tuple(sorted(ativos)), None)
+                adicionou = False
+                ativos[oferta] -= 1
+                if not ativos[oferta]:
+                    del ativos[oferta]
+
+        return list(cliques)
+
+    def intervalos_por_dia(self) -> dict[int, list[tuple[int, int, int]]]:
+        """
+        Agrupa os intervalos compilados por dia da semana. Intervalos sobrepostos de uma mesma oferta no mesmo dia
+        (ex.: um horário listado duas vezes) são unidos, já que uma oferta não conflita consigo mesma.
+
+        Returns:
+            Dicionário que mapeia o índice do dia a uma lista de tuplas (oferta, início, fim).
+        """
+        por_oferta: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        for oferta, dia, inicio, fim in zip(
+            self.ofertas.tolist(), self.dias.tolist(), self.inicios.tolist(), self.fins.tolist(), strict=True
+        ):
+            por_oferta.setdefault((dia, oferta), []).append((inicio, fim))
+
+        intervalos: dict[int, list[tuple[int, int, int]]] = {}
+        for (dia, oferta), horarios in por_oferta.items():
+            unidos: list[list[int]] = []
+            for inicio, fim in sorted(horarios):
+                if unidos and inicio < unidos[-1][1]:
+                    unidos[-1][1] = max(unidos[-1][1], fim)
+                else:
+                    unidos.append([inicio, fim])
+            intervalos.setdefault(dia, []).extend((oferta, inicio, fim) for inicio, fim in unidos)
+        return intervalos
+
+
+def horario_para_minutos(horario_str: str) -> int:
+    """
+    Converte uma string de horário no formato "HHhMM" para minutos.
+
+    Args:
+        horario_str: String no formato "HHhMM" (ex: "14h30").
+
+    Returns:
+        Quantidade total de minutos.
+    """
+    hora, minuto = map(int, horario_str.split("h"))
+    return hora * 60 + minuto
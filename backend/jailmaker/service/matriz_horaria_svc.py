@@ -1,60 +1,132 @@
 import re
 
+import numpy as np
 import pandas as pd
 
+PADRAO_CURSO = re.compile(r"^([^\n]*?) ?(?:\n|$)")
+# O período aparece como "Período N" ou "Termo N" na linha seguinte ao curso.
+PADRAO_PERIODO = re.compile(r"^[^\n]*\n[^\n]*?(?:Período|Termo) (\d+)")
+PADRAO_TURMA_PROFESSOR = re.compile(r"^([A-Z]+[A-Z0-9]*)\s*-\s*(.+)")
+PADRAO_TURMA_FINAL = re.compile(r"([A-Z]+)$")
+PADRAO_HORARIO = re.compile(r"^(\d{1,2})[hH](\d{2})\s*-\s*(\d{1,2})[hH](\d{2})")
+
 
 class LeitorMatrizHoraria:
+    """
+    Lê a planilha da matriz horária e a converte em um DataFrame com uma linha por oferta.
+    Todas as etapas usam operações vetorizadas do pandas, sem percorrer as células em Python.
+    """
+
     def __init__(self, path: str) -> None:
         self.path = path
 
     def ler(self) -> pd.DataFrame:
-        df = pd.read_excel(self.path)
+        return self.converter(pd.read_excel(self.path))
+
+    def converter(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Converte a planilha já carregada em um DataFrame com uma linha por oferta."""
         df["Unnamed: 0"] = df["Unnamed: 0"].ffill()
-        df = df.T
-        df[0] = df[0].ffill()
-        df = self._gerar_disciplinas(df)
-        df = self._limpar_dados(df)
+        return self.combinar(self.extrair(df))
+
+    def extrair(self, df: pd.DataFrame, linhas: np.ndarray | None = None) -> pd.DataFrame:
+        """
+        Extrai e normaliza as ofertas da planilha já carregada, uma linha por horário de cada oferta, com a posição
+        da célula de origem em "Linha" e "Coluna". A primeira coluna (curso e período) já deve estar preenchida
+        em todas as linhas de horário.
+
+        Args:
+            df: Planilha já carregada.
+            linhas: Linhas de horário (ímpares) a extrair (padrão: todas).
+
+        Returns:
+            DataFrame com os horários das ofertas, ordenados por coluna (dia) e depois por linha (horário).
+        """
+        return self._limpar_dados(self._gerar_disciplinas(df, linhas))
+
+    def combinar(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Combina os horários produzidos por `extrair` em um DataFrame com uma linha por oferta."""
         df = self._renomear_colunas(df)
-        df = self._combinar_horarios(df)
-        return df
+        return self._combinar_horarios(df)
 
-    def _gerar_disciplinas(self, df: pd.DataFrame) -> pd.DataFrame:
-        linhas = []
-        if df.shape[0] < 3 or df.shape[1] < 3:
-            return pd.DataFrame(linhas)
-
-        for i in range(2, df.shape[0]):
-            dia_semana = df.iloc[i, 0]
-            for col in range(1, df.shape[1], 2):
-                if pd.isna(df.iloc[1, col]):
-                    continue
-                if col + 1 >= df.shape[1]:
-                    break
-
-                horario = df.iloc[1, col]
-                nome_disciplina = df.iloc[i, col]
-                turma_professor = df.iloc[i, col + 1]
-                curso_periodo = df.iloc[0, col]
-
-                if pd.notna(nome_disciplina) and pd.notna(turma_professor):
-                    linha = {
-                        "Dia da Semana": dia_semana,
-                        "Horário": horario,
-                        "Nome da Disciplina": nome_disciplina,
-                        "Turma - Professor": turma_professor,
-                        "Curso - Período": curso_periodo,
-                    }
-                    linhas.append(linha)
-
-        return pd.DataFrame(linhas)
+    @staticmethod
+    def para_registros(df: pd.DataFrame) -> list[dict]:
+        """
+        Converte o DataFrame produzido por `ler` para o formato JSON da matriz horária usado pela API,
+        com nomes, professores e dias em maiúsculas.
+        """
+        return [
+            {
+                "nome": linha.disciplina.upper(),
+                "professor": linha.professor.upper(),
+                "turma": linha.turma,
+                "horarios": linha.horario,
+                "dias": [dia.upper() for dia in linha.dia],
+                "curso": linha.curso,
+                "termo": linha.periodo,
+            }
+            for linha in df.itertuples(index=False)
+        ]
+
+    def _gerar_disciplinas(self, df: pd.DataFrame, linhas: np.ndarray | None = None) -> pd.DataFrame:
+        """
+        Extrai as ofertas da planilha. As linhas ímpares trazem o horário (na segunda coluna) e o nome
+        das disciplinas de cada dia; a linha seguinte traz a turma e o professor. As ofertas são produzidas
+        ordenadas por coluna (dia) e depois por linha (horário).
+        """
+        if df.shape[1] < 3 or df.shape[0] < 3:
+            return pd.DataFrame([])
+
+        valores = df.to_numpy(dtype=object)
+        if linhas is None:
+            linhas = np.arange(1, valores.shape[0] - 1, 2)
+        else:
+            linhas = np.asarray(linhas, dtype=np.intp)
+        colunas = np.arange(2, valores.shape[1])
+
+        dias = pd.Series(valores[0]).ffill().to_numpy(dtype=object)[colunas]
+        horarios = valores[linhas, 1]
+        cursos_periodos = valores[linhas, 0]
+        nomes = valores[np.ix_(linhas, colunas)].T
+        turmas_professores = valores[np.ix_(linhas + 1, colunas)].T
+
+        mascara = pd.notna(nomes) & pd.notna(turmas_professores) & pd.notna(horarios)
+        posicoes_coluna, posicoes_linha = np.nonzero(mascara)
+        return pd.DataFrame(
+            {
+                "Dia da Semana": dias[posicoes_coluna],
+                "Horário": horarios[posicoes_linha],
+                "Nome da Disciplina": nomes[mascara],
+                "Turma - Professor": turmas_professores[mascara],
+                "Curso - Período": cursos_periodos[posicoes_linha],
+                "Linha": linhas[posicoes_linha],
+                "Coluna": colunas[posicoes_coluna],
+            }
+        )
 
     def _limpar_dados(self, df: pd.DataFrame) -> pd.DataFrame:
-        df[["Curso", "Período"]] = (
-            df["Curso - Período"].str.replace("\n\n\n\n", "").apply(self._separar_curso_periodo).apply(pd.Series)
-        )
-        df[["Turma", "Professor"]] = df["Turma - Professor"].apply(self._separar_turma_professor).apply(pd.Series)
-        df["Horário"] = df["Horário"].apply(self._normalizar_horario)
-        df.update(df.loc[:, df.columns != "ID"].apply(lambda x: x.str.strip() if x.dtype == "object" else x))
+        if df.empty:
+            return df
+
+        curso_periodo = df["Curso - Período"].str.replace("\n\n\n\n", "")
+        df["Curso"] = curso_periodo.str.extract(PADRAO_CURSO, expand=False)
+        df["Período"] = curso_periodo.str.extract(PADRAO_PERIODO, expand=False)
+
+        turma_professor = df["Turma - Professor"]
+        separados = turma_professor.str.extract(PADRAO_TURMA_PROFESSOR)
+        sem_codigo = separados[0].isna()
+        turma_final = turma_professor.str.extract(PADRAO_TURMA_FINAL, expand=False).fillna("N")
+        turma_padrao = turma_final.where(~turma_professor.str.strip().str.isalpha(), "I")
+        df["Turma"] = separados[0].where(~sem_codigo, turma_padrao)
+        df["Professor"] = separados[1].where(~sem_codigo, turma_professor)
+
+        horario = df["Horário"].str.extract(PADRAO_HORARIO)
+        normalizado = horario[0].str.zfill(2) + "h" + horario[1] + " - " + horario[2].str.zfill(2) + "h" + horario[3]
+        df["Horário"] = normalizado.where(horario[0].notna(), df["Horário"])
+
+        # Valores que não são texto são mantidos como estão.
+        for coluna in df.select_dtypes(include="object").columns:
+            sem_espacos = df[coluna].str.strip()
+            df[coluna] = sem_espacos.where(sem_espacos.notna(), df[coluna])
         return df
 
     def _renomear_colunas(self, df: pd.DataFrame) -> pd.DataFrame:
@@ -76,41 +148,3 @@ class LeitorMatrizHoraria:
             )
             .reset_index()
         )
-
-    @staticmethod
-    def _separar_curso_periodo(texto: str) -> tuple[str, str | None]:
-        partes = re.split(r" \n|\n", texto)
-        curso = partes[0]
-        periodo = re.search(r"Período (\d+)", partes[1]).group(1) if len(partes) > 1 else None
-        return curso, periodo
-
-    @staticmethod
-    def _separar_turma_professor(texto: str) -> tuple[str, str]:
-        correspondencia = re.match(r"([A-Z]+[A-Z0-9]*)\s*-\s*(.+)", texto)
-        if correspondencia:
-            codigo_turma = correspondencia.group(1).strip()
-            professor = correspondencia.group(2).strip()
-        else:
-            codigo_turma = LeitorMatrizHoraria._determinar_codigo_turma(texto)
-            professor = texto.strip()
-        return codigo_turma, professor
-
-    @staticmethod
-    def _determinar_codigo_turma(texto: str) -> str:
-        if texto.strip().isalpha():
-            return "I"
-
-        correspondencia_maiuscula = re.search(r"[A-Z]+$", texto)
-        if correspondencia_maiuscula:
-            return correspondencia_maiuscula.group(0)
-
-        return "N"
-
-    @staticmethod
-    def _normalizar_horario(horario: str) -> str:
-        padrao = re.compile(r"(\d{1,2})[hH](\d{2})\s*-\s*(\d{1,2})[hH](\d{2})")
-        correspondencia = padrao.match(horario)
-        if correspondencia:
-            hora_inicio, minuto_inicio, hora_fim, minuto_fim = correspondencia.groups()
-            return f"{int(hora_inicio):02d}h{minuto_inicio} - {int(hora_fim):02d}h{minuto_fim}"
-        return horario
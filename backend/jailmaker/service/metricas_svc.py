@@ -0,0 +1,162 @@
+import bisect
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Limites superiores (em segundos) dos buckets dos histogramas de latência.
+BUCKETS_LATENCIA = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Caracteres escapados nos valores dos rótulos, conforme o formato texto do Prometheus.
+ESCAPES_ROTULO = str.maketrans({"\\": "\\\\", "\n": "\\n", '"': '\\"'})
+
+# Etapas medidas na requisição em andamento (None fora de uma requisição instrumentada).
+_ETAPAS: ContextVar[list[tuple[str, float]] | None] = ContextVar("etapas", default=None)
+
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus: contagem por bucket, soma e quantidade de observações."""
+
+    __slots__ = ("buckets", "contagens", "soma", "quantidade")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.contagens = [0] * len(buckets)
+        self.soma = 0.0
+        self.quantidade = 0
+
+    def observar(self, valor: float) -> None:
+        posicao = bisect.bisect_left(self.buckets, valor)
+        if posicao < len(self.buckets):
+            self.contagens[posicao] += 1
+        self.soma += valor
+        self.quantidade += 1
+
+
+class RegistroMetricas:
+    """
+    Registro de contadores, medidores e histogramas rotulados, exportados no formato texto do Prometheus.
+    As métricas são mantidas em memória, por processo.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS_LATENCIA) -> None:
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._descricoes: dict[str, tuple[str, str]] = {}
+        self._contadores: dict[str, dict[tuple, float]] = {}
+        self._medidores: dict[str, dict[tuple, float]] = {}
+        self._histogramas: dict[str, dict[tuple, Histograma]] = {}
+
+    def descrever(self, nome: str, tipo: str, descricao: str) -> None:
+        """Define o tipo ("counter", "gauge" ou "histogram") e o texto de ajuda de uma métrica."""
+        self._descricoes[nome] = (tipo, descricao)
+
+    def incrementar(self, nome: str, valor: float = 1, **rotulos: str) -> None:
+        """Incrementa um contador."""
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            serie = self._contadores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def definir(self, nome: str, valor: float, **rotulos: str) -> None:
+        """Define o valor atual de um medidor."""
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            self._medidores.setdefault(nome, {})[chave] = valor
+
+    def observar(self, nome: str, valor: float, **rotulos: str) -> None:
+        """Registra uma observação (em segundos) em um histograma."""
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            serie = self._histogramas.setdefault(nome, {})
+            histograma = serie.get(chave)
+            if histograma is None:
+                histograma = serie[chave] = Histograma(self.buckets)
+            histograma.observar(valor)
+
+    def exportar(self) -> str:
+        """Exporta todas as métricas no formato texto de exposição do Prometheus (versão 0.0.4)."""
+        linhas = []
+        with self._lock:
+            for tipo, series in (("counter", self._contadores), ("gauge", self._medidores)):
+                for nome, serie in sorted(series.items()):
+                    linhas.extend(self._cabecalho(nome, tipo))
+                    linhas.extend(f"{nome}{_rotulos(chave)} {_numero(valor)}" for chave, valor in sorted(serie.items()))
+
+            for nome, serie in sorted(self._histogramas.items()):
+                linhas.extend(self._cabecalho(nome, "histogram"))
+                for chave, histograma in sorted(serie.items()):
+                    acumulado = 0
+                    for limite, contagem in zip(histograma.buckets, histograma.contagens, strict=True):
+                        acumulado += contagem
+                        linhas.append(f"{nome}_bucket{_rotulos(chave, le=_numero(limite))} {acumulado}")
+                    linhas.append(f"{nome}_bucket{_rotulos(chave, le='+Inf')} {histograma.quantidade}")
+                    linhas.append(f"{nome}_sum{_rotulos(chave)} {_numero(histograma.soma)}")
+                    linhas.append(f"{nome}_count{_rotulos(chave)} {histograma.quantidade}")
+        return "\n".join(linhas) + "\n"
+
+    def _cabecalho(self, nome: str, tipo: str) -> list[str]:
+        tipo, descricao = self._descricoes.get(nome, (tipo, ""))
+        return [f"# HELP {nome} {descricao}", f"# TYPE {nome} {tipo}"] if descricao else [f"# TYPE {nome} {tipo}"]
+
+
+METRICAS = RegistroMetricas()
+METRICAS.descrever("jailmaker_etapa_duracao_segundos", "histogram", "Duração de cada etapa do processamento.")
+
+
+@contextmanager
+def coletar_etapas() -> Iterator[list[tuple[str, float]]]:
+    """
+    Coleta as etapas medidas (por `medir_etapa` e `registrar_etapa`) no contexto atual enquanto o bloco executa.
+    Usado pelo middleware para montar o cabeçalho Server-Timing de cada requisição.
+
+    Yields:
+        Lista, preenchida durante o bloco, de pares (nome da etapa, duração em segundos) na ordem de conclusão.
+    """
+    etapas: list[tuple[str, float]] = []
+    token = _ETAPAS.set(etapas)
+    try:
+        yield etapas
+    finally:
+        _ETAPAS.reset(token)
+
+
+def registrar_etapa(nome: str, duracao: float) -> None:
+    """
+    Registra a duração (em segundos) de uma etapa no histograma de etapas e, dentro de `coletar_etapas`,
+    na lista de etapas da requisição em andamento.
+    """
+    METRICAS.observar("jailmaker_etapa_duracao_segundos", duracao, etapa=nome)
+    etapas = _ETAPAS.get()
+    if etapas is not None:
+        etapas.append((nome, duracao))
+
+
+@contextmanager
+def medir_etapa(nome: str) -> Iterator[None]:
+    """Mede a duração do bloco e a registra como a etapa `nome` (ver `registrar_etapa`)."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        registrar_etapa(nome, time.perf_counter() - inicio)
+
+
+def server_timing(etapas: list[tuple[str, float]]) -> str:
+    """Formata as etapas como o valor de um cabeçalho Server-Timing, com as durações em milissegundos."""
+    return ", ".join(f"{nome};dur={duracao * 1000:.2f}" for nome, duracao in etapas)
+
+
+def _rotulos(chave: tuple, **extras: str) -> str:
+    """Formata os rótulos de uma série (`{nome="valor",...}`), escapando os valores."""
+    pares = [*chave, *extras.items()]
+    if not pares:
+        return ""
+    escapados = (f'{nome}="{str(valor).translate(ESCAPES_ROTULO)}"' for nome, valor in pares)
+    return "{" + ",".join(escapados) + "}"
+
+
+def _numero(valor: float) -> str:
+    """Formata um número no formato do Prometheus, sem casas decimais desnecessárias."""
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
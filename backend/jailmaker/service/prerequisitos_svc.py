@@ -0,0 +1,108 @@
+import numpy as np
+
+CRITERIOS_PESO = ("diretos", "transitivos", "caminho_critico")
+
+
+class GrafoPrerequisitos:
+    """
+    Grafo de pré-requisitos entre as disciplinas de um currículo, indexado pelos identificadores inteiros
+    atribuídos em `Curriculo`.
+    Ordem topológica, fechos transitivos (como máscaras de bits) e a cadeia mais longa de dependentes de cada
+    disciplina são calculados uma única vez, na construção.
+    """
+
+    def __init__(
+        self,
+        mascaras_prerequisitos: tuple[int, ...],
+        frequencias_prerequisito: tuple[int, ...],
+        nomes: tuple[str, ...],
+    ) -> None:
+        """
+        Constrói o grafo.
+
+        Args:
+            mascaras_prerequisitos: Máscara de bits dos pré-requisitos diretos de cada disciplina.
+            frequencias_prerequisito: Quantidade de disciplinas das quais cada disciplina é pré-requisito direto.
+            nomes: Nome de cada disciplina, indexado pelo identificador (usado nas mensagens de erro).
+
+        Raises:
+            ValueError: Se houver um ciclo de pré-requisitos.
+        """
+        num_disciplinas = len(mascaras_prerequisitos)
+        self.prerequisitos = mascaras_prerequisitos
+        dependentes = [0] * num_disciplinas
+        for disciplina, mascara in enumerate(mascaras_prerequisitos):
+            for prereq in _bits(mascara):
+                dependentes[prereq] |= 1 << disciplina
+        self.dependentes = tuple(dependentes)
+
+        self.ordem_topologica = self._ordenar(nomes)
+
+        fecho_prerequisitos = [0] * num_disciplinas
+        for disciplina in self.ordem_topologica:
+            for prereq in _bits(mascaras_prerequisitos[disciplina]):
+                fecho_prerequisitos[disciplina] |= (1 << prereq) | fecho_prerequisitos[prereq]
+        self.fecho_prerequisitos = tuple(fecho_prerequisitos)
+
+        fecho_dependentes = [0] * num_disciplinas
+        cadeia_mais_longa = np.zeros(num_disciplinas, dtype=np.int16)
+        for disciplina in reversed(self.ordem_topologica):
+            for dependente in _bits(self.dependentes[disciplina]):
+                fecho_dependentes[disciplina] |= (1 << dependente) | fecho_dependentes[dependente]
+                cadeia_mais_longa[disciplina] = max(cadeia_mais_longa[disciplina], cadeia_mais_longa[dependente] + 1)
+        self.fecho_dependentes = tuple(fecho_dependentes)
+        self.cadeia_mais_longa = cadeia_mais_longa
+        self.total_dependentes = np.array([mascara.bit_count() for mascara in fecho_dependentes], dtype=np.int16)
+
+        self._pesos = {
+            "diretos": tuple(1 + frequencia for frequencia in frequencias_prerequisito),
+            "transitivos": tuple((1 + self.total_dependentes).tolist()),
+            "caminho_critico": tuple((1 + self.cadeia_mais_longa).tolist()),
+        }
+
+    def pesos(self, criterio: str = "diretos") -> tuple[int, ...]:
+        """
+        Retorna o peso de cada disciplina no objetivo da grade ideal, indexado pelo identificador.
+        Todos os critérios partem de 1 (valor base) e somam:
+
+        - "diretos": a quantidade de disciplinas das quais ela é pré-requisito direto;
+        - "transitivos": a quantidade de disciplinas que dependem dela, direta ou indiretamente;
+        - "caminho_critico": o comprimento da cadeia mais longa de disciplinas que dependem dela.
+
+        Args:
+            criterio: Um de CRITERIOS_PESO.
+
+        Raises:
+            ValueError: Se o critério for inválido.
+        """
+        if criterio not in self._pesos:
+            raise ValueError(f"Critério de peso inválido: {criterio}")
+        return self._pesos[criterio]
+
+    def _ordenar(self, nomes: tuple[str, ...]) -> tuple[int, ...]:
+        """Ordena as disciplinas de modo que cada uma venha depois dos seus pré-requisitos (algoritmo de Kahn)."""
+        pendentes = [mascara.bit_count() for mascara in self.prerequisitos]
+        prontas = [disciplina for disciplina in range(len(nomes)) if not pendentes[disciplina]]
+        ordem = []
+        while prontas:
+            disciplina = prontas.pop(0)
+            ordem.append(disciplina)
+            for dependente in _bits(self.dependentes[disciplina]):
+                pendentes[dependente] -= 1
+                if not pendentes[dependente]:
+                    prontas.append(dependente)
+
+        if len(ordem) < len(nomes):
+            ciclo = sorted(nomes[disciplina] for disciplina, pendente in enumerate(pendentes) if pendente)
+            raise ValueError(f"Ciclo de pré-requisitos entre: {', '.join(ciclo)}")
+        return tuple(ordem)
+
+
+def _bits(mascara: int) -> list[int]:
+    """Lista as posições dos bits ligados da máscara."""
+    posicoes = []
+    while mascara:
+        menor = mascara & -mascara
+        posicoes.append(menor.bit_length() - 1)
+        mascara ^= menor
+    return posicoes
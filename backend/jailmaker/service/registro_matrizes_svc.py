@@ -0,0 +1,173 @@
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from jailmaker.service.artefato_matriz_svc import ARQUIVO_ATUAL, carregar_artefato
+from jailmaker.service.indice_horario_svc import IndiceHorario
+from jailmaker.service.versao_svc import versao_matriz_horaria
+
+
+class MatrizNaoEncontrada(Exception):
+    """Indica que o identificador informado não corresponde a nenhuma matriz registrada."""
+
+
+class MatrizRegistrada(NamedTuple):
+    """
+    Matriz horária mantida no servidor, já indexada.
+
+    Attributes:
+        nome: Nome da matriz (None para matrizes enviadas na requisição).
+        versao: Versão da matriz (hash do conteúdo; None se ainda não calculada).
+        matriz_horaria: Lista de dicionários com as ofertas.
+        indice_horario: Índice de horários de todas as ofertas (None se não pré-calculado).
+    """
+
+    nome: str | None
+    versao: str | None
+    matriz_horaria: list[dict]
+    indice_horario: IndiceHorario | None = None
+
+
+class RegistroMatrizes:
+    """
+    Registro das matrizes horárias carregadas no servidor, que podem ser referenciadas pelas requisições
+    pelo nome ou pela versão em vez de enviadas por inteiro.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._matrizes: dict[str, MatrizRegistrada] = {}
+        # Versão de cada artefato já registrado, pelo nome da matriz.
+        self._artefatos: dict[str, str] = {}
+        self._diretorio_artefatos: Path | None = None
+        self.intervalo_verificacao = 0.0
+        self._verificado_em = float("-inf")
+
+    def registrar(
+        self,
+        matriz_horaria: list[dict],
+        nome: str | None = None,
+        versao: str | None = None,
+        indice_horario: IndiceHorario | None = None,
+    ) -> MatrizRegistrada:
+        """
+        Registra a matriz pela versão e, se informado, pelo nome (substituindo a matriz anterior com o mesmo nome).
+        A versão substituída deixa de ser registrada, exceto se outro nome ainda apontar para ela.
+        Registrar novamente o mesmo objeto com o mesmo nome não tem custo.
+
+        Args:
+            matriz_horaria: Lista de dicionários com as ofertas.
+            nome: Nome da matriz.
+            versao: Versão da matriz, se já conhecida (calculada a partir do conteúdo se omitida).
+            indice_horario: Índice de horários das ofertas, se já compilado (construído se omitido).
+
+        Returns:
+            A matriz registrada.
+        """
+        if nome is not None:
+            with self._lock:
+                atual = self._matrizes.get(nome)
+            if atual is not None and atual.matriz_horaria is matriz_horaria:
+                return atual
+
+        registrada = MatrizRegistrada(
+            nome,
+            versao or versao_matriz_horaria(matriz_horaria),
+            matriz_horaria,
+            indice_horario or IndiceHorario(matriz_horaria),
+        )
+        with self._lock:
+            self._matrizes[registrada.versao] = registrada
+            if nome is not None:
+                anterior = self._matrizes.get(nome)
+                self._matrizes[nome] = registrada
+                if anterior is not None and anterior.versao != registrada.versao:
+                    self._descartar_versao(anterior.versao)
+        return registrada
+
+    def _descartar_versao(self, versao: str) -> None:
+        """Remove a versão do registro se nenhum nome apontar mais para ela (chamada com o lock adquirido)."""
+        if not any(
+            chave == registrada.nome and registrada.versao == versao for chave, registrada in self._matrizes.items()
+        ):
+            self._matrizes.pop(versao, None)
+
+    def registrar_artefatos(self, diretorio: Path) -> list[MatrizRegistrada]:
+        """
+        Registra a versão atual de cada matriz compilada (ver `compilar_matriz` e `publicar_matriz`) no diretório
+        de artefatos, reaproveitando os arrays mapeados em memória como índice de horários. Matrizes cuja versão
+        atual já está registrada não são recarregadas.
+
+        Args:
+            diretorio: Diretório raiz dos artefatos.
+
+        Returns:
+            As matrizes registradas.
+        """
+        registradas = []
+        for path_atual in sorted(Path(diretorio).glob(f"*/{ARQUIVO_ATUAL}")):
+            nome = path_atual.parent.name
+            versao = path_atual.read_text(encoding="utf-8").strip()
+            if self._artefatos.get(nome) == versao:
+                continue
+            artefato = carregar_artefato(diretorio, nome, versao)
+            self._artefatos[nome] = versao
+            registradas.append(
+                self.registrar(
+                    artefato.matriz_horaria,
+                    nome=artefato.nome,
+                    versao=artefato.versao_matriz,
+                    indice_horario=artefato.indice_horario(),
+                )
+            )
+        return registradas
+
+    def acompanhar_artefatos(self, diretorio: Path, intervalo_verificacao: float) -> list[MatrizRegistrada]:
+        """
+        Registra as matrizes compiladas do diretório de artefatos e passa a verificá-lo a cada
+        `intervalo_verificacao` segundos nas consultas, registrando as novas versões publicadas
+        (ex.: por `manage.py sincronizar_matriz`) sem reiniciar os workers. O diretório pode ainda não existir.
+
+        Args:
+            diretorio: Diretório raiz dos artefatos.
+            intervalo_verificacao: Intervalo mínimo (em segundos) entre verificações do diretório.
+
+        Returns:
+            As matrizes registradas.
+        """
+        self._diretorio_artefatos = Path(diretorio)
+        self.intervalo_verificacao = intervalo_verificacao
+        self._verificado_em = time.monotonic()
+        return self.registrar_artefatos(self._diretorio_artefatos)
+
+    def _verificar_artefatos(self) -> None:
+        """Registra as novas versões do diretório acompanhado se o intervalo de verificação tiver passado."""
+        if self._diretorio_artefatos is None or time.monotonic() - self._verificado_em < self.intervalo_verificacao:
+            return
+        self._verificado_em = time.monotonic()
+        self.registrar_artefatos(self._diretorio_artefatos)
+
+    def obter(self, matriz_id: str) -> MatrizRegistrada:
+        """
+        Retorna a matriz registrada com o nome ou a versão informados.
+
+        Raises:
+            MatrizNaoEncontrada: Se nenhuma matriz tiver o nome ou a versão informados.
+        """
+        self._verificar_artefatos()
+        with self._lock:
+            registrada = self._matrizes.get(matriz_id)
+        if registrada is None:
+            raise MatrizNaoEncontrada(f"Matriz horária não encontrada: {matriz_id}")
+        return registrada
+
+    def listar(self) -> list[dict]:
+        """Lista as matrizes registradas, com o nome, a versão e a quantidade de ofertas."""
+        self._verificar_artefatos()
+        with self._lock:
+            registradas = {id(registrada): registrada for registrada in self._matrizes.values()}
+        return [
+            {"nome": registrada.nome, "versao": registrada.versao, "ofertas": len(registrada.matriz_horaria)}
+            for registrada in registradas.values()
+        ]
@@ -0,0 +1,230 @@
+import threading
+import time
+import uuid
+from typing import Any
+
+from ortools.sat.python import cp_model
+
+from jailmaker.service.cache_svc import CacheLRU
+from jailmaker.service.grade_ideal_svc import GeradorGradeIdeal
+from jailmaker.service.indice_horario_svc import DIAS_SEMANA
+from jailmaker.service.metricas_svc import registrar_etapa
+
+# Operações aceitas por `SessaoGradeIdeal.editar`, aos pares (adicionar, remover), por restrição da sessão.
+EDICOES_SESSAO = {
+    "fixadas": ("fixar", "liberar"),
+    "excluidas": ("excluir", "incluir"),
+    "professores_excluidos": ("excluir_professores", "incluir_professores"),
+    "dias_bloqueados": ("bloquear_dias", "desbloquear_dias"),
+}
+
+
+class SessaoNaoEncontrada(Exception):
+    """Indica que a sessão não existe ou expirou."""
+
+
+class SessaoGradeIdeal:
+    """
+    Sessão de simulação da grade ideal de um estudante: mantém um modelo reduzido às ofertas elegíveis
+    para o estudante e aceita edições incrementais (fixar ou excluir ofertas, excluir professores, bloquear dias),
+    resolvendo novamente o mesmo modelo após cada edição. As edições apenas alteram os domínios das variáveis
+    e a solução anterior é informada ao CP-SAT como dica (hint), de modo que as novas resoluções partem
+    da grade atual em vez de recomeçarem do zero.
+
+    As ofertas são identificadas pela posição na matriz horária. Uma oferta fixada entra na grade mesmo que
+    o seu professor esteja excluído ou o seu dia bloqueado; ofertas inelegíveis para o estudante não podem
+    ser fixadas.
+    """
+
+    def __init__(self, gerador: GeradorGradeIdeal) -> None:
+        """
+        Constrói o modelo reduzido do estudante a partir do gerador da grade ideal (sem resolvê-lo).
+
+        Args:
+            gerador: Gerador com a matriz horária, o histórico, o currículo e os parâmetros do solver.
+        """
+        self.id = uuid.uuid4().hex
+        self.parametros_solver = gerador.parametros_solver
+        self.criada_em = time.time()
+        self.expira_em: float | None = None
+        self.resolucoes = 0
+        self.grade: list[dict] = []
+        self.indices: list[int] = []
+        self.estatisticas: dict | None = None
+        self.restricoes: dict[str, set] = {restricao: set() for restricao in EDICOES_SESSAO}
+
+        inicio = time.perf_counter()
+        modelo_base, inelegiveis = gerador.preparar_modelo()
+        inelegiveis = set(inelegiveis)
+        elegiveis = [posicao for posicao in range(len(modelo_base.ofertas)) if posicao not in inelegiveis]
+        # O modelo é exclusivo da sessão, e é alterado diretamente a cada resolução.
+        self._modelo = modelo_base.reduzir(elegiveis)
+        # Posição de cada oferta do modelo reduzido na matriz horária, e vice-versa.
+        self._indices = [modelo_base.ofertas[posicao].indice for posicao in elegiveis]
+        self._posicoes = {indice: posicao for posicao, indice in enumerate(self._indices)}
+        self._solucao: list[int] | None = None
+        registrar_etapa("sessao.modelo", time.perf_counter() - inicio)
+        self._lock = threading.Lock()
+
+    def editar(self, edicao: dict[str, list]) -> None:
+        """
+        Aplica uma edição às restrições da sessão e resolve novamente o modelo.
+        A edição é validada por inteiro antes de ser aplicada.
+
+        Args:
+            edicao: Dicionário com as operações "fixar", "liberar", "excluir" e "incluir" (posições de ofertas
+                na matriz horária), "excluir_professores" e "incluir_professores" (nomes de professores)
+                e "bloquear_dias" e "desbloquear_dias" (dias da semana), todas opcionais.
+
+        Raises:
+            ValueError: Se a edição referenciar uma oferta que não é elegível para o estudante (inexistente,
+                fora do currículo, já cursada ou com pré-requisitos pendentes) ou um dia inexistente.
+        """
+        edicao = {
+            operacao: {dia.upper() for dia in valores} if "dias" in operacao else set(valores)
+            for operacao, valores in edicao.items()
+            if valores
+        }
+        for operacao in ("fixar", "liberar", "excluir", "incluir"):
+            for indice in edicao.get(operacao, ()):
+                if indice not in self._posicoes:
+                    raise ValueError(f"A oferta {indice} não existe ou não é elegível para o estudante")
+        if edicao.get("fixar", set()) & edicao.get("excluir", set()):
+            raise ValueError("Uma oferta não pode ser fixada e excluída na mesma edição")
+        dias_invalidos = (edicao.get("bloquear_dias", set()) | edicao.get("desbloquear_dias", set())) - set(DIAS_SEMANA)
+        if dias_invalidos:
+            raise ValueError(f"Dias inválidos: {', '.join(sorted(dias_invalidos))}")
+
+        with self._lock:
+            for restricao, (adicionar, remover) in EDICOES_SESSAO.items():
+                self.restricoes[restricao] -= edicao.get(remover, set())
+                self.restricoes[restricao] |= edicao.get(adicionar, set())
+            # Fixar uma oferta a retira das excluídas, e vice-versa.
+            self.restricoes["excluidas"] -= edicao.get("fixar", set())
+            self.restricoes["fixadas"] -= edicao.get("excluir", set())
+        self.resolver()
+
+    def resolver(self) -> list[dict]:
+        """
+        Resolve o modelo do estudante com as restrições atuais, usando a solução anterior como dica.
+        Após a resolução, a grade, as posições das suas ofertas na matriz e as estatísticas ficam disponíveis
+        em `grade`, `indices` e `estatisticas`.
+
+        Returns:
+            Lista de disciplinas que compõem a grade.
+        """
+        with self._lock:
+            if not self._modelo.ofertas:
+                return self.grade
+
+            inicio = time.perf_counter()
+            self._aplicar_restricoes()
+            self._modelo.model.ClearHints()
+            if self._solucao is not None:
+                for variavel, valor in zip(self._modelo.variaveis, self._solucao, strict=True):
+                    self._modelo.model.AddHint(variavel, valor)
+            registrar_etapa("sessao.restricoes", time.perf_counter() - inicio)
+
+            inicio = time.perf_counter()
+            solver = self.parametros_solver.criar_solver()
+            status = solver.Solve(self._modelo.model)
+            registrar_etapa("sessao.resolucao", time.perf_counter() - inicio)
+
+            self.resolucoes += 1
+            self.estatisticas = GeradorGradeIdeal.coletar_estatisticas(solver, status)
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                self._solucao = [solver.Value(variavel) for variavel in self._modelo.variaveis]
+                posicoes = [posicao for posicao, valor in enumerate(self._solucao) if valor]
+                self.indices = [self._indices[posicao] for posicao in posicoes]
+                self.grade = [self._modelo.disciplinas[posicao] for posicao in posicoes]
+            else:
+                self.indices, self.grade = [], []
+            return self.grade
+
+    def para_dict(self) -> dict[str, Any]:
+        """Representa a sessão como dicionário: a grade atual, as posições das ofertas, as restrições e a expiração."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "grade": self.grade,
+                "indices": self.indices,
+                "restricoes": {restricao: sorted(valores) for restricao, valores in self.restricoes.items()},
+                "estatisticas": self.estatisticas,
+                "resolucoes": self.resolucoes,
+                "criada_em": self.criada_em,
+                "expira_em": self.expira_em,
+            }
+
+    def _aplicar_restricoes(self) -> None:
+        """
+        Define o domínio de cada variável do modelo conforme as restrições atuais: 0 para as ofertas excluídas,
+        de professores excluídos ou em dias bloqueados; 1 para as fixadas; livre para as demais.
+        Cada oferta tem a sua própria variável, na mesma posição do modelo reduzido.
+        """
+        ofertas = self._modelo.ofertas
+        dominios = [[0, 1]] * len(ofertas)
+        excluidas = {self._posicoes[indice] for indice in self.restricoes["excluidas"]}
+        professores, dias = self.restricoes["professores_excluidos"], self.restricoes["dias_bloqueados"]
+        for posicao, oferta in enumerate(ofertas):
+            if (
+                posicao in excluidas
+                or oferta.dados["professor"] in professores
+                or not dias.isdisjoint(oferta.dados["dias"])
+            ):
+                dominios[posicao] = [0, 0]
+        for indice in self.restricoes["fixadas"]:
+            dominios[self._posicoes[indice]] = [1, 1]
+
+        variaveis_proto = self._modelo.model.Proto().variables
+        for variavel, dominio in zip(self._modelo.variaveis, dominios, strict=True):
+            variaveis_proto[variavel.Index()].domain[:] = dominio
+
+
+class RegistroSessoes:
+    """
+    Sessões de simulação mantidas em memória, limitadas em quantidade (descartando as usadas há mais tempo)
+    e expiradas após `ttl` segundos sem uso.
+    """
+
+    def __init__(self, max_sessoes: int, ttl: float) -> None:
+        """
+        Inicializa o registro.
+
+        Args:
+            max_sessoes: Quantidade máxima de sessões mantidas.
+            ttl: Tempo (em segundos) sem uso após o qual uma sessão expira.
+        """
+        self.ttl = ttl
+        self._sessoes = CacheLRU(max_sessoes, ttl=ttl)
+
+    def registrar(self, sessao: SessaoGradeIdeal) -> None:
+        """Registra a sessão, que passa a expirar `ttl` segundos após o último uso."""
+        sessao.expira_em = time.time() + self.ttl
+        self._sessoes.armazenar(sessao.id, sessao)
+
+    def obter(self, sessao_id: str) -> SessaoGradeIdeal:
+        """
+        Retorna a sessão e renova a sua expiração.
+
+        Raises:
+            SessaoNaoEncontrada: Se a sessão não existir ou tiver expirado.
+        """
+        sessao = self._sessoes.obter(sessao_id)
+        if sessao is None:
+            raise SessaoNaoEncontrada(f"Sessão não encontrada ou expirada: {sessao_id}")
+        self.registrar(sessao)
+        return sessao
+
+    def remover(self, sessao_id: str) -> None:
+        """
+        Encerra a sessão.
+
+        Raises:
+            SessaoNaoEncontrada: Se a sessão não existir.
+        """
+        if not self._sessoes.remover(sessao_id):
+            raise SessaoNaoEncontrada(f"Sessão não encontrada ou expirada: {sessao_id}")
+
+    def estatisticas(self) -> dict[str, int | float | None]:
+        """Retorna a quantidade de sessões mantidas e os contadores de acessos, descartes e expirações."""
+        return self._sessoes.estatisticas()
@@ -0,0 +1,248 @@
+import hashlib
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+import gspread
+import numpy as np
+import orjson
+import pandas as pd
+
+from jailmaker.service.artefato_matriz_svc import publicar_matriz, revisao_publicada
+from jailmaker.service.matriz_horaria_svc import LeitorMatrizHoraria
+from jailmaker.service.metricas_svc import medir_etapa
+from jailmaker.service.registro_matrizes_svc import RegistroMatrizes
+from jailmaker.service.versao_svc import versao_matriz_horaria
+
+
+class ClienteGoogleSheets:
+    """
+    Acesso a uma aba de uma planilha do Google Sheets com uma conta de serviço.
+    A planilha só é aberta na primeira consulta.
+    """
+
+    def __init__(self, planilha_id: str, aba: str | None = None, credenciais: Path | None = None) -> None:
+        """
+        Inicializa o cliente.
+
+        Args:
+            planilha_id: Identificador da planilha (o trecho da URL após "/d/").
+            aba: Título da aba com a matriz horária (padrão: a primeira aba).
+            credenciais: Arquivo JSON da conta de serviço (padrão: o local padrão do gspread).
+        """
+        self.planilha_id = planilha_id
+        self.aba = aba
+        self.credenciais = credenciais
+        self.origem = f"sheets:{planilha_id}" + (f"/{aba}" if aba else "")
+        self._planilha: gspread.Spreadsheet | None = None
+
+    def revisao(self) -> str:
+        """Retorna a revisão da planilha (data da última modificação no Drive), sem ler as células."""
+        return self._abrir().get_lastUpdateTime()
+
+    def valores(self) -> list[list[str]]:
+        """Retorna o texto de todas as células da aba, linha a linha, com as linhas completadas até a mesma largura."""
+        planilha = self._abrir()
+        aba = planilha.worksheet(self.aba) if self.aba else planilha.sheet1
+        return aba.get_all_values()
+
+    def _abrir(self) -> gspread.Spreadsheet:
+        if self._planilha is None:
+            cliente = (
+                gspread.service_account(filename=self.credenciais) if self.credenciais else gspread.service_account()
+            )
+            self._planilha = cliente.open_by_key(self.planilha_id)
+        return self._planilha
+
+
+class ClientePlanilhaLocal:
+    """
+    Planilha mantida em memória, com a mesma interface de ClienteGoogleSheets (`origem`, `revisao` e `valores`).
+    Permite sincronizar a partir de um xlsx exportado e simular edições de células sem acesso ao Google Sheets.
+    A revisão é o hash do conteúdo das células.
+    """
+
+    def __init__(self, valores: list[list[str]], origem: str = "local") -> None:
+        """
+        Inicializa a planilha.
+
+        Args:
+            valores: Texto das células, linha a linha (células vazias como "").
+            origem: Descrição da origem da planilha.
+        """
+        self.origem = origem
+        self._valores = [list(linha) for linha in valores]
+
+    @classmethod
+    def de_xlsx(cls, path: Path) -> "ClientePlanilhaLocal":
+        """Carrega as células da primeira aba de uma planilha xlsx como texto."""
+        df = pd.read_excel(path, header=None, dtype=object)
+        valores = [["" if pd.isna(valor) else str(valor) for valor in linha] for linha in df.itertuples(index=False)]
+        return cls(valores, origem=Path(path).name)
+
+    def revisao(self) -> str:
+        """Retorna o hash do conteúdo atual das células."""
+        return hashlib.sha256(orjson.dumps(self._valores)).hexdigest()[:16]
+
+    def valores(self) -> list[list[str]]:
+        """Retorna uma cópia do texto das células, linha a linha."""
+        return [list(linha) for linha in self._valores]
+
+    def atualizar(self, linha: int, coluna: int, valor: str) -> None:
+        """
+        Altera o texto de uma célula, ampliando a planilha se necessário.
+
+        Args:
+            linha: Linha da célula (a partir de 0).
+            coluna: Coluna da célula (a partir de 0).
+            valor: Novo texto da célula.
+        """
+        while len(self._valores) <= linha:
+            self._valores.append([])
+        celulas = self._valores[linha]
+        celulas.extend([""] * (coluna + 1 - len(celulas)))
+        celulas[coluna] = valor
+
+
+class ResultadoSincronizacao(NamedTuple):
+    """
+    Resultado de uma sincronização.
+
+    Attributes:
+        revisao: Revisão da planilha sincronizada.
+        blocos: Quantidade de blocos de horário da planilha.
+        blocos_alterados: Quantidade de blocos convertidos novamente (alterados, incluídos ou removidos).
+        versao: Versão publicada, pelo nome do diretório do artefato (None se nada mudou).
+        ofertas: Quantidade de ofertas da matriz publicada (None se nada mudou).
+        gravada: Se a versão publicada foi gravada (False se ela já existia).
+    """
+
+    revisao: str
+    blocos: int
+    blocos_alterados: int
+    versao: str | None = None
+    ofertas: int | None = None
+    gravada: bool = False
+
+
+class SincronizadorMatriz:
+    """
+    Sincroniza a matriz horária a partir de uma planilha (ver ClienteGoogleSheets e ClientePlanilhaLocal),
+    no layout lido por LeitorMatrizHoraria, publicando cada nova versão como artefato (ver `publicar_matriz`).
+
+    A revisão da planilha é consultada antes de ler as células; se ela mudou, a planilha é dividida em blocos
+    de horário (a linha com o horário e os nomes das disciplinas e a linha seguinte, com a turma e o professor)
+    e apenas os blocos cujo hash mudou são convertidos novamente. Os horários dos demais blocos são reaproveitados
+    da sincronização anterior, e as ofertas são recombinadas a partir de todos eles. Uma alteração na linha dos dias
+    ou na largura da planilha reconverte todos os blocos. O estado é mantido em memória: a primeira sincronização
+    de cada processo converte a planilha inteira, exceto se a revisão já tiver sido publicada.
+    """
+
+    def __init__(self, cliente, destino: Path, nome: str, registro: RegistroMatrizes | None = None) -> None:
+        """
+        Inicializa o sincronizador.
+
+        Args:
+            cliente: Cliente da planilha, com `origem`, `revisao()` e `valores()`.
+            destino: Diretório raiz dos artefatos.
+            nome: Nome com que a matriz é publicada.
+            registro: Registro em que cada nova versão também é registrada, se a sincronização rodar
+                no mesmo processo que atende as requisições.
+        """
+        self.cliente = cliente
+        self.destino = Path(destino)
+        self.nome = nome
+        self.registro = registro
+        self._leitor = LeitorMatrizHoraria(cliente.origem)
+        self._lock = threading.Lock()
+        self._revisao = revisao_publicada(self.destino, nome)
+        self._cabecalho: str | None = None
+        # Hash de cada bloco pela linha do horário, e os horários extraídos de todos os blocos.
+        self._assinaturas: dict[int, str] = {}
+        self._horarios: pd.DataFrame | None = None
+
+    def sincronizar(self, forcar: bool = False) -> ResultadoSincronizacao:
+        """
+        Sincroniza a matriz com a planilha, publicando uma nova versão se algum bloco tiver mudado.
+
+        Args:
+            forcar: Se verdadeiro, lê e converte a planilha inteira mesmo que a revisão não tenha mudado.
+
+        Returns:
+            O resultado da sincronização.
+
+        Raises:
+            ValueError: Se a planilha não contiver nenhum bloco de horário.
+        """
+        with self._lock:
+            with medir_etapa("sincronizacao.revisao"):
+                revisao = self.cliente.revisao()
+            if revisao == self._revisao and not forcar:
+                return ResultadoSincronizacao(revisao, len(self._assinaturas), 0)
+
+            with medir_etapa("sincronizacao.leitura"):
+                valores = self.cliente.valores()
+            with medir_etapa("sincronizacao.deteccao"):
+                df, cabecalho, assinaturas = self._dividir(valores)
+                if not assinaturas:
+                    raise ValueError("A planilha não contém nenhum bloco de horário")
+                completa = forcar or self._horarios is None or cabecalho != self._cabecalho
+                alteradas = {
+                    linha
+                    for linha, assinatura in assinaturas.items()
+                    if completa or self._assinaturas.get(linha) != assinatura
+                }
+                removidas = set(self._assinaturas) - set(assinaturas)
+            if not alteradas and not removidas:
+                self._revisao = revisao
+                return ResultadoSincronizacao(revisao, len(assinaturas), 0)
+
+            with medir_etapa("sincronizacao.conversao"):
+                novos = self._leitor.extrair(df, np.array(sorted(alteradas)))
+                if completa:
+                    horarios = novos
+                else:
+                    mantidos = self._horarios[~self._horarios["Linha"].isin(alteradas | removidas)]
+                    horarios = pd.concat([mantidos, novos], ignore_index=True)
+                horarios = horarios.sort_values(["Coluna", "Linha"], kind="stable", ignore_index=True)
+                matriz_horaria = self._leitor.para_registros(self._leitor.combinar(horarios.copy()))
+
+            with medir_etapa("sincronizacao.publicacao"):
+                versao = versao_matriz_horaria(matriz_horaria)
+                diretorio, gravada = publicar_matriz(
+                    matriz_horaria, self.destino, self.nome, self.cliente.origem, revisao=revisao, versao=versao
+                )
+                if self.registro is not None:
+                    self.registro.registrar(matriz_horaria, nome=self.nome, versao=versao)
+
+            self._revisao, self._cabecalho, self._assinaturas, self._horarios = (
+                revisao,
+                cabecalho,
+                assinaturas,
+                horarios,
+            )
+            return ResultadoSincronizacao(
+                revisao, len(assinaturas), len(alteradas | removidas), diretorio.name, len(matriz_horaria), gravada
+            )
+
+    @staticmethod
+    def _dividir(valores: list[list[str]]) -> tuple[pd.DataFrame, str, dict[int, str]]:
+        """
+        Converte as células no DataFrame lido por LeitorMatrizHoraria (sem a linha de título, com as células vazias
+        como NaN e o curso e o período preenchidos em todas as linhas) e calcula o hash do cabeçalho (largura
+        e linha dos dias) e de cada bloco de horário, pela linha do horário no DataFrame.
+        """
+        largura = max(map(len, valores), default=0)
+        linhas = [linha + [""] * (largura - len(linha)) for linha in valores[1:]]
+        df = pd.DataFrame(linhas, columns=range(largura), dtype=object)
+        df = df.mask(df == "")
+        if largura:
+            df[0] = df[0].ffill()
+
+        cursos = df[0].to_numpy(dtype=object) if largura else []
+        cabecalho = hashlib.sha256(orjson.dumps([largura, linhas[0] if linhas else []])).hexdigest()
+        assinaturas = {
+            linha: hashlib.sha256(orjson.dumps([cursos[linha], linhas[linha], linhas[linha + 1]])).hexdigest()
+            for linha in range(1, len(linhas) - 1, 2)
+        }
+        return df, cabecalho, assinaturas
@@ -0,0 +1,144 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any
+
+
+class FilaCheia(Exception):
+    """Indica que a fila de tarefas atingiu o limite de tarefas aguardando execução."""
+
+
+class Tarefa:
+    """
+    Tarefa enfileirada para execução em segundo plano. O status é derivado do estado da future.
+    """
+
+    __slots__ = ("id", "criada_em", "concluida_em", "future")
+
+    def __init__(self, future: Future) -> None:
+        self.id = uuid.uuid4().hex
+        self.criada_em = time.time()
+        self.concluida_em: float | None = None
+        self.future = future
+
+    @property
+    def status(self) -> str:
+        """Status da tarefa: PENDENTE, EXECUTANDO, CONCLUIDA ou FALHOU."""
+        if not self.future.done():
+            return "EXECUTANDO" if self.future.running() else "PENDENTE"
+        return "FALHOU" if self.future.exception() is not None else "CONCLUIDA"
+
+    def para_dict(self) -> dict[str, Any]:
+        """Representa a tarefa como dicionário, incluindo o resultado ou o erro quando concluída."""
+        dados = {"id": self.id, "status": self.status, "criada_em": self.criada_em, "concluida_em": self.concluida_em}
+        if self.future.done():
+            if self.future.exception() is not None:
+                dados["erro"] = str(self.future.exception())
+            else:
+                dados["resultado"] = self.future.result()
+        return dados
+
+
+class FilaTarefas:
+    """
+    Fila local de tarefas executadas por um pool limitado de threads ou processos, sem depender de broker externo.
+    Rejeita novas tarefas quando a quantidade aguardando execução atinge o limite, e mantém os resultados
+    das tarefas concluídas por um tempo limitado para consulta.
+    """
+
+    def __init__(
+        self, max_workers: int, max_fila: int, ttl_resultados: float = 600, usar_processos: bool = False
+    ) -> None:
+        """
+        Inicializa a fila.
+
+        Args:
+            max_workers: Quantidade de tarefas executadas simultaneamente.
+            max_fila: Quantidade máxima de tarefas aguardando execução.
+            ttl_resultados: Tempo (em segundos) que as tarefas concluídas permanecem disponíveis para consulta.
+            usar_processos: Se verdadeiro, executa as tarefas em processos em vez de threads.
+        """
+        self.max_workers = max_workers
+        self.max_fila = max_fila
+        self.ttl_resultados = ttl_resultados
+        self._executor: Executor = (
+            ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+            if usar_processos
+            else ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jailmaker-tarefa")
+        )
+        self._lock = threading.Lock()
+        self._tarefas: dict[str, Tarefa] = {}
+        self._em_andamento = 0
+        self.enfileiradas = 0
+        self.concluidas = 0
+        self.falhas = 0
+        self.rejeitadas = 0
+
+    def enfileirar(self, funcao: Callable[..., Any], *args: Any) -> Tarefa:
+        """
+        Enfileira a execução de `funcao(*args)`.
+
+        Returns:
+            A tarefa criada.
+
+        Raises:
+            FilaCheia: Se a quantidade de tarefas aguardando execução tiver atingido o limite.
+        """
+        with self._lock:
+            self._remover_expiradas()
+            if self._em_andamento >= self.max_workers + self.max_fila:
+                self.rejeitadas += 1
+                raise FilaCheia(f"A fila de tarefas está cheia ({self.max_fila} aguardando execução)")
+            self._em_andamento += 1
+            self.enfileiradas += 1
+
+        tarefa = Tarefa(self._executor.submit(funcao, *args))
+        with self._lock:
+            self._tarefas[tarefa.id] = tarefa
+        tarefa.future.add_done_callback(lambda _future: self._finalizar(tarefa))
+        return tarefa
+
+    def obter(self, tarefa_id: str) -> Tarefa | None:
+        """Retorna a tarefa com o identificador informado, ou None se ela não existir ou tiver expirado."""
+        with self._lock:
+            self._remover_expiradas()
+            return self._tarefas.get(tarefa_id)
+
+    def metricas(self) -> dict[str, int]:
+        """Retorna a profundidade da fila, as tarefas em execução e os contadores acumulados."""
+        with self._lock:
+            executando = min(self._em_andamento, self.max_workers)
+            return {
+                "max_workers": self.max_workers,
+                "max_fila": self.max_fila,
+                "aguardando": self._em_andamento - executando,
+                "executando": executando,
+                "enfileiradas": self.enfileiradas,
+                "concluidas": self.concluidas,
+                "falhas": self.falhas,
+                "rejeitadas": self.rejeitadas,
+            }
+
+    def _finalizar(self, tarefa: Tarefa) -> None:
+        """Atualiza os contadores quando uma tarefa termina."""
+        with self._lock:
+            tarefa.concluida_em = time.time()
+            self._em_andamento -= 1
+            if tarefa.future.exception() is not None:
+                self.falhas += 1
+            else:
+                self.concluidas += 1
+
+    def _remover_expiradas(self) -> None:
+        """Descarta as tarefas concluídas há mais tempo que o TTL. Deve ser chamado com o lock adquirido."""
+        limite = time.time() - self.ttl_resultados
+        expiradas = [
+            tarefa_id
+            for tarefa_id, tarefa in self._tarefas.items()
+            if tarefa.concluida_em is not None and tarefa.concluida_em < limite
+        ]
+        for tarefa_id in expiradas:
+            del self._tarefas[tarefa_id]
@@ -0,0 +1,18 @@
+import hashlib
+
+import orjson
+
+
+def versao_matriz_horaria(matriz_horaria: list[dict]) -> str:
+    """
+    Calcula a versão de uma matriz horária a partir do hash do seu conteúdo serializado de forma canônica.
+
+    Args:
+        matriz_horaria: Lista de dicionários contendo as disciplinas ofertadas.
+
+    Returns:
+        Os 16 primeiros caracteres do SHA-256 hexadecimal do conteúdo.
+    """
+    # O orjson produz os mesmos bytes que json.dumps(sort_keys=True, ensure_ascii=False, separators=(",", ":")).
+    conteudo = orjson.dumps(matriz_horaria, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(conteudo).hexdigest()[:16]
@@ -1 +1,1326 @@
-# Create your tests here.
+import asyncio
+import gzip
+import json
+import multiprocessing
+import os
+import random
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from ortools.sat.python import cp_model
+
+from benchmarks.geradores import gerar_planilha_matriz_horaria
+from benchmarks.matriz_horaria import LeitorMatrizHorariaReferencia
+from jailmaker import middleware, views
+from jailmaker.models import MatrizHoraria
+from jailmaker.service import artefato_matriz_svc, cache_svc, grade_ideal_lote_svc, grade_ideal_svc
+from jailmaker.service.artefato_matriz_svc import carregar_artefato, compilar_matriz, publicar_matriz
+from jailmaker.service.cache_svc import CacheArquivoJson, CacheDisco, CacheDjango, CacheEmCamadas, CacheLRU
+from jailmaker.service.coalescencia_svc import Coalescedor
+from jailmaker.service.curriculos_svc import Curriculo, RegistroCurriculos, curriculo_padrao
+from jailmaker.service.disciplinas_svc import SituacaoEstudante, normalizar_nome
+from jailmaker.service.grade_ideal_svc import GeradorGradeIdeal, ModeloBaseGradeIdeal, ParametrosSolver
+from jailmaker.service.indice_horario_svc import IndiceHorario, horario_para_minutos
+from jailmaker.service.matriz_horaria_svc import LeitorMatrizHoraria
+from jailmaker.service.metricas_svc import RegistroMetricas
+from jailmaker.service.registro_matrizes_svc import MatrizNaoEncontrada, RegistroMatrizes
+from jailmaker.service.sessoes_svc import RegistroSessoes, SessaoGradeIdeal, SessaoNaoEncontrada
+from jailmaker.service.sincronizacao_planilha_svc import ClientePlanilhaLocal, SincronizadorMatriz
+from jailmaker.service.tarefas_svc import FilaTarefas
+
+DIRETORIO_ARQUIVOS = Path(__file__).resolve().parent / "files"
+MATRIZ_HORARIA = json.loads((DIRETORIO_ARQUIVOS / "matriz_2024_2.json").read_text(encoding="utf-8"))
+PARAMETROS_TESTE = ParametrosSolver(tempo_limite=10.0, num_workers=1, deterministico=True)
+# Com LÓGICA DE PROGRAMAÇÃO concluída, a oferta 0 (ALGORITMOS E ESTRUTURAS DE DADOS I, turma IA) é elegível.
+HISTORICO_LOGICA = [{"nome": "LÓGICA DE PROGRAMAÇÃO", "situacao": "APROVADO"}]
+# Com AED I também concluída, PROGRAMAÇÃO ORIENTADA A OBJETOS (que lista o mesmo horário duas vezes) é elegível.
+HISTORICO_AED = [*HISTORICO_LOGICA, {"nome": "ALGORITMOS E ESTRUTURAS DE DADOS I", "situacao": "APROVADO"}]
+URL_GRADE_IDEAL = "/api/grade-ideal?deterministico=true&num_workers=1"
+
+
+class SessaoGradeIdealTests(TestCase):
+    def test_fixar_oferta_com_mesmo_nome_e_professor_de_outra_turma(self):
+        oferta = MATRIZ_HORARIA[0]
+        outras_turmas = [
+            outra
+            for outra in MATRIZ_HORARIA[1:]
+            if (outra["nome"], outra["professor"]) == (oferta["nome"], oferta["professor"])
+        ]
+        self.assertTrue(outras_turmas)
+
+        sessao = SessaoGradeIdeal(
+            GeradorGradeIdeal(MATRIZ_HORARIA, HISTORICO_LOGICA, parametros_solver=PARAMETROS_TESTE)
+        )
+        sessao.resolver()
+        sessao.editar({"fixar": [0]})
+
+        self.assertEqual(sessao.estatisticas["status"], "OPTIMAL")
+        self.assertIn(0, sessao.indices)
+        self.assertEqual([disciplina["nome"] for disciplina in sessao.grade].count(oferta["nome"]), 1)
+
+
+class RegistroSessoesTests(TestCase):
+    def setUp(self):
+        self.sessao = SessaoGradeIdeal(
+            GeradorGradeIdeal(MATRIZ_HORARIA, HISTORICO_LOGICA, parametros_solver=PARAMETROS_TESTE)
+        )
+        # Relógio controlado pelo teste, usado pelo cache que guarda as sessões.
+        patcher = mock.patch.object(cache_svc, "time")
+        self.relogio = patcher.start().monotonic
+        self.relogio.return_value = 1000.0
+        self.addCleanup(patcher.stop)
+
+    def test_sessao_expira_apos_o_ttl_sem_uso(self):
+        registro = RegistroSessoes(max_sessoes=4, ttl=60)
+        registro.registrar(self.sessao)
+
+        self.relogio.return_value = 1059.0
+        self.assertIs(registro.obter(self.sessao.id), self.sessao)
+        # A consulta renova a expiração: a sessão segue válida além do TTL contado do registro.
+        self.relogio.return_value = 1118.0
+        self.assertIs(registro.obter(self.sessao.id), self.sessao)
+
+        self.relogio.return_value = 1178.0
+        with self.assertRaises(SessaoNaoEncontrada):
+            registro.obter(self.sessao.id)
+        self.assertEqual(registro.estatisticas()["expirados"], 1)
+        self.assertEqual(registro.estatisticas()["itens"], 0)
+
+    def test_remover_sessao_inexistente(self):
+        registro = RegistroSessoes(max_sessoes=4, ttl=60)
+        registro.registrar(self.sessao)
+        registro.remover(self.sessao.id)
+
+        with self.assertRaises(SessaoNaoEncontrada):
+            registro.remover(self.sessao.id)
+        with self.assertRaises(SessaoNaoEncontrada):
+            registro.obter(self.sessao.id)
+
+
+class SessoesGradeIdealApiTests(TestCase):
+    URL = "/api/grade-ideal/sessoes"
+    CORPO = {"matriz_id": "atual", "historico_academico": HISTORICO_LOGICA}
+
+    def setUp(self):
+        patcher = mock.patch.object(views, "REGISTRO_SESSOES", RegistroSessoes(max_sessoes=4, ttl=60))
+        self.registro = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_criar_consultar_editar_e_encerrar_sessao(self):
+        criada = await self.async_client.post(
+            f"{self.URL}?deterministico=true&num_workers=1", self.CORPO, content_type="application/json"
+        )
+        self.assertEqual(criada.status_code, 201)
+        sessao = criada.json()
+        self.assertTrue(sessao["grade"])
+        self.assertEqual(len(sessao["indices"]), len(sessao["grade"]))
+        self.assertEqual(sessao["resolucoes"], 1)
+        url_sessao = f"{self.URL}/{sessao['id']}"
+
+        consultada = (await self.async_client.get(url_sessao)).json()
+        self.assertEqual(consultada["grade"], sessao["grade"])
+        self.assertGreater(consultada["expira_em"], sessao["criada_em"])
+
+        excluida = sessao["indices"][0]
+        editada = await self.async_client.patch(url_sessao, {"excluir": [excluida]}, content_type="application/json")
+        self.assertEqual(editada.status_code, 200)
+        self.assertNotIn(excluida, editada.json()["indices"])
+        self.assertEqual(editada.json()["restricoes"]["excluidas"], [excluida])
+        self.assertEqual(editada.json()["resolucoes"], 2)
+
+        # A edição inválida é rejeitada sem alterar a sessão.
+        invalida = await self.async_client.patch(
+            url_sessao, {"fixar": [len(MATRIZ_HORARIA)]}, content_type="application/json"
+        )
+        self.assertEqual(invalida.status_code, 400)
+        self.assertEqual((await self.async_client.get(url_sessao)).json()["resolucoes"], 2)
+
+        self.assertEqual((await self.async_client.delete(url_sessao)).status_code, 204)
+        self.assertEqual((await self.async_client.get(url_sessao)).status_code, 404)
+        self.assertEqual((await self.async_client.delete(url_sessao)).status_code, 404)
+        encerrada = await self.async_client.patch(url_sessao, {"excluir": [excluida]}, content_type="application/json")
+        self.assertEqual(encerrada.status_code, 404)
+
+    async def test_criar_sessao_com_matriz_inexistente_responde_404(self):
+        resposta = await self.async_client.post(
+            self.URL, {**self.CORPO, "matriz_id": "inexistente"}, content_type="application/json"
+        )
+
+        self.assertEqual(resposta.status_code, 404)
+        self.assertEqual(self.registro.estatisticas()["itens"], 0)
+
+
+class RegistroCurriculosTests(TestCase):
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.diretorio = Path(diretorio.name)
+        self.path = self.diretorio / "ciencia_da_computacao.json"
+        self.dados = json.loads((DIRETORIO_ARQUIVOS / "curriculos" / self.path.name).read_text(encoding="utf-8"))
+        self._escrever(self.dados, 1_000_000_000)
+        self.registro = RegistroCurriculos(self.diretorio, intervalo_verificacao=0)
+
+    def _escrever(self, dados: dict | str, mtime_ns: int) -> None:
+        conteudo = dados if isinstance(dados, str) else json.dumps(dados, ensure_ascii=False)
+        self.path.write_text(conteudo, encoding="utf-8")
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_arquivo_alterado_e_recarregado_sem_alterar_o_curriculo_ja_obtido(self):
+        antigo = self.registro.obter()
+        ids_antigos, pesos_antigos = dict(antigo.ids), antigo.pesos("transitivos")
+
+        self._escrever({**self.dados, "disciplinas": [*self.dados["disciplinas"], "DISCIPLINA NOVA"]}, 2_000_000_000)
+        novo = self.registro.obter()
+
+        self.assertIsNot(novo, antigo)
+        self.assertNotEqual(novo.versao, antigo.versao)
+        self.assertIsNotNone(novo.id_disciplina("DISCIPLINA NOVA"))
+        self.assertIsNone(antigo.id_disciplina("DISCIPLINA NOVA"))
+        self.assertEqual((antigo.ids, antigo.pesos("transitivos")), (ids_antigos, pesos_antigos))
+        self.assertIs(self.registro.obter(), novo)
+
+    def test_arquivo_invalido_mantem_o_curriculo_anterior(self):
+        antigo = self.registro.obter()
+
+        self._escrever("{", 2_000_000_000)
+
+        self.assertIs(self.registro.obter(), antigo)
+        self.assertIn("ciencia_da_computacao", self.registro.erros)
+
+
+class GrafoPrerequisitosTests(TestCase):
+    def setUp(self):
+        self.curriculo = curriculo_padrao()
+        self.grafo = self.curriculo.grafo
+        # Pré-requisitos diretos de cada disciplina como conjuntos, para as verificações por busca em profundidade.
+        self.prerequisitos = {
+            disciplina: {prereq for prereq in range(len(self.curriculo.nomes)) if mascara >> prereq & 1}
+            for disciplina, mascara in enumerate(self.curriculo.mascaras_prerequisitos)
+        }
+        self.dependentes = {
+            disciplina: {dependente for dependente, prereqs in self.prerequisitos.items() if disciplina in prereqs}
+            for disciplina in self.prerequisitos
+        }
+
+    def _alcancaveis(self, disciplina: int, arestas: dict[int, set[int]]) -> set[int]:
+        alcancaveis, pilha = set(), list(arestas[disciplina])
+        while pilha:
+            proxima = pilha.pop()
+            if proxima not in alcancaveis:
+                alcancaveis.add(proxima)
+                pilha.extend(arestas[proxima])
+        return alcancaveis
+
+    def _cadeia(self, disciplina: int) -> int:
+        return max((1 + self._cadeia(dependente) for dependente in self.dependentes[disciplina]), default=0)
+
+    def test_ordem_topologica_respeita_os_prerequisitos(self):
+        ordem = self.grafo.ordem_topologica
+        posicoes = {disciplina: posicao for posicao, disciplina in enumerate(ordem)}
+
+        self.assertEqual(sorted(ordem), list(range(len(self.curriculo.nomes))))
+        for disciplina, prereqs in self.prerequisitos.items():
+            for prereq in prereqs:
+                self.assertLess(posicoes[prereq], posicoes[disciplina])
+
+    def test_fechos_transitivos_e_cadeia_mais_longa(self):
+        for disciplina in self.prerequisitos:
+            nome = self.curriculo.nomes[disciplina]
+            with self.subTest(disciplina=nome):
+                fecho_prerequisitos = self._alcancaveis(disciplina, self.prerequisitos)
+                fecho_dependentes = self._alcancaveis(disciplina, self.dependentes)
+                self.assertEqual(self.grafo.fecho_prerequisitos[disciplina], sum(1 << d for d in fecho_prerequisitos))
+                self.assertEqual(self.grafo.fecho_dependentes[disciplina], sum(1 << d for d in fecho_dependentes))
+                self.assertEqual(self.grafo.cadeia_mais_longa[disciplina], self._cadeia(disciplina))
+
+    def test_pesos_por_criterio(self):
+        logica = self.curriculo.id_disciplina("LÓGICA DE PROGRAMAÇÃO")
+        transitivos = self.curriculo.pesos("transitivos")
+        caminho_critico = self.curriculo.pesos("caminho_critico")
+
+        for disciplina in self.prerequisitos:
+            self.assertEqual(transitivos[disciplina], 1 + len(self._alcancaveis(disciplina, self.dependentes)))
+            self.assertEqual(caminho_critico[disciplina], 1 + self._cadeia(disciplina))
+        self.assertEqual(self.curriculo.pesos("diretos")[logica], 1 + len(self.dependentes[logica]))
+        # LÓGICA DE PROGRAMAÇÃO inicia a cadeia mais longa do currículo.
+        self.assertEqual(caminho_critico[logica], max(caminho_critico))
+        with self.assertRaises(ValueError):
+            self.curriculo.pesos("inexistente")
+
+    def test_ciclo_de_prerequisitos_e_rejeitado(self):
+        with self.assertRaisesRegex(ValueError, "Ciclo"):
+            Curriculo("ciclo", "Ciclo", ["A", "B"], {"A": ["B"], "B": ["A"]})
+
+
+class SituacaoEstudanteTests(TestCase):
+    def test_elegibilidade_por_mascaras_igual_a_por_conjuntos(self):
+        curriculo = curriculo_padrao()
+        prerequisitos = {
+            normalizar_nome(nome): {normalizar_nome(prereq) for prereq in prereqs}
+            for nome, prereqs in curriculo.prerequisitos.items()
+        }
+        nomes = sorted(set(curriculo.disciplinas).union(*curriculo.prerequisitos.values()))
+        aleatorio = random.Random(7)
+
+        for _ in range(50):
+            historico = [
+                {"nome": nome, "situacao": aleatorio.choice(("APROVADO", "EM CURSO", "REPROVADO"))}
+                for nome in aleatorio.sample(nomes, aleatorio.randint(0, len(nomes)))
+            ]
+            historico.append({"nome": "DISCIPLINA FORA DO CURRÍCULO", "situacao": "APROVADO"})
+            with self.subTest(historico=historico):
+                aprovadas = {normalizar_nome(item["nome"]) for item in historico if item["situacao"] == "APROVADO"}
+                em_curso = {normalizar_nome(item["nome"]) for item in historico if item["situacao"] == "EM CURSO"}
+                esperada = [
+                    nome not in aprovadas | em_curso and prerequisitos.get(nome, set()) <= aprovadas
+                    for nome in curriculo.nomes
+                ]
+
+                self.assertEqual(SituacaoEstudante(historico, curriculo).elegibilidade(), esperada)
+
+
+class ParametrosSolverTests(TestCase):
+    def test_modo_deterministico_mantem_o_tempo_limite_de_parede(self):
+        solver = ParametrosSolver(tempo_limite=5.0, deterministico=True).criar_solver()
+
+        self.assertEqual(solver.parameters.max_time_in_seconds, 5.0)
+        self.assertEqual(solver.parameters.max_deterministic_time, 5.0)
+        self.assertTrue(solver.parameters.interleave_search)
+
+    def test_parametros_aplicados_ao_solver(self):
+        padrao = cp_model.CpSolver().parameters
+        solver = ParametrosSolver(tempo_limite=5.0, num_workers=2).criar_solver(tempo_limite=1.5)
+        sem_parametros = ParametrosSolver().criar_solver()
+
+        self.assertEqual(solver.parameters.num_workers, 2)
+        self.assertEqual(solver.parameters.max_time_in_seconds, 1.5)
+        self.assertFalse(solver.parameters.interleave_search)
+        self.assertEqual(solver.parameters.max_deterministic_time, padrao.max_deterministic_time)
+        self.assertEqual(sem_parametros.parameters.max_time_in_seconds, padrao.max_time_in_seconds)
+        self.assertEqual(sem_parametros.parameters.num_workers, padrao.num_workers)
+
+    def test_parametros_da_requisicao_sao_validados_e_aplicados(self):
+        corpo = {"matriz_id": "atual", "historico_academico": HISTORICO_LOGICA}
+        limites = settings.JAILMAKER_SOLVER
+
+        fora_dos_limites = [
+            self.client.post(f"/api/grade-ideal?{consulta}", corpo, content_type="application/json")
+            for consulta in (
+                "tempo_limite=0",
+                f"tempo_limite={limites['TEMPO_LIMITE_MAXIMO'] + 1}",
+                "num_workers=0",
+                f"num_workers={limites['NUM_WORKERS_MAXIMO'] + 1}",
+            )
+        ]
+        with mock.patch.object(views, "_resolver_grade_ideal", return_value=([], None, False)) as resolver:
+            self.client.post(
+                "/api/grade-ideal?tempo_limite=2.5&num_workers=1&deterministico=true",
+                corpo,
+                content_type="application/json",
+            )
+
+        self.assertEqual([resposta.status_code for resposta in fora_dos_limites], [400] * 4)
+        gerador = resolver.call_args.args[0]
+        self.assertEqual(gerador.parametros_solver, ParametrosSolver(2.5, 1, True))
+
+    def test_estatisticas_da_resolucao(self):
+        resposta = self.client.post(
+            f"{URL_GRADE_IDEAL}&estatisticas=true",
+            {"matriz_id": "atual", "historico_academico": HISTORICO_AED},
+            content_type="application/json",
+        )
+
+        estatisticas = resposta.json()["estatisticas"]
+        self.assertEqual(estatisticas["status"], "OPTIMAL")
+        self.assertEqual(estatisticas["valor_objetivo"], estatisticas["limite_objetivo"])
+        self.assertEqual(estatisticas["valor_objetivo"], 26)
+        self.assertGreaterEqual(estatisticas["tempo_parede"], 0)
+
+
+class GeradorGradeIdealTests(TestCase):
+    def test_comparar_formulacoes_usa_o_criterio_de_peso(self):
+        gerador = GeradorGradeIdeal(
+            MATRIZ_HORARIA, HISTORICO_LOGICA, parametros_solver=PARAMETROS_TESTE, pesos="caminho_critico"
+        )
+        gerador.gerar()
+
+        resultados = gerador.comparar_formulacoes()
+
+        self.assertEqual({resultado["status"] for resultado in resultados}, {"OPTIMAL"})
+        for resultado in resultados:
+            self.assertEqual(resultado["valor_objetivo"], gerador.estatisticas["valor_objetivo"])
+
+    def test_formulacoes_chegam_ao_mesmo_objetivo_com_horarios_repetidos(self):
+        gerador = GeradorGradeIdeal(MATRIZ_HORARIA, HISTORICO_AED, parametros_solver=PARAMETROS_TESTE)
+
+        resultados = gerador.comparar_formulacoes()
+
+        self.assertEqual({resultado["status"] for resultado in resultados}, {"OPTIMAL"})
+        self.assertEqual(len({resultado["valor_objetivo"] for resultado in resultados}), 1)
+
+    def test_oferta_com_horario_repetido_pode_ser_escolhida_sem_sobreposicao(self):
+        posicao_matriz = next(
+            indice
+            for indice, oferta in enumerate(MATRIZ_HORARIA)
+            if len(set(zip(oferta["dias"], oferta["horarios"], strict=False))) < len(oferta["dias"])
+        )
+        modelo_base = ModeloBaseGradeIdeal(MATRIZ_HORARIA, "sem_sobreposicao")
+        model = modelo_base.instanciar([])
+        model.Add(modelo_base.variaveis[modelo_base.indices.index(posicao_matriz)] == 1)
+
+        status = cp_model.CpSolver().Solve(model)
+
+        self.assertIn(status, (cp_model.OPTIMAL, cp_model.FEASIBLE))
+
+    def test_grade_tem_no_maximo_uma_oferta_por_disciplina(self):
+        grade = GeradorGradeIdeal(MATRIZ_HORARIA, HISTORICO_LOGICA, parametros_solver=PARAMETROS_TESTE).gerar()
+
+        nomes = [normalizar_nome(disciplina["nome"]) for disciplina in grade]
+        self.assertTrue(grade)
+        self.assertEqual(len(nomes), len(set(nomes)))
+
+
+class IndiceHorarioTests(TestCase):
+    # Matriz sintética: B começa quando A termina (sem conflito), C lista o mesmo horário duas vezes
+    # e D conflita com B em outro dia da lista.
+    MATRIZ_CASOS_LIMITE = [
+        {"dias": ["SEGUNDA"], "horarios": ["08h00 - 10h00"]},
+        {"dias": ["SEGUNDA"], "horarios": ["10h00 - 12h00"]},
+        {"dias": ["SEGUNDA", "SEGUNDA"], "horarios": ["09h00 - 11h00", "09h00 - 11h00"]},
+        {"dias": ["TERÇA", "SEGUNDA"], "horarios": ["08h00 - 10h00", "11h30 - 12h30"]},
+    ]
+
+    def test_pares_em_conflito_iguais_aos_da_comparacao_par_a_par(self):
+        self.assertEqual(self._pares(self.MATRIZ_CASOS_LIMITE), {(0, 2), (1, 2), (1, 3)})
+        for matriz in (self.MATRIZ_CASOS_LIMITE, MATRIZ_HORARIA):
+            with self.subTest(ofertas=len(matriz)):
+                pares = IndiceHorario(matriz).pares_em_conflito()
+                self.assertEqual({tuple(par) for par in pares.tolist()}, self._pares(matriz))
+                self.assertEqual(len(pares), len(self._pares(matriz)))
+
+    def test_cliques_maximais_iguais_aos_da_varredura_por_instante(self):
+        self.assertEqual(self._cliques(self.MATRIZ_CASOS_LIMITE), {(0, 2), (1, 2), (1, 3)})
+        for matriz in (self.MATRIZ_CASOS_LIMITE, MATRIZ_HORARIA):
+            with self.subTest(ofertas=len(matriz)):
+                cliques = IndiceHorario(matriz).cliques_maximais()
+                self.assertEqual(set(cliques), self._cliques(matriz))
+                self.assertEqual(len(cliques), len(set(cliques)))
+
+    @staticmethod
+    def _intervalos(matriz: list[dict]) -> list[tuple[int, str, int, int]]:
+        intervalos = []
+        for oferta, disciplina in enumerate(matriz):
+            for dia, horario in zip(disciplina["dias"], disciplina["horarios"], strict=False):
+                inicio, fim = map(horario_para_minutos, horario.split(" - "))
+                if inicio < fim:
+                    intervalos.append((oferta, dia, inicio, fim))
+        return intervalos
+
+    def _pares(self, matriz: list[dict]) -> set[tuple[int, int]]:
+        intervalos = self._intervalos(matriz)
+        return {
+            (a, b)
+            for a, dia_a, inicio_a, fim_a in intervalos
+            for b, dia_b, inicio_b, fim_b in intervalos
+            if a < b and dia_a == dia_b and inicio_a < fim_b and inicio_b < fim_a
+        }
+
+    def _cliques(self, matriz: list[dict]) -> set[tuple[int, ...]]:
+        # Em cada dia, as ofertas ativas no início de cada intervalo; os cliques maximais do dia são
+        # os conjuntos ativos que não estão contidos em outro.
+        intervalos = self._intervalos(matriz)
+        cliques = set()
+        for dia in {dia for _, dia, _, _ in intervalos}:
+            do_dia = [intervalo for intervalo in intervalos if intervalo[1] == dia]
+            ativos = {
+                frozenset(oferta for oferta, _, inicio, fim in do_dia if inicio <= instante < fim)
+                for _, _, instante, _ in do_dia
+            }
+            cliques |= {
+                tuple(sorted(conjunto))
+                for conjunto in ativos
+                if len(conjunto) > 1 and not any(conjunto < outro for outro in ativos)
+            }
+        return cliques
+
+
+class ModeloBaseGradeIdealTests(TestCase):
+    HISTORICOS = [
+        [],
+        HISTORICO_LOGICA,
+        HISTORICO_AED,
+        [{"nome": nome, "situacao": "APROVADO"} for nome in curriculo_padrao().disciplinas[:12]],
+    ]
+
+    def test_instancia_equivale_ao_modelo_construido_do_zero(self):
+        for historico in self.HISTORICOS:
+            with self.subTest(disciplinas_cursadas=len(historico)):
+                gerador = GeradorGradeIdeal(MATRIZ_HORARIA, historico, parametros_solver=PARAMETROS_TESTE)
+                gerador.gerar()
+                modelo_base = gerador._modelo_base
+                inelegiveis = set(gerador._posicoes_inelegiveis())
+                elegiveis = [
+                    disciplina
+                    for posicao, disciplina in enumerate(modelo_base.disciplinas)
+                    if posicao not in inelegiveis
+                ]
+
+                do_zero = ModeloBaseGradeIdeal(elegiveis, registrar_etapas=False)
+                solver = PARAMETROS_TESTE.criar_solver()
+                status = solver.Solve(do_zero.model)
+
+                self.assertEqual(status, cp_model.OPTIMAL)
+                self.assertEqual(gerador.estatisticas["status"], "OPTIMAL")
+                self.assertEqual(gerador.estatisticas["valor_objetivo"], solver.ObjectiveValue())
+
+    def test_modelo_base_reaproveitado_nao_guarda_fixacoes_de_outra_requisicao(self):
+        grade_ideal_svc._MODELOS_BASE.limpar()
+        for historico in self.HISTORICOS[::-1]:
+            GeradorGradeIdeal(MATRIZ_HORARIA, historico, parametros_solver=PARAMETROS_TESTE).gerar()
+        reaproveitado = GeradorGradeIdeal(MATRIZ_HORARIA, [], parametros_solver=PARAMETROS_TESTE)
+        grade_reaproveitada = reaproveitado.gerar()
+        modelo_base = reaproveitado._modelo_base
+
+        grade_ideal_svc._MODELOS_BASE.limpar()
+        isolado = GeradorGradeIdeal(MATRIZ_HORARIA, [], parametros_solver=PARAMETROS_TESTE)
+        grade_isolada = isolado.gerar()
+
+        self.assertIsNot(isolado._modelo_base, modelo_base)
+        self.assertEqual(grade_reaproveitada, grade_isolada)
+        self.assertEqual(
+            {tuple(variavel.domain) for variavel in modelo_base.model.Proto().variables if variavel.name},
+            {(0, 1)},
+        )
+
+
+class GradeIdealApiTests(TestCase):
+    def test_matriz_enviada_sem_campos_nao_usados_pelo_solver(self):
+        matriz_horaria = [
+            {campo: oferta[campo] for campo in ("nome", "professor", "horarios", "dias")} for oferta in MATRIZ_HORARIA
+        ]
+
+        resposta = self.client.post(
+            URL_GRADE_IDEAL,
+            {"matriz_horaria": matriz_horaria, "historico_academico": HISTORICO_LOGICA},
+            content_type="application/json",
+        )
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta.json())
+
+    def test_matriz_id_resolve_a_matriz_registrada(self):
+        corpo_inline = {"matriz_horaria": MATRIZ_HORARIA, "historico_academico": HISTORICO_LOGICA}
+        corpo_id = {"matriz_id": "atual", "historico_academico": HISTORICO_LOGICA}
+
+        inline = self.client.post(URL_GRADE_IDEAL, corpo_inline, content_type="application/json")
+        por_id = self.client.post(URL_GRADE_IDEAL, corpo_id, content_type="application/json")
+        inexistente = self.client.post(
+            URL_GRADE_IDEAL, {**corpo_id, "matriz_id": "inexistente"}, content_type="application/json"
+        )
+
+        self.assertEqual(por_id.status_code, 200)
+        self.assertEqual(por_id.json(), inline.json())
+        self.assertEqual(inexistente.status_code, 404)
+
+
+class AdmissaoGradeIdealApiTests(TestCase):
+    CORPO = {"matriz_id": "atual", "historico_academico": HISTORICO_LOGICA}
+
+    def setUp(self):
+        # Resolução que só termina quando o teste a libera.
+        self.liberar = threading.Event()
+        self.addCleanup(self.liberar.set)
+
+        def resolver(gerador):
+            self.liberar.wait(timeout=10)
+            return [], None, False
+
+        patcher = mock.patch.object(views, "_resolver_grade_ideal", resolver)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_prazo_esgotado_responde_504(self):
+        with mock.patch.object(views.ADMISSAO_SOLVER, "prazo", 0.05):
+            resposta = await self.async_client.post(URL_GRADE_IDEAL, self.CORPO, content_type="application/json")
+
+        self.assertEqual(resposta.status_code, 504)
+        self.assertIn("erro", resposta.json())
+
+    async def test_pool_e_fila_ocupados_responde_503(self):
+        with mock.patch.multiple(views.ADMISSAO_SOLVER, max_concorrencia=0, max_fila=0):
+            resposta = await self.async_client.post(URL_GRADE_IDEAL, self.CORPO, content_type="application/json")
+
+        self.assertEqual(resposta.status_code, 503)
+        self.assertIn("Retry-After", resposta)
+
+    async def test_event_loop_atende_outras_requisicoes_durante_a_resolucao(self):
+        resolucao = asyncio.ensure_future(
+            self.async_client.post(URL_GRADE_IDEAL, self.CORPO, content_type="application/json")
+        )
+        await asyncio.sleep(0.1)
+
+        outra = await asyncio.wait_for(self.async_client.get("/api/grade-ideal/cache"), timeout=5)
+
+        self.assertEqual(outra.status_code, 200)
+        self.assertFalse(resolucao.done())
+        self.liberar.set()
+        self.assertEqual((await resolucao).status_code, 200)
+
+
+class TarefasHistoricoAcademicoApiTests(TestCase):
+    URL = "/api/historico-academico"
+
+    def setUp(self):
+        # Leitura que só termina quando o teste a libera; PDFs com "invalido" no conteúdo falham.
+        self.liberar = threading.Event()
+        self.addCleanup(self.liberar.set)
+
+        def from_bytes(conteudo):
+            self.liberar.wait(timeout=10)
+            if b"invalido" in conteudo:
+                raise ValueError("PDF inválido")
+            return {"conteudo": conteudo.decode()}
+
+        fila = FilaTarefas(max_workers=1, max_fila=0)
+        for patcher in (
+            mock.patch.object(views, "FILA_HISTORICO_ACADEMICO", fila),
+            mock.patch.object(views, "CACHE_HISTORICO_ACADEMICO", CacheEmCamadas(CacheLRU(4))),
+            mock.patch.object(views.LeitorHistoricoAcademico, "from_bytes", from_bytes),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _enviar(self, conteudo: bytes):
+        arquivo = SimpleUploadedFile("historico.pdf", conteudo, content_type="application/pdf")
+        return await self.async_client.post(f"{self.URL}?assincrono=true", {"historico_academico": arquivo})
+
+    async def _aguardar_conclusao(self, tarefa_id: str) -> dict:
+        for _ in range(200):
+            tarefa = (await self.async_client.get(f"{self.URL}/tarefas/{tarefa_id}")).json()
+            if tarefa["status"] in ("CONCLUIDA", "FALHOU"):
+                return tarefa
+            await asyncio.sleep(0.05)
+        self.fail(f"A tarefa {tarefa_id} não terminou")
+
+    async def test_tarefa_enfileirada_e_consultada_ate_concluir(self):
+        resposta = await self._enviar(b"historico")
+        self.assertEqual(resposta.status_code, 202)
+        tarefa = resposta.json()
+        self.assertIn(tarefa["status"], ("PENDENTE", "EXECUTANDO"))
+        self.assertNotIn("resultado", tarefa)
+
+        self.liberar.set()
+        concluida = await self._aguardar_conclusao(tarefa["id"])
+
+        self.assertEqual(concluida["status"], "CONCLUIDA")
+        self.assertEqual(concluida["resultado"], {"conteudo": "historico"})
+        self.assertIsNotNone(concluida["concluida_em"])
+
+    async def test_fila_cheia_responde_503(self):
+        primeira = await self._enviar(b"primeiro")
+        self.assertEqual(primeira.status_code, 202)
+
+        resposta = await self._enviar(b"segundo")
+
+        self.assertEqual(resposta.status_code, 503)
+        self.assertIn("Retry-After", resposta)
+        metricas = (await self.async_client.get(f"{self.URL}/tarefas")).json()
+        self.assertEqual(metricas["executando"], 1)
+        self.assertEqual(metricas["aguardando"], 0)
+        self.assertEqual(metricas["enfileiradas"], 1)
+        self.assertEqual(metricas["rejeitadas"], 1)
+
+    async def test_tarefa_com_erro_termina_como_falha(self):
+        tarefa = (await self._enviar(b"invalido")).json()
+
+        self.liberar.set()
+        falha = await self._aguardar_conclusao(tarefa["id"])
+
+        self.assertEqual(falha["status"], "FALHOU")
+        self.assertEqual(falha["erro"], "PDF inválido")
+        self.assertNotIn("resultado", falha)
+
+    async def test_tarefa_inexistente_responde_404(self):
+        resposta = await self.async_client.get(f"{self.URL}/tarefas/inexistente")
+
+        self.assertEqual(resposta.status_code, 404)
+        self.assertIn("erro", resposta.json())
+
+
+class RegistroMatrizesTests(TestCase):
+    def test_obter_pelo_nome_e_pela_versao(self):
+        registro = RegistroMatrizes()
+        registrada = registro.registrar(MATRIZ_HORARIA, nome="atual")
+
+        self.assertIs(registro.obter("atual"), registrada)
+        self.assertIs(registro.obter(registrada.versao), registrada)
+        with self.assertRaises(MatrizNaoEncontrada):
+            registro.obter("inexistente")
+
+    def test_versao_substituida_deixa_de_ser_registrada(self):
+        registro = RegistroMatrizes()
+        antiga = registro.registrar(MATRIZ_HORARIA, nome="atual")
+        registro.registrar(MATRIZ_HORARIA, nome="copia")
+        nova = registro.registrar(MATRIZ_HORARIA[1:], nome="atual")
+
+        # A versão antiga continua registrada enquanto "copia" apontar para ela.
+        self.assertEqual(registro.obter(antiga.versao).versao, antiga.versao)
+        registro.registrar(MATRIZ_HORARIA[2:], nome="copia")
+
+        with self.assertRaises(MatrizNaoEncontrada):
+            registro.obter(antiga.versao)
+        self.assertIs(registro.obter("atual"), nova)
+        self.assertEqual(len(registro.listar()), 2)
+
+    def test_registrar_artefatos_acompanha_a_troca_da_versao_atual(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            registro = RegistroMatrizes()
+            publicar_matriz(MATRIZ_HORARIA, diretorio, "atual", "teste")
+            (antiga,) = registro.registrar_artefatos(diretorio)
+            self.assertEqual(registro.registrar_artefatos(diretorio), [])
+
+            publicar_matriz(MATRIZ_HORARIA[1:], diretorio, "atual", "teste")
+            (nova,) = registro.registrar_artefatos(diretorio)
+
+            self.assertIs(registro.obter("atual"), nova)
+            self.assertEqual(nova.matriz_horaria, MATRIZ_HORARIA[1:])
+            with self.assertRaises(MatrizNaoEncontrada):
+                registro.obter(antiga.versao)
+
+
+class ArtefatoMatrizTests(TestCase):
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.destino = Path(diretorio.name)
+
+    def _atual(self, nome: str) -> str:
+        return (self.destino / nome / artefato_matriz_svc.ARQUIVO_ATUAL).read_text(encoding="utf-8")
+
+    def test_publicar_grava_a_versao_uma_unica_vez(self):
+        diretorio, gravada = publicar_matriz(MATRIZ_HORARIA, self.destino, "matriz", "teste", revisao="r1")
+        artefato = carregar_artefato(self.destino, "matriz")
+
+        self.assertTrue(gravada)
+        self.assertEqual(diretorio.name, artefato.versao_matriz)
+        self.assertEqual(self._atual("matriz"), diretorio.name)
+        self.assertEqual(artefato.matriz_horaria, MATRIZ_HORARIA)
+        self.assertEqual(artefato.manifesto["revisao"], "r1")
+        self.assertEqual(
+            artefato.indice_horario().pares_em_conflito().tolist(),
+            IndiceHorario(MATRIZ_HORARIA).pares_em_conflito().tolist(),
+        )
+        self.assertEqual(publicar_matriz(MATRIZ_HORARIA, self.destino, "matriz", "teste"), (diretorio, False))
+
+    def test_nova_versao_troca_atual_sem_alterar_a_anterior(self):
+        anterior, _ = publicar_matriz(MATRIZ_HORARIA, self.destino, "matriz", "teste")
+        carregada = carregar_artefato(self.destino, "matriz")
+
+        nova, _ = publicar_matriz(MATRIZ_HORARIA[1:], self.destino, "matriz", "teste")
+
+        self.assertEqual(self._atual("matriz"), nova.name)
+        self.assertEqual(carregar_artefato(self.destino, "matriz").matriz_horaria, MATRIZ_HORARIA[1:])
+        # Quem já carregou a versão anterior segue lendo-a, e nenhum arquivo temporário fica para trás.
+        self.assertEqual(carregada.matriz_horaria, MATRIZ_HORARIA)
+        self.assertEqual(
+            sorted(path.name for path in (self.destino / "matriz").iterdir()),
+            sorted([anterior.name, nova.name, artefato_matriz_svc.ARQUIVO_ATUAL]),
+        )
+
+    def test_falha_na_gravacao_mantem_a_versao_atual(self):
+        anterior, _ = publicar_matriz(MATRIZ_HORARIA, self.destino, "matriz", "teste")
+
+        with mock.patch.object(artefato_matriz_svc, "_escrever_artefato", side_effect=OSError("disco cheio")):
+            with self.assertRaises(OSError):
+                publicar_matriz(MATRIZ_HORARIA[1:], self.destino, "matriz", "teste")
+
+        self.assertEqual(self._atual("matriz"), anterior.name)
+        self.assertEqual(
+            sorted(path.name for path in (self.destino / "matriz").iterdir()),
+            sorted([anterior.name, artefato_matriz_svc.ARQUIVO_ATUAL]),
+        )
+
+    def test_forcar_recompila_em_novo_diretorio_sem_alterar_o_em_uso(self):
+        planilha = DIRETORIO_ARQUIVOS / "matriz_2024_2.xlsx"
+        anterior, compilada = compilar_matriz(planilha, self.destino, nome="matriz")
+        self.assertTrue(compilada)
+        em_uso = carregar_artefato(self.destino, "matriz")
+        arrays = {nome: array.copy() for nome, array in em_uso.arrays.items()}
+        arquivos = sorted(path.name for path in anterior.iterdir())
+
+        recompilada, compilada = compilar_matriz(planilha, self.destino, nome="matriz", forcar=True)
+
+        self.assertTrue(compilada)
+        self.assertNotEqual(recompilada, anterior)
+        self.assertTrue(recompilada.name.startswith(f"{anterior.name}-"))
+        self.assertEqual(self._atual("matriz"), recompilada.name)
+        self.assertEqual(carregar_artefato(self.destino, "matriz").versao, em_uso.versao)
+        # O diretório em uso continua intacto: os arrays mapeados e o JSON (lido sob demanda) seguem válidos.
+        self.assertEqual(sorted(path.name for path in anterior.iterdir()), arquivos)
+        for nome, array in arrays.items():
+            self.assertTrue((em_uso.arrays[nome] == array).all())
+        self.assertEqual(len(em_uso.matriz_horaria), em_uso.manifesto["num_ofertas"])
+        # Sem `forcar`, a versão não é gravada de novo e ATUAL continua na recompilação.
+        self.assertEqual(compilar_matriz(planilha, self.destino, nome="matriz"), (recompilada, False))
+        self.assertEqual(self._atual("matriz"), recompilada.name)
+
+
+class GradeIdealLoteApiTests(TestCase):
+    async def test_resposta_ndjson_com_uma_linha_por_historico(self):
+        historicos = [HISTORICO_LOGICA, [], HISTORICO_LOGICA]
+
+        resposta = await self.async_client.post(
+            "/api/grade-ideal/lote?deterministico=true",
+            {"matriz_id": "atual", "historicos_academicos": historicos},
+            content_type="application/json",
+        )
+        linhas = [json.loads(linha) async for linha in resposta.streaming_content]
+
+        self.assertEqual(resposta["Content-Type"], "application/x-ndjson")
+        self.assertEqual(sorted(linha["indice"] for linha in linhas), [0, 1, 2])
+        for linha in linhas:
+            esperada = GeradorGradeIdeal(
+                MATRIZ_HORARIA, historicos[linha["indice"]], parametros_solver=PARAMETROS_TESTE
+            ).gerar()
+            self.assertEqual(linha["grade"], esperada)
+        self.assertEqual(views.ADMISSAO_SOLVER.metricas()["executando"], 0)
+
+    async def test_linhas_transmitidas_a_medida_que_ficam_prontas_e_canceladas_na_desconexao(self):
+        liberar = threading.Event()
+        resolvidos = []
+
+        def resolver(diretorio, versao_matriz, historico_academico, parametros_solver, versao_curriculo=None):
+            resolvidos.append(len(historico_academico))
+            if not historico_academico:
+                liberar.wait(timeout=10)
+            return [], None
+
+        # Um único worker: o segundo histórico ocupa o pool e o terceiro fica na fila do executor.
+        executor = ThreadPoolExecutor(max_workers=1)
+        with (
+            mock.patch.object(views, "obter_executor", return_value=executor),
+            mock.patch.object(views, "CACHE_GRADE_IDEAL", CacheLRU(8)),
+            mock.patch.object(grade_ideal_lote_svc, "_resolver", resolver),
+        ):
+            resposta = await self.async_client.post(
+                "/api/grade-ideal/lote",
+                {"matriz_id": "atual", "historicos_academicos": [HISTORICO_LOGICA, [], HISTORICO_AED]},
+                content_type="application/json",
+            )
+            linhas = aiter(resposta.streaming_content)
+            primeira = json.loads(await anext(linhas))
+
+            self.assertEqual(primeira, {"indice": 0, "grade": []})
+            self.assertEqual(views.ADMISSAO_SOLVER.metricas()["executando"], 1)
+
+            # Como o servidor ASGI na desconexão do cliente: a tarefa que aguarda a próxima linha é cancelada.
+            proxima = asyncio.ensure_future(anext(linhas))
+            await asyncio.sleep(0.1)
+            proxima.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await proxima
+            liberar.set()
+            await asyncio.to_thread(executor.shutdown)
+
+        self.assertEqual(resolvidos, [1, 0])
+        self.assertEqual(views.ADMISSAO_SOLVER.metricas()["executando"], 0)
+
+    def test_lote_passa_pelo_controle_de_admissao(self):
+        with mock.patch.multiple(views.ADMISSAO_SOLVER, max_concorrencia=0, max_fila=0):
+            resposta = self.client.post(
+                "/api/grade-ideal/lote",
+                {"matriz_id": "atual", "historicos_academicos": [HISTORICO_LOGICA]},
+                content_type="application/json",
+            )
+
+        self.assertEqual(resposta.status_code, 503)
+        self.assertIn("Retry-After", resposta)
+
+
+class MatrizesPublicadasLoteTests(TestCase):
+    def test_versoes_descartadas_sao_removidas_do_disco_apos_o_ultimo_lote(self):
+        with (
+            tempfile.TemporaryDirectory() as diretorio,
+            mock.patch.multiple(
+                grade_ideal_lote_svc,
+                _diretorio_matrizes=Path(diretorio),
+                _matrizes_publicadas=CacheLRU(1, ao_descartar=grade_ideal_lote_svc._descartar_matriz),
+            ),
+        ):
+            versoes = Path(diretorio) / grade_ideal_lote_svc.NOME_MATRIZ_LOTE
+            grade_ideal_lote_svc._publicar_para_workers(MATRIZ_HORARIA[:1], "v1")
+            grade_ideal_lote_svc._publicar_para_workers(MATRIZ_HORARIA[:2], "v2")
+
+            # v1 foi descartada, mas o seu lote ainda não terminou.
+            self.assertTrue((versoes / "v1").exists())
+            grade_ideal_lote_svc._liberar_matriz("v1")
+            self.assertFalse((versoes / "v1").exists())
+
+            grade_ideal_lote_svc._liberar_matriz("v2")
+            self.assertTrue((versoes / "v2").exists())
+            grade_ideal_lote_svc._publicar_para_workers(MATRIZ_HORARIA[:3], "v3")
+            grade_ideal_lote_svc._liberar_matriz("v3")
+            self.assertFalse((versoes / "v2").exists())
+            self.assertEqual(
+                carregar_artefato(Path(diretorio), grade_ideal_lote_svc.NOME_MATRIZ_LOTE, "v3").versao, "v3"
+            )
+        self.assertFalse(grade_ideal_lote_svc._matrizes_em_uso)
+
+
+class PoolLoteTests(TestCase):
+    async def test_pool_quebrado_e_substituido(self):
+        quebrado = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        with self.assertRaises(BrokenProcessPool):
+            quebrado.submit(os._exit, 1).result()
+
+        with mock.patch.multiple(grade_ideal_lote_svc, _executor=quebrado, _max_workers_executor=1):
+            resultados = [
+                resultado
+                async for resultado in grade_ideal_lote_svc.resolver_em_lote(
+                    MATRIZ_HORARIA, [HISTORICO_LOGICA], PARAMETROS_TESTE, quebrado, curriculo=curriculo_padrao()
+                )
+            ]
+            substituto = grade_ideal_lote_svc._executor
+        await asyncio.to_thread(substituto.shutdown)
+
+        self.assertIsNot(substituto, quebrado)
+        esperada = GeradorGradeIdeal(MATRIZ_HORARIA, HISTORICO_LOGICA, parametros_solver=PARAMETROS_TESTE).gerar()
+        self.assertEqual(resultados, [{"indice": 0, "grade": esperada}])
+
+
+class OfertaQuerySetTests(TestCase):
+    def test_filtrar_disciplina_por_trecho_do_nome(self):
+        matriz, _ = MatrizHoraria.objects.importar(MATRIZ_HORARIA, "teste")
+
+        ofertas = matriz.ofertas.filtrar(disciplina="banco")
+
+        esperadas = [oferta for oferta in MATRIZ_HORARIA if "BANCO" in oferta["nome"].upper()]
+        self.assertTrue(esperadas)
+        self.assertEqual(list(ofertas.values_list("dados", flat=True)), esperadas)
+
+
+class MatrizHorariaApiTests(TestCase):
+    def test_etag_e_revalidacao(self):
+        resposta = self.client.get("/api/matriz-horaria")
+        por_etag = self.client.get("/api/matriz-horaria", HTTP_IF_NONE_MATCH=resposta["ETag"])
+        por_data = self.client.get("/api/matriz-horaria", HTTP_IF_MODIFIED_SINCE=resposta["Last-Modified"])
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(json.loads(resposta.content), MATRIZ_HORARIA)
+        self.assertEqual(por_etag.status_code, 304)
+        self.assertEqual(por_data.status_code, 304)
+
+    def test_negociacao_gzip(self):
+        identidade = self.client.get("/api/matriz-horaria")
+        comprimida = self.client.get("/api/matriz-horaria", HTTP_ACCEPT_ENCODING="br, gzip")
+        recusada = self.client.get("/api/matriz-horaria", HTTP_ACCEPT_ENCODING="gzip;q=0, br")
+        curinga = self.client.get("/api/matriz-horaria", HTTP_ACCEPT_ENCODING="*")
+
+        self.assertEqual(comprimida["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(comprimida.content)), MATRIZ_HORARIA)
+        self.assertNotIn("Content-Encoding", recusada)
+        self.assertEqual(recusada.content, identidade.content)
+        self.assertEqual(curinga["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", comprimida["Vary"])
+
+    def test_etag_distinto_por_codificacao(self):
+        identidade = self.client.get("/api/matriz-horaria")
+        comprimida = self.client.get("/api/matriz-horaria", HTTP_ACCEPT_ENCODING="gzip")
+        cruzada = self.client.get(
+            "/api/matriz-horaria", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=identidade["ETag"]
+        )
+        revalidada = self.client.get(
+            "/api/matriz-horaria", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=comprimida["ETag"]
+        )
+
+        self.assertNotEqual(identidade["ETag"], comprimida["ETag"])
+        self.assertEqual(cruzada.status_code, 200)
+        self.assertEqual(revalidada.status_code, 304)
+
+    def test_matriz_nao_importada(self):
+        resposta = self.client.get("/api/matriz-horaria", {"curso": "BCT-I"})
+
+        self.assertEqual(resposta.status_code, 404)
+        self.assertIn("importar_matriz", resposta.json()["erro"])
+
+    def test_nova_versao_do_json_exige_nova_importacao(self):
+        # Versão anterior da matriz importada com o nome da atual: o JSON servido mudou desde a importação.
+        MatrizHoraria.objects.importar(MATRIZ_HORARIA[1:], views.MATRIZ_ATUAL)
+
+        desatualizada = self.client.get("/api/matriz-horaria", {"curso": "BCT-I"})
+        MatrizHoraria.objects.importar(MATRIZ_HORARIA, views.MATRIZ_ATUAL)
+        reimportada = self.client.get("/api/matriz-horaria", {"curso": "BCT-I"})
+
+        self.assertEqual(desatualizada.status_code, 404)
+        self.assertEqual(reimportada.status_code, 200)
+        self.assertEqual(reimportada.json(), [oferta for oferta in MATRIZ_HORARIA if oferta["curso"] == "BCT-I"])
+
+    def test_filtros_e_paginacao(self):
+        MatrizHoraria.objects.importar(MATRIZ_HORARIA, views.MATRIZ_ATUAL)
+        esperadas = [
+            oferta
+            for oferta in MATRIZ_HORARIA
+            if oferta["curso"] == "BCT-I"
+            and oferta["termo"] == "2"
+            and any(
+                dia == "TERÇA" and horario >= "13h30"
+                for dia, horario in zip(oferta["dias"], oferta["horarios"], strict=False)
+            )
+        ]
+        parametros = {"curso": "BCT-I", "termo": 2, "dia": "terça", "inicio": "13:30", "limite": 2, "deslocamento": 1}
+
+        resposta = self.client.get("/api/matriz-horaria", parametros)
+        revalidacao = self.client.get("/api/matriz-horaria", parametros, HTTP_IF_NONE_MATCH=resposta["ETag"])
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta["X-Total-Count"], str(len(esperadas)))
+        self.assertEqual(resposta.json(), esperadas[1:3])
+        self.assertEqual(revalidacao.status_code, 304)
+
+    def test_versoes_anteriores_sao_mantidas(self):
+        anterior, _ = MatrizHoraria.objects.importar(MATRIZ_HORARIA[1:], views.MATRIZ_ATUAL)
+        atual, importada = MatrizHoraria.objects.importar(MATRIZ_HORARIA, views.MATRIZ_ATUAL)
+
+        self.assertTrue(importada)
+        self.assertEqual(
+            set(MatrizHoraria.objects.filter(nome=views.MATRIZ_ATUAL).values_list("pk", flat=True)),
+            {anterior.pk, atual.pk},
+        )
+
+
+class CacheArquivoJsonTests(TestCase):
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.path = Path(diretorio.name) / "matriz.json"
+        self.cache = CacheArquivoJson(self.path)
+
+    def _escrever(self, conteudo: str, mtime_ns: int) -> None:
+        self.path.write_text(conteudo, encoding="utf-8")
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_arquivo_inalterado_nao_e_relido(self):
+        self._escrever('[{"nome": "A"}]', 1_000_000_000)
+        entrada = self.cache.obter()
+
+        with mock.patch.object(Path, "read_bytes", side_effect=AssertionError("arquivo relido")):
+            self.assertIs(self.cache.obter(), entrada)
+        self.assertEqual(entrada.dados, [{"nome": "A"}])
+        self.assertEqual(gzip.decompress(entrada.corpo_gzip), entrada.corpo)
+
+    def test_recarrega_quando_o_tamanho_ou_o_mtime_mudam(self):
+        self._escrever('[{"nome": "A"}]', 1_000_000_000)
+        original = self.cache.obter()
+
+        self._escrever('[{"nome": "AB"}]', 1_000_000_000)
+        outro_tamanho = self.cache.obter()
+        self._escrever('[{"nome": "XY"}]', 2_000_000_000)
+        outro_mtime = self.cache.obter()
+
+        self.assertEqual(outro_tamanho.dados, [{"nome": "AB"}])
+        self.assertEqual(outro_mtime.dados, [{"nome": "XY"}])
+        self.assertEqual(len({original.etag, outro_tamanho.etag, outro_mtime.etag}), 3)
+
+    def test_etag_estavel_quando_apenas_o_mtime_muda(self):
+        self._escrever('[{"nome": "A"}]', 1_000_000_000)
+        original = self.cache.obter()
+
+        self._escrever('[{"nome": "A"}]', 2_000_000_000)
+        tocada = self.cache.obter()
+
+        self.assertEqual(tocada.etag, original.etag)
+        self.assertIs(tocada.dados, original.dados)
+        self.assertEqual(tocada.ultima_modificacao, 2.0)
+
+    def test_revalidacao_apos_recarga_sem_mudanca_de_conteudo(self):
+        self._escrever('[{"nome": "A"}]', 1_000_000_000)
+        with mock.patch.object(views, "CACHE_MATRIZ_HORARIA", self.cache):
+            primeira = self.client.get("/api/matriz-horaria")
+            self._escrever('[{"nome": "A"}]', 2_000_000_000)
+            revalidada = self.client.get("/api/matriz-horaria", HTTP_IF_NONE_MATCH=primeira["ETag"])
+            comprimida = self.client.get(
+                "/api/matriz-horaria", HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=primeira["ETag"]
+            )
+
+        self.assertNotIn("Content-Encoding", primeira)
+        self.assertEqual(json.loads(primeira.content), [{"nome": "A"}])
+        self.assertEqual(revalidada.status_code, 304)
+        self.assertEqual(comprimida.status_code, 200)
+        self.assertEqual(comprimida["Content-Encoding"], "gzip")
+
+
+class CacheGradeIdealTests(TestCase):
+    def test_lru_descarta_o_item_usado_ha_mais_tempo(self):
+        descartados = []
+        cache = CacheLRU(2, ao_descartar=lambda chave, valor: descartados.append((chave, valor)))
+        cache.armazenar("a", 1)
+        cache.armazenar("b", 2)
+        cache.obter("a")
+        cache.armazenar("c", 3)
+
+        self.assertIsNone(cache.obter("b"))
+        self.assertEqual((cache.obter("a"), cache.obter("c")), (1, 3))
+        self.assertEqual(descartados, [("b", 2)])
+        self.assertEqual(cache.estatisticas()["descartados"], 1)
+
+    def test_lru_expira_itens_apos_o_ttl(self):
+        cache = CacheLRU(2, ttl=10)
+        with mock.patch("jailmaker.service.cache_svc.time.monotonic", return_value=100.0):
+            cache.armazenar("a", 1)
+        with mock.patch("jailmaker.service.cache_svc.time.monotonic", return_value=109.0):
+            self.assertEqual(cache.obter("a"), 1)
+        with mock.patch("jailmaker.service.cache_svc.time.monotonic", return_value=110.0):
+            self.assertIsNone(cache.obter("a"))
+
+        estatisticas = cache.estatisticas()
+        self.assertEqual((estatisticas["itens"], estatisticas["expirados"]), (0, 1))
+
+    def test_cache_django_le_e_grava_com_o_prefixo(self):
+        backend = LocMemCache("jailmaker-testes", {})
+        cache = CacheDjango(backend, ttl=60, prefixo="grade-ideal")
+
+        self.assertIsNone(cache.obter("chave"))
+        cache.armazenar("chave", ([{"nome": "A"}], {"status": "OPTIMAL"}))
+
+        self.assertEqual(cache.obter("chave"), ([{"nome": "A"}], {"status": "OPTIMAL"}))
+        self.assertEqual(backend.get("grade-ideal:chave"), ([{"nome": "A"}], {"status": "OPTIMAL"}))
+        self.assertEqual(cache.estatisticas(), {"ttl": 60, "acertos": 1, "falhas": 1})
+        cache.limpar()
+        self.assertIsNone(cache.obter("chave"))
+
+    def test_camadas_leem_em_ordem_e_promovem_o_valor_do_disco(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            memoria = CacheLRU(4)
+            disco = CacheDisco(Path(diretorio), tamanho_maximo_bytes=1 << 20)
+            cache = CacheEmCamadas(memoria, disco)
+            disco.armazenar("chave", {"grade": [1, 2]})
+
+            self.assertIsNone(memoria.obter("chave"))
+            self.assertEqual(cache.obter("chave"), {"grade": [1, 2]})
+            self.assertEqual(memoria.obter("chave"), {"grade": [1, 2]})
+
+            cache.armazenar("outra", [3])
+            self.assertEqual((memoria.obter("outra"), disco.obter("outra")), ([3], [3]))
+            cache.limpar()
+            self.assertIsNone(cache.obter("chave"))
+            self.assertEqual(disco.estatisticas()["itens"], 0)
+
+    def test_disco_descarta_os_arquivos_acessados_ha_mais_tempo(self):
+        with tempfile.TemporaryDirectory() as diretorio:
+            disco = CacheDisco(Path(diretorio), tamanho_maximo_bytes=30)
+            disco.armazenar("antiga", "x" * 10)
+            os.utime(Path(diretorio) / "antiga.json", (1, 1))
+            disco.armazenar("nova", "y" * 10)
+            disco.armazenar("mais-nova", "z" * 10)
+
+            self.assertIsNone(disco.obter("antiga"))
+            self.assertEqual(disco.obter("mais-nova"), "z" * 10)
+            self.assertEqual(disco.estatisticas()["descartados"], 1)
+
+    def test_delete_esvazia_o_cache_de_grades(self):
+        cache = CacheLRU(4)
+        cache.armazenar("chave", ([], None))
+        with mock.patch.object(views, "CACHE_GRADE_IDEAL", cache):
+            resposta = self.client.delete("/api/grade-ideal/cache")
+            estatisticas = self.client.get("/api/grade-ideal/cache").json()
+
+        self.assertEqual(resposta.status_code, 204)
+        self.assertEqual(estatisticas["itens"], 0)
+
+
+class MetricasMiddlewareTests(TestCase):
+    def setUp(self):
+        # Registro vazio, para que as contagens não dependam das requisições feitas pelos outros testes.
+        self.metricas = RegistroMetricas()
+        for modulo in (middleware, views):
+            patcher = mock.patch.object(modulo, "METRICAS", self.metricas)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_server_timing_informa_as_etapas_e_o_total(self):
+        resposta = self.client.post(URL_GRADE_IDEAL, {}, content_type="application/json")
+
+        etapas = [etapa.split(";dur=")[0] for etapa in resposta["Server-Timing"].split(", ")]
+        self.assertEqual(etapas, ["requisicao.json", "total"])
+
+    async def test_server_timing_em_view_assincrona(self):
+        resposta = await self.async_client.post(URL_GRADE_IDEAL, {}, content_type="application/json")
+
+        self.assertRegex(resposta["Server-Timing"], r"total;dur=\d+\.\d{2}$")
+
+    def test_server_timing_desativado(self):
+        with self.settings(JAILMAKER_METRICAS={"SERVER_TIMING": False}):
+            resposta = self.client.get("/api/curriculos")
+
+        self.assertNotIn("Server-Timing", resposta)
+
+    def test_metrics_exporta_contadores_e_histogramas_por_rota(self):
+        self.client.get("/api/curriculos")
+        self.client.get("/api/curriculos")
+        self.client.get("/api/historico-academico/tarefas/inexistente")
+
+        resposta = self.client.get("/api/metrics")
+
+        self.assertEqual(resposta.status_code, 200)
+        self.assertTrue(resposta["Content-Type"].startswith("text/plain; version=0.0.4"))
+        linhas = resposta.content.decode().splitlines()
+        self.assertIn("# TYPE jailmaker_requisicoes_total counter", linhas)
+        self.assertIn('jailmaker_requisicoes_total{metodo="GET",rota="api/curriculos",status="200"} 2', linhas)
+        # A rota mantém o parâmetro sem substituir, e não o identificador consultado.
+        rota_tarefa = "api/historico-academico/tarefas/<tarefa_id>"
+        self.assertIn(f'jailmaker_requisicoes_total{{metodo="GET",rota="{rota_tarefa}",status="404"}} 1', linhas)
+        self.assertIn("# TYPE jailmaker_requisicao_duracao_segundos histogram", linhas)
+        self.assertIn(
+            'jailmaker_requisicao_duracao_segundos_bucket{metodo="GET",rota="api/curriculos",le="+Inf"} 2', linhas
+        )
+        self.assertIn('jailmaker_requisicao_duracao_segundos_count{metodo="GET",rota="api/curriculos"} 2', linhas)
+        self.assertTrue(any(linha.startswith("jailmaker_fila_historico_rejeitadas ") for linha in linhas))
+
+
+class LeitorMatrizHorariaTests(TestCase):
+    def test_leitura_vetorizada_equivale_a_leitura_celula_a_celula(self):
+        path = str(DIRETORIO_ARQUIVOS / "matriz_2024_2.xlsx")
+
+        pd.testing.assert_frame_equal(LeitorMatrizHoraria(path).ler(), LeitorMatrizHorariaReferencia(path).ler())
+
+    def test_conversao_vetorizada_equivale_em_planilha_ampliada(self):
+        planilha = gerar_planilha_matriz_horaria(3)
+
+        vetorizada = LeitorMatrizHoraria("").converter(planilha.copy())
+        referencia = LeitorMatrizHorariaReferencia("").converter(planilha.copy())
+
+        self.assertEqual(len(vetorizada), 3 * len(MATRIZ_HORARIA))
+        pd.testing.assert_frame_equal(vetorizada, referencia)
+
+
+class CoalescenciaTests(TestCase):
+    def test_impressao_digital_identifica_requisicoes_equivalentes(self):
+        def impressao(historico, **kwargs):
+            return GeradorGradeIdeal(
+                MATRIZ_HORARIA, historico, parametros_solver=PARAMETROS_TESTE, **kwargs
+            ).impressao_digital()
+
+        historico = [*HISTORICO_LOGICA, {"nome": "GEOMETRIA ANALÍTICA", "situacao": "APROVADO", "turma": "IA"}]
+        base = impressao(historico)
+
+        self.assertEqual(impressao(list(reversed(historico))), base)
+        self.assertEqual(impressao([{**disciplina, "faltas": "0"} for disciplina in historico]), base)
+        self.assertNotEqual(impressao(HISTORICO_LOGICA), base)
+        self.assertNotEqual(impressao(historico, pesos="transitivos"), base)
+        self.assertNotEqual(
+            GeradorGradeIdeal(MATRIZ_HORARIA, historico, parametros_solver=ParametrosSolver()).impressao_digital(),
+            base,
+        )
+
+    async def test_chamadas_simultaneas_com_a_mesma_chave_compartilham_a_execucao(self):
+        coalescedor = Coalescedor()
+        liberar = asyncio.Event()
+        execucoes = []
+
+        async def resolver(chave):
+            execucoes.append(chave)
+            await liberar.wait()
+            return chave.upper()
+
+        chamadas = [
+            asyncio.create_task(coalescedor.executar(chave, lambda chave=chave: resolver(chave)))
+            for chave in ("a", "a", "a", "b")
+        ]
+        await asyncio.sleep(0)
+        liberar.set()
+        resultados = await asyncio.gather(*chamadas)
+
+        self.assertEqual(sorted(execucoes), ["a", "b"])
+        self.assertEqual(resultados, [("A", False), ("A", True), ("A", True), ("B", False)])
+        self.assertEqual(coalescedor.estatisticas(), {"em_andamento": 0, "executadas": 2, "coalescidas": 2})
+
+    async def test_erro_e_repassado_a_todas_as_chamadas(self):
+        coalescedor = Coalescedor()
+        liberar = asyncio.Event()
+
+        async def falhar():
+            await liberar.wait()
+            raise ValueError("falhou")
+
+        chamadas = [asyncio.create_task(coalescedor.executar("a", falhar)) for _ in range(3)]
+        await asyncio.sleep(0)
+        liberar.set()
+        resultados = await asyncio.gather(*chamadas, return_exceptions=True)
+
+        self.assertTrue(all(isinstance(resultado, ValueError) for resultado in resultados))
+
+
+class SincronizadorMatrizTests(TestCase):
+    def setUp(self):
+        diretorio = tempfile.TemporaryDirectory()
+        self.addCleanup(diretorio.cleanup)
+        self.destino = Path(diretorio.name)
+        self.cliente = ClientePlanilhaLocal.de_xlsx(DIRETORIO_ARQUIVOS / "matriz_2024_2.xlsx")
+        self.registro = RegistroMatrizes()
+        self.sincronizador = SincronizadorMatriz(self.cliente, self.destino, "planilha", registro=self.registro)
+
+    def _sincronizar_do_zero(self) -> list[dict]:
+        """Converte a planilha atual inteira em outro diretório, como referência."""
+        diretorio = Path(tempfile.mkdtemp(dir=self.destino))
+        SincronizadorMatriz(ClientePlanilhaLocal(self.cliente.valores()), diretorio, "referencia").sincronizar()
+        return carregar_artefato(diretorio, "referencia").matriz_horaria
+
+    def _editar_professor(self) -> tuple[int, int]:
+        """Troca o professor da primeira célula de turma e professor da planilha e retorna a célula editada."""
+        valores = self.cliente.valores()
+        for linha in range(3, len(valores), 2):
+            for coluna in range(2, len(valores[linha])):
+                if " - " in valores[linha][coluna]:
+                    turma = valores[linha][coluna].split(" - ")[0]
+                    self.cliente.atualizar(linha, coluna, f"{turma} - Fulano de Tal")
+                    return linha, coluna
+        raise AssertionError("Nenhuma célula de turma e professor na planilha")
+
+    def test_primeira_sincronizacao_converte_a_planilha_inteira(self):
+        resultado = self.sincronizador.sincronizar()
+
+        self.assertEqual(resultado.blocos_alterados, resultado.blocos)
+        self.assertTrue(resultado.gravada)
+        self.assertEqual(carregar_artefato(self.destino, "planilha").matriz_horaria, MATRIZ_HORARIA)
+        self.assertEqual(self.registro.obter("planilha").versao, resultado.versao)
+
+    def test_planilha_sem_alteracoes_nao_e_convertida(self):
+        primeira = self.sincronizador.sincronizar()
+
+        resultado = self.sincronizador.sincronizar()
+
+        self.assertEqual(resultado.revisao, primeira.revisao)
+        self.assertEqual(resultado.blocos_alterados, 0)
+        self.assertIsNone(resultado.versao)
+
+    def test_apenas_o_bloco_alterado_e_convertido(self):
+        self.sincronizador.sincronizar()
+        self._editar_professor()
+
+        resultado = self.sincronizador.sincronizar()
+
+        matriz_horaria = carregar_artefato(self.destino, "planilha").matriz_horaria
+        self.assertEqual(resultado.blocos_alterados, 1)
+        self.assertEqual(matriz_horaria, self._sincronizar_do_zero())
+        self.assertIn("FULANO DE TAL", {oferta["professor"] for oferta in matriz_horaria})
+        self.assertEqual(self.registro.obter("planilha").versao, resultado.versao)
+
+    def test_disciplina_apagada_e_removida_da_matriz(self):
+        self.sincronizador.sincronizar()
+        linha, coluna = self._editar_professor()
+        self.sincronizador.sincronizar()
+        self.cliente.atualizar(linha - 1, coluna, "")
+
+        resultado = self.sincronizador.sincronizar()
+
+        self.assertEqual(resultado.blocos_alterados, 1)
+        self.assertEqual(carregar_artefato(self.destino, "planilha").matriz_horaria, self._sincronizar_do_zero())
@@ -1,50 +1,802 @@
-import json
+import asyncio
+import hashlib
+from collections.abc import AsyncGenerator, AsyncIterator
 from http import HTTPStatus
 from pathlib import Path
 
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
 from ninja import NinjaAPI
+from pydantic import ValidationError
 
-from jailmaker.service.grade_ideal_svc import GeradorGradeIdeal
+from jailmaker.models import MatrizHoraria
+from jailmaker.schemas import (
+    ADAPTADOR_EDICAO_SESSAO,
+    ADAPTADOR_GRADE_IDEAL,
+    ADAPTADOR_LOTE,
+    AlternativasComEstatisticas,
+    GradeAlternativa,
+    GradeIdealComEstatisticas,
+    Oferta,
+    Sessao,
+    corpo_openapi,
+)
+from jailmaker.serializacao import ParserOrjson, RendererOrjson, serializar
+from jailmaker.service.admissao_svc import ControleAdmissao, PrazoEsgotado, Reserva
+from jailmaker.service.cache_svc import (
+    CacheArquivoJson,
+    CacheDisco,
+    CacheDjango,
+    CacheEmCamadas,
+    CacheLRU,
+    EntradaArquivoJson,
+)
+from jailmaker.service.coalescencia_svc import Coalescedor
+from jailmaker.service.curriculos_svc import Curriculo, CurriculoNaoEncontrado, RegistroCurriculos
+from jailmaker.service.grade_ideal_lote_svc import obter_executor, resolver_em_lote
+from jailmaker.service.grade_ideal_svc import GeradorGradeIdeal, ParametrosSolver
 from jailmaker.service.historico_academico_svc import LeitorHistoricoAcademico
+from jailmaker.service.indice_horario_svc import DIAS_SEMANA, horario_para_minutos
+from jailmaker.service.metricas_svc import METRICAS, medir_etapa
+from jailmaker.service.registro_matrizes_svc import MatrizNaoEncontrada, MatrizRegistrada, RegistroMatrizes
+from jailmaker.service.sessoes_svc import RegistroSessoes, SessaoGradeIdeal, SessaoNaoEncontrada
+from jailmaker.service.tarefas_svc import FilaCheia, FilaTarefas
 
-api = NinjaAPI(title="Jailmaker API", version="1.0")
+# Corpos e respostas JSON são (de)serializados com o orjson.
+api = NinjaAPI(title="Jailmaker API", version="1.0", parser=ParserOrjson(), renderer=RendererOrjson())
 
+ALTERNATIVAS_K_MAXIMO = 20
 
-@api.get("/matriz-horaria")
-def listar_matriz_horaria(request):
+CACHE_MATRIZ_HORARIA = CacheArquivoJson(Path(__file__).parent / "files" / "matriz_2024_2.json")
+
+# Nome com que a matriz servida em /matriz-horaria é registrada.
+MATRIZ_ATUAL = "atual"
+REGISTRO_MATRIZES = RegistroMatrizes()
+REGISTRO_MATRIZES.acompanhar_artefatos(
+    settings.JAILMAKER_MATRIZES["DIRETORIO_ARTEFATOS"],
+    intervalo_verificacao=settings.JAILMAKER_MATRIZES["INTERVALO_VERIFICACAO"],
+)
+
+REGISTRO_CURRICULOS = RegistroCurriculos(
+    settings.JAILMAKER_CURRICULOS["DIRETORIO"],
+    curso_padrao=settings.JAILMAKER_CURRICULOS["CURSO_PADRAO"],
+    intervalo_verificacao=settings.JAILMAKER_CURRICULOS["INTERVALO_VERIFICACAO"],
+)
+
+
+def _criar_cache_grade_ideal() -> CacheLRU | CacheDjango:
+    """
+    Cria o cache de grades ideais conforme JAILMAKER_CACHE_GRADE_IDEAL.
+    """
+    configuracao = settings.JAILMAKER_CACHE_GRADE_IDEAL
+    if configuracao["CACHE_DJANGO"]:
+        return CacheDjango(caches[configuracao["CACHE_DJANGO"]], ttl=configuracao["TTL"], prefixo="grade-ideal")
+    return CacheLRU(configuracao["TAMANHO_MAXIMO"], ttl=configuracao["TTL"])
+
+
+CACHE_GRADE_IDEAL = _criar_cache_grade_ideal()
+
+
+def _criar_cache_historico_academico() -> CacheEmCamadas:
+    """
+    Cria o cache de históricos acadêmicos lidos conforme JAILMAKER_CACHE_HISTORICO.
+    """
+    configuracao = settings.JAILMAKER_CACHE_HISTORICO
+    camadas = [CacheLRU(configuracao["TAMANHO_MAXIMO"])]
+    if configuracao["DIRETORIO"]:
+        camadas.append(CacheDisco(configuracao["DIRETORIO"], configuracao["TAMANHO_MAXIMO_DISCO"]))
+    return CacheEmCamadas(*camadas)
+
+
+CACHE_HISTORICO_ACADEMICO = _criar_cache_historico_academico()
+
+FILA_HISTORICO_ACADEMICO = FilaTarefas(
+    max_workers=settings.JAILMAKER_TAREFAS_HISTORICO["MAX_WORKERS"],
+    max_fila=settings.JAILMAKER_TAREFAS_HISTORICO["MAX_FILA"],
+    ttl_resultados=settings.JAILMAKER_TAREFAS_HISTORICO["TTL_RESULTADOS"],
+    usar_processos=settings.JAILMAKER_TAREFAS_HISTORICO["USAR_PROCESSOS"],
+)
+
+
+# Pools dedicados às resoluções e às leituras síncronas de PDFs, executados a partir de views assíncronas.
+ADMISSAO_SOLVER = ControleAdmissao(
+    "solver",
+    max_concorrencia=settings.JAILMAKER_ADMISSAO["SOLVER"]["MAX_CONCORRENCIA"],
+    max_fila=settings.JAILMAKER_ADMISSAO["SOLVER"]["MAX_FILA"],
+    prazo=settings.JAILMAKER_ADMISSAO["SOLVER"]["PRAZO"],
+)
+ADMISSAO_HISTORICO = ControleAdmissao(
+    "historico",
+    max_concorrencia=settings.JAILMAKER_ADMISSAO["HISTORICO"]["MAX_CONCORRENCIA"],
+    max_fila=settings.JAILMAKER_ADMISSAO["HISTORICO"]["MAX_FILA"],
+    prazo=settings.JAILMAKER_ADMISSAO["HISTORICO"]["PRAZO"],
+)
+
+# Resoluções idênticas simultâneas de /grade-ideal compartilham uma única execução.
+COALESCEDOR_GRADE_IDEAL = Coalescedor()
+
+REGISTRO_SESSOES = RegistroSessoes(
+    max_sessoes=settings.JAILMAKER_SESSOES["MAX_SESSOES"],
+    ttl=settings.JAILMAKER_SESSOES["TTL"],
+)
+
+
+def _parametros_solver(
+    tempo_limite: float | None, num_workers: int | None, deterministico: bool | None
+) -> ParametrosSolver:
     """
-    Carrega e retorna a matriz horária atual a partir do seu arquivo JSON.
+    Monta os parâmetros do solver a partir de JAILMAKER_SOLVER, aplicando os valores informados na requisição.
     """
+    configuracao = settings.JAILMAKER_SOLVER
+    tempo_limite = configuracao["TEMPO_LIMITE"] if tempo_limite is None else tempo_limite
+    num_workers = configuracao["NUM_WORKERS"] if num_workers is None else num_workers
+    deterministico = configuracao["DETERMINISTICO"] if deterministico is None else deterministico
+
+    if not 0 < tempo_limite <= configuracao["TEMPO_LIMITE_MAXIMO"]:
+        raise ValueError(f"tempo_limite deve estar entre 0 e {configuracao['TEMPO_LIMITE_MAXIMO']} segundos")
+    if not 1 <= num_workers <= configuracao["NUM_WORKERS_MAXIMO"]:
+        raise ValueError(f"num_workers deve estar entre 1 e {configuracao['NUM_WORKERS_MAXIMO']}")
+    return ParametrosSolver(tempo_limite=tempo_limite, num_workers=num_workers, deterministico=deterministico)
+
+
+def _matriz_da_requisicao(data: dict) -> MatrizRegistrada:
+    """
+    Obtém a matriz horária da requisição: a matriz registrada no servidor referenciada por `matriz_id`
+    (nome ou versão), ou a matriz enviada por inteiro em `matriz_horaria`.
+    A matriz servida em /matriz-horaria fica registrada com o nome "atual".
+
+    Raises:
+        MatrizNaoEncontrada: Se `matriz_id` não corresponder a nenhuma matriz registrada.
+        ValueError: Se a requisição não trouxer nem `matriz_horaria` nem `matriz_id`.
+    """
+    if "matriz_id" not in data:
+        if "matriz_horaria" not in data:
+            raise ValueError("Informe a matriz horária em matriz_horaria ou uma matriz registrada em matriz_id")
+        return MatrizRegistrada(None, None, data["matriz_horaria"])
+
+    REGISTRO_MATRIZES.registrar(CACHE_MATRIZ_HORARIA.obter().dados, nome=MATRIZ_ATUAL)
+    return REGISTRO_MATRIZES.obter(str(data["matriz_id"]))
+
+
+def _responder_sobrecarga(request, exc: Exception) -> HttpResponse:
+    """
+    Responde 503 com Retry-After a requisições rejeitadas por falta de capacidade,
+    ou 504 a requisições que esgotaram o prazo.
+    """
+    if isinstance(exc, PrazoEsgotado):
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.GATEWAY_TIMEOUT)
+    resposta = api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.SERVICE_UNAVAILABLE)
+    resposta["Retry-After"] = str(settings.JAILMAKER_ADMISSAO["RETRY_AFTER"])
+    return resposta
+
+
+def _responder_corpo_invalido(request, exc: ValidationError) -> HttpResponse:
+    """
+    Responde 400 a requisições cujo corpo não corresponde ao esquema declarado, indicando o local e o motivo
+    de cada erro (sem repetir os valores recebidos).
+    """
+    detalhes = exc.errors(include_url=False, include_context=False, include_input=False)
+    return api.create_response(
+        request, {"erro": "Corpo da requisição inválido", "detalhes": detalhes}, status=HTTPStatus.BAD_REQUEST
+    )
+
+
+def _aceita_gzip(accept_encoding: str) -> bool:
+    """
+    Indica se o cabeçalho Accept-Encoding aceita gzip, considerando os q-values: q=0 recusa a codificação,
+    e uma menção a gzip (ou x-gzip) prevalece sobre "*".
+    """
+    qualidades = {}
+    for item in accept_encoding.split(","):
+        codificacao, *parametros = (parte.strip() for parte in item.split(";"))
+        qualidade = 1.0
+        for parametro in parametros:
+            nome, _, valor = parametro.partition("=")
+            if nome.strip().lower() == "q":
+                try:
+                    qualidade = float(valor)
+                except ValueError:
+                    qualidade = 0.0
+        qualidades[codificacao.lower()] = qualidade
+    for codificacao in ("gzip", "x-gzip", "*"):
+        if codificacao in qualidades:
+            return qualidades[codificacao] > 0
+    return False
+
+
+def _responder_json_em_cache(request, entrada: EntradaArquivoJson) -> HttpResponse:
+    """
+    Monta a resposta para um JSON mantido em cache, respondendo 304 a requisições condicionais
+    e enviando o corpo pré-comprimido quando o cliente aceita gzip. Cada representação tem o seu ETag
+    (o da comprimida com o sufixo "-gzip"), já que os corpos diferem byte a byte.
+    """
+    ultima_modificacao = int(entrada.ultima_modificacao)
+    comprimir = _aceita_gzip(request.headers.get("Accept-Encoding", ""))
+    etag = f'{entrada.etag[:-1]}-gzip"' if comprimir else entrada.etag
+    resposta = get_conditional_response(request, etag=etag, last_modified=ultima_modificacao)
+    if resposta is None:
+        if comprimir:
+            resposta = HttpResponse(entrada.corpo_gzip, content_type="application/json")
+            resposta["Content-Encoding"] = "gzip"
+        else:
+            resposta = HttpResponse(entrada.corpo, content_type="application/json")
+
+    resposta["ETag"] = etag
+    resposta["Last-Modified"] = http_date(ultima_modificacao)
+    resposta["Cache-Control"] = "no-cache"
+    patch_vary_headers(resposta, ("Accept-Encoding",))
+    return resposta
+
+
+def _filtros_matriz(
+    curso: str | None,
+    termo: int | None,
+    disciplina: str | None,
+    dia: str | None,
+    inicio: str | None,
+    fim: str | None,
+) -> dict:
+    """
+    Monta os filtros de ofertas de /matriz-horaria, convertendo o dia para maiúsculas e a janela de horário
+    ("HHhMM" ou "HH:MM") para minutos.
+
+    Raises:
+        ValueError: Se o dia ou algum dos horários for inválido.
+    """
+    if dia is not None:
+        dia = dia.upper()
+        if dia not in DIAS_SEMANA:
+            raise ValueError(f"Dia inválido: {dia}")
+    minutos = {}
+    for parametro, horario in (("inicio", inicio), ("fim", fim)):
+        if horario is None:
+            minutos[parametro] = None
+            continue
+        try:
+            minutos[parametro] = horario_para_minutos(horario.replace(":", "h"))
+        except ValueError:
+            raise ValueError(f"{parametro} deve estar no formato HHhMM ou HH:MM") from None
+    return {"curso": curso, "termo": termo, "disciplina": disciplina, "dia": dia, **minutos}
+
+
+@api.get("/matriz-horaria", response=list[Oferta])
+def listar_matriz_horaria(
+    request,
+    matriz: str | None = None,
+    curso: str | None = None,
+    termo: int | None = None,
+    disciplina: str | None = None,
+    dia: str | None = None,
+    inicio: str | None = None,
+    fim: str | None = None,
+    limite: int | None = None,
+    deslocamento: int = 0,
+):
+    """
+    Retorna a matriz horária atual a partir do cache em memória do seu arquivo JSON.
+    Com algum parâmetro, as ofertas são consultadas no banco, para onde cada versão da matriz é importada
+    por `manage.py importar_matriz` (ou `sincronizar_matriz`): `matriz` escolhe uma matriz registrada
+    (ver /matrizes; a atual se omitido); `curso` e `termo` filtram as ofertas; `disciplina` mantém as ofertas
+    cujo nome contém o termo informado; `dia`, `inicio` e `fim` mantêm as ofertas com algum horário no dia
+    e dentro da janela; `limite` e `deslocamento` paginam o resultado, cujo total é informado em X-Total-Count.
+    As consultas filtradas respondem 404 enquanto a versão da matriz não for importada: quando o arquivo JSON
+    da matriz muda, a nova versão precisa ser importada de novo (`manage.py importar_matriz`).
+    """
+    if not request.GET:
+        try:
+            entrada = CACHE_MATRIZ_HORARIA.obter()
+        except Exception as exc:
+            return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
+        return _responder_json_em_cache(request, entrada)
+
     try:
-        path = Path(__file__).parent / "files" / "matriz_2024_2.json"
-        with path.open(encoding="utf-8") as f:
-            matriz_horaria = json.load(f)
-        return matriz_horaria
+        filtros = _filtros_matriz(curso, termo, disciplina, dia, inicio, fim)
+        if limite is not None and limite < 1:
+            raise ValueError("limite deve ser maior que zero")
+        if deslocamento < 0:
+            raise ValueError("deslocamento não pode ser negativo")
+        if matriz is None:
+            registrada = REGISTRO_MATRIZES.registrar(CACHE_MATRIZ_HORARIA.obter().dados, nome=MATRIZ_ATUAL)
+        else:
+            registrada = REGISTRO_MATRIZES.obter(matriz)
+    except MatrizNaoEncontrada as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.NOT_FOUND)
+    except ValueError as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.BAD_REQUEST)
     except Exception as exc:
         return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
 
+    # O resultado só depende da versão da matriz e dos parâmetros.
+    consulta = sorted(request.GET.items())
+    etag = f'"{hashlib.sha256(f"{registrada.versao}:{consulta}".encode()).hexdigest()[:32]}"'
+    resposta = get_conditional_response(request, etag=etag)
+    if resposta is None:
+        nome = registrada.nome or registrada.versao
+        try:
+            with medir_etapa("matriz.consulta"):
+                importada = MatrizHoraria.objects.filter(nome=nome, versao=registrada.versao).first()
+                if importada is not None:
+                    ofertas = importada.ofertas.filtrar(**filtros)
+                    total = ofertas.count()
+                    fim_pagina = None if limite is None else deslocamento + limite
+                    pagina = list(ofertas.values_list("dados", flat=True)[deslocamento:fim_pagina])
+        except Exception as exc:
+            return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
+        if importada is None:
+            erro = f"Matriz {nome} ({registrada.versao}) não importada para o banco (ver manage.py importar_matriz)"
+            return api.create_response(request, {"erro": erro}, status=HTTPStatus.NOT_FOUND)
+        resposta = HttpResponse(serializar(pagina), content_type="application/json")
+        resposta["X-Total-Count"] = str(total)
+    resposta["ETag"] = etag
+    resposta["Cache-Control"] = "no-cache"
+    return resposta
+
+
+@api.get("/matrizes")
+def listar_matrizes(request):
+    """
+    Lista as matrizes horárias registradas no servidor, que podem ser referenciadas por `matriz_id`
+    (nome ou versão) em /grade-ideal no lugar da matriz completa.
+    """
+    try:
+        REGISTRO_MATRIZES.registrar(CACHE_MATRIZ_HORARIA.obter().dados, nome=MATRIZ_ATUAL)
+    except Exception as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.INTERNAL_SERVER_ERROR)
+    return REGISTRO_MATRIZES.listar()
+
+
+@api.get("/curriculos")
+def listar_curriculos(request):
+    """
+    Lista os currículos registrados, que podem ser escolhidos pelo parâmetro `curso` da grade ideal.
+    Os arquivos de currículo alterados são recarregados sem reiniciar o servidor.
+    """
+    REGISTRO_CURRICULOS.recarregar()
+    return REGISTRO_CURRICULOS.listar()
+
 
 @api.post("/historico-academico")
-def ler_historico_academico(request):
+async def ler_historico_academico(request, assincrono: bool = False):
     """
     Recebe um arquivo PDF do histórico acadêmico, converte para JSON e retorna o resultado.
+    PDFs já lidos são retornados do cache, indexado pelo hash do conteúdo e pela versão do parser.
+    A leitura roda no pool de admissão de históricos; com o pool e a fila ocupados, responde 503.
+    Com `assincrono=true`, o PDF é enfileirado para leitura em segundo plano e a resposta traz o
+    identificador da tarefa, a ser consultada em /historico-academico/tarefas/{id}.
     """
     try:
-        historico_academico_pdf = request.FILES["historico_academico"]
-        historico_academico_json = LeitorHistoricoAcademico.from_pdf(historico_academico_pdf)
+        conteudo = request.FILES["historico_academico"].read()
+        chave = LeitorHistoricoAcademico.chave_conteudo(conteudo)
+        historico_academico_json = CACHE_HISTORICO_ACADEMICO.obter(chave)
+        if historico_academico_json is not None:
+            if assincrono:
+                return {"id": None, "status": "CONCLUIDA", "resultado": historico_academico_json}
+            return historico_academico_json
+
+        if assincrono:
+            tarefa = FILA_HISTORICO_ACADEMICO.enfileirar(LeitorHistoricoAcademico.from_bytes, conteudo)
+
+            def armazenar_resultado(future):
+                if future.exception() is None:
+                    CACHE_HISTORICO_ACADEMICO.armazenar(chave, future.result())
+
+            tarefa.future.add_done_callback(armazenar_resultado)
+            return api.create_response(request, tarefa.para_dict(), status=HTTPStatus.ACCEPTED)
+
+        historico_academico_json = await ADMISSAO_HISTORICO.executar(LeitorHistoricoAcademico.from_bytes, conteudo)
+        CACHE_HISTORICO_ACADEMICO.armazenar(chave, historico_academico_json)
         return historico_academico_json
+    except (FilaCheia, PrazoEsgotado) as exc:
+        return _responder_sobrecarga(request, exc)
     except Exception as exc:
         return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.BAD_REQUEST)
 
 
-@api.post("/grade-ideal")
-def gerar_grade_ideal(request):
+@api.get("/metrics")
+def exportar_metricas(request):
+    """
+    Exporta, no formato texto do Prometheus, os histogramas de duração das requisições e das suas etapas,
+    os contadores de requisições, a ocupação atual dos caches, da fila de leitura de históricos, das sessões
+    de simulação e dos pools de admissão e os contadores de resoluções coalescidas.
+    """
+    for campo, valor in CACHE_GRADE_IDEAL.estatisticas().items():
+        if valor is not None:
+            METRICAS.definir(f"jailmaker_cache_grade_ideal_{campo}", valor)
+    for camada, estatisticas_camada in enumerate(CACHE_HISTORICO_ACADEMICO.estatisticas()):
+        for campo, valor in estatisticas_camada.items():
+            if valor is not None:
+                METRICAS.definir(f"jailmaker_cache_historico_{campo}", valor, camada=str(camada))
+    for campo, valor in FILA_HISTORICO_ACADEMICO.metricas().items():
+        METRICAS.definir(f"jailmaker_fila_historico_{campo}", valor)
+    for campo, valor in COALESCEDOR_GRADE_IDEAL.estatisticas().items():
+        METRICAS.definir(f"jailmaker_coalescencia_grade_ideal_{campo}", valor)
+    for campo, valor in REGISTRO_SESSOES.estatisticas().items():
+        if valor is not None:
+            METRICAS.definir(f"jailmaker_sessoes_{campo}", valor)
+    for admissao in (ADMISSAO_SOLVER, ADMISSAO_HISTORICO):
+        for campo, valor in admissao.metricas().items():
+            METRICAS.definir(f"jailmaker_admissao_{campo}", valor, pool=admissao.nome)
+    return HttpResponse(METRICAS.exportar(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@api.get("/historico-academico/cache")
+def estatisticas_cache_historico_academico(request):
+    """
+    Retorna a ocupação e os contadores de cada camada do cache de históricos acadêmicos lidos.
+    """
+    return CACHE_HISTORICO_ACADEMICO.estatisticas()
+
+
+@api.get("/historico-academico/tarefas")
+def metricas_tarefas_historico_academico(request):
+    """
+    Retorna a profundidade da fila de leitura assíncrona de históricos e os seus contadores.
     """
-    Recebe os dados da matriz curricular e do histórico acadêmico, gera e retorna a grade ideal.
+    return FILA_HISTORICO_ACADEMICO.metricas()
+
+
+@api.get("/historico-academico/tarefas/{tarefa_id}")
+def consultar_tarefa_historico_academico(request, tarefa_id: str):
+    """
+    Retorna o status de uma leitura assíncrona de histórico e, quando concluída, o resultado ou o erro.
+    """
+    tarefa = FILA_HISTORICO_ACADEMICO.obter(tarefa_id)
+    if tarefa is None:
+        return api.create_response(request, {"erro": "Tarefa não encontrada"}, status=HTTPStatus.NOT_FOUND)
+    return tarefa.para_dict()
+
+
+@api.post(
+    "/grade-ideal",
+    response=list[Oferta] | GradeIdealComEstatisticas,
+    openapi_extra=corpo_openapi(ADAPTADOR_GRADE_IDEAL),
+)
+async def gerar_grade_ideal(
+    request,
+    tempo_limite: float | None = None,
+    num_workers: int | None = None,
+    deterministico: bool | None = None,
+    estatisticas: bool = False,
+    pesos: str = "diretos",
+    curso: str | None = None,
+):
+    """
+    Recebe a matriz horária e o histórico acadêmico, gera e retorna a grade ideal.
+    O corpo é validado contra o esquema declarado; se for inválido, responde 400 com os erros encontrados.
+    A matriz pode ser enviada por inteiro em `matriz_horaria` ou referenciada por `matriz_id`, caso em que
+    são reaproveitados a versão e o índice de horários já calculados no servidor.
+    Grades ótimas ficam em cache, indexadas pela versão da matriz e pelo conjunto de ofertas elegíveis.
+    `pesos` escolhe o critério de peso das disciplinas no objetivo: "diretos" (padrão), "transitivos" ou
+    "caminho_critico". `curso` escolhe o currículo (ver /curriculos; o curso padrão se omitido).
+    Com `estatisticas=true`, retorna também as estatísticas da resolução.
+    A resolução roda no pool de admissão do solver: com o pool e a fila ocupados, responde 503 com Retry-After,
+    e, se não terminar dentro do prazo, 504. Requisições idênticas que chegam enquanto uma resolução está em
+    andamento aguardam o resultado dela em vez de resolverem novamente.
     """
     try:
-        data = json.loads(request.body)
-        grade_ideal = GeradorGradeIdeal(data["matriz_horaria"], data["historico_academico"]).gerar()
+        parametros_solver = _parametros_solver(tempo_limite, num_workers, deterministico)
+        with medir_etapa("requisicao.json"):
+            data = ADAPTADOR_GRADE_IDEAL.validate_json(request.body)
+        # A preparação roda fora do event loop, mas antes da admissão: requisições idênticas simultâneas
+        # ocupam uma única vaga do pool do solver.
+        gerador, impressao_digital = await asyncio.to_thread(
+            _preparar_grade_ideal, data, parametros_solver, pesos, curso
+        )
+        (grade_ideal, estatisticas_solver, em_cache), coalescida = await COALESCEDOR_GRADE_IDEAL.executar(
+            impressao_digital, lambda: ADMISSAO_SOLVER.executar(_resolver_grade_ideal, gerador)
+        )
+        if estatisticas:
+            return {
+                "grade": grade_ideal,
+                "estatisticas": estatisticas_solver,
+                "em_cache": em_cache,
+                "coalescida": coalescida,
+            }
         return grade_ideal
+    except (FilaCheia, PrazoEsgotado) as exc:
+        return _responder_sobrecarga(request, exc)
+    except ValidationError as exc:
+        return _responder_corpo_invalido(request, exc)
+    except (MatrizNaoEncontrada, CurriculoNaoEncontrado) as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.NOT_FOUND)
+    except Exception as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+
+
+def _criar_gerador(data: dict, parametros_solver: ParametrosSolver, pesos: str, curso: str | None) -> GeradorGradeIdeal:
+    """
+    Monta o gerador da grade ideal a partir do corpo da requisição, obtendo a matriz horária e o currículo.
+    Executada fora do event loop, já que o registro da matriz e a verificação dos artefatos e dos currículos
+    leem arquivos e calculam hashes.
+    """
+    matriz = _matriz_da_requisicao(data)
+    return GeradorGradeIdeal(
+        matriz.matriz_horaria,
+        data["historico_academico"],
+        parametros_solver=parametros_solver,
+        versao_matriz=matriz.versao,
+        indice_horario=matriz.indice_horario,
+        pesos=pesos,
+        curriculo=REGISTRO_CURRICULOS.obter(curso),
+    )
+
+
+def _preparar_grade_ideal(
+    data: dict, parametros_solver: ParametrosSolver, pesos: str, curso: str | None
+) -> tuple[GeradorGradeIdeal, str]:
+    """
+    Monta o gerador e calcula a sua impressão digital (que pode calcular o hash da matriz enviada),
+    usada para coalescer requisições idênticas antes da admissão.
+    """
+    gerador = _criar_gerador(data, parametros_solver, pesos, curso)
+    return gerador, gerador.impressao_digital()
+
+
+def _resolver_grade_ideal(gerador: GeradorGradeIdeal) -> tuple[list[dict], dict | None, bool]:
+    """
+    Retorna a grade ideal do cache ou a gera, armazenando as grades ótimas.
+    Executada no pool de admissão do solver, já que a chave canônica pode construir o modelo base.
+
+    Returns:
+        A grade ideal, as estatísticas da resolução e se a grade veio do cache.
+    """
+    chave = gerador.chave_canonica()
+    with medir_etapa("grade_ideal.cache"):
+        em_cache = CACHE_GRADE_IDEAL.obter(chave)
+    if em_cache is not None:
+        grade_ideal, estatisticas_solver = em_cache
+    else:
+        grade_ideal = gerador.gerar()
+        estatisticas_solver = gerador.estatisticas
+        if estatisticas_solver is not None and estatisticas_solver["status"] == "OPTIMAL":
+            CACHE_GRADE_IDEAL.armazenar(chave, (grade_ideal, estatisticas_solver))
+    return grade_ideal, estatisticas_solver, em_cache is not None
+
+
+@api.get("/grade-ideal/cache")
+def estatisticas_cache_grade_ideal(request):
+    """
+    Retorna a ocupação e os contadores de acertos e falhas do cache de grades ideais.
+    """
+    return CACHE_GRADE_IDEAL.estatisticas()
+
+
+@api.delete("/grade-ideal/cache")
+def limpar_cache_grade_ideal(request):
+    """
+    Remove todas as grades do cache de grades ideais, mantendo os contadores.
+    """
+    CACHE_GRADE_IDEAL.limpar()
+    return HttpResponse(status=HTTPStatus.NO_CONTENT)
+
+
+@api.post("/grade-ideal/lote", openapi_extra=corpo_openapi(ADAPTADOR_LOTE))
+async def gerar_grades_ideais_em_lote(
+    request,
+    tempo_limite: float | None = None,
+    num_workers: int | None = None,
+    deterministico: bool | None = None,
+    curso: str | None = None,
+):
+    """
+    Recebe uma matriz horária (ou `matriz_id`) e os históricos acadêmicos de vários estudantes do curso `curso`
+    e gera a grade ideal de cada um em um pool de processos. A resposta é um NDJSON transmitido na ordem em que
+    as grades ficam prontas, com uma linha {"indice": ..., "grade": [...]} (ou {"indice": ..., "erro": ...})
+    por histórico.
+    O lote ocupa uma vaga do pool de admissão do solver enquanto é transmitido: com o pool e a fila ocupados,
+    responde 503 com Retry-After. As resoluções são aguardadas no event loop, sem ocupar uma thread por lote.
+    """
+    try:
+        configuracao = settings.JAILMAKER_LOTE
+        num_workers = configuracao["NUM_WORKERS_SOLVER"] if num_workers is None else num_workers
+        parametros_solver = _parametros_solver(tempo_limite, num_workers, deterministico)
+
+        with medir_etapa("requisicao.json"):
+            data = ADAPTADOR_LOTE.validate_json(request.body)
+        historicos_academicos = data["historicos_academicos"]
+        if len(historicos_academicos) > configuracao["MAX_HISTORICOS"]:
+            raise ValueError(f"O lote deve ter no máximo {configuracao['MAX_HISTORICOS']} históricos")
+        matriz, curriculo = await asyncio.to_thread(_preparar_lote, data, curso)
+        reserva = ADMISSAO_SOLVER.reservar()
+    except FilaCheia as exc:
+        return _responder_sobrecarga(request, exc)
+    except ValidationError as exc:
+        return _responder_corpo_invalido(request, exc)
+    except (MatrizNaoEncontrada, CurriculoNaoEncontrado) as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.NOT_FOUND)
+    except Exception as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+
+    resultados = resolver_em_lote(
+        matriz.matriz_horaria,
+        historicos_academicos,
+        parametros_solver,
+        obter_executor(configuracao["MAX_WORKERS"]),
+        cache=CACHE_GRADE_IDEAL,
+        versao_matriz=matriz.versao,
+        curriculo=curriculo,
+        indice_horario=matriz.indice_horario,
+    )
+    return StreamingHttpResponse(_LinhasLote(resultados, reserva), content_type="application/x-ndjson")
+
+
+def _preparar_lote(data: dict, curso: str | None) -> tuple[MatrizRegistrada, Curriculo]:
+    """
+    Obtém a matriz horária e o currículo do lote. Executada fora do event loop, como `_criar_gerador`.
+    """
+    return _matriz_da_requisicao(data), REGISTRO_CURRICULOS.obter(curso)
+
+
+class _LinhasLote:
+    """
+    Linhas NDJSON da resposta de /grade-ideal/lote, produzidas por um iterador assíncrono. A vaga reservada
+    no pool de admissão é liberada ao fim da transmissão ou quando a resposta é fechada (ex.: o cliente
+    desconectou), caso em que as resoluções que ainda não começaram são canceladas.
+    """
+
+    def __init__(self, resultados: AsyncGenerator[dict], reserva: Reserva) -> None:
+        self._resultados = resultados
+        self._reserva = reserva
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        self._loop = asyncio.get_running_loop()
+        try:
+            with self._reserva:
+                async for resultado in self._resultados:
+                    yield serializar(resultado) + b"\n"
+        finally:
+            await self._resultados.aclose()
+
+    def close(self) -> None:
+        """
+        Libera a vaga e encerra as resoluções. Chamado pelo servidor ao fim da resposta, possivelmente
+        em outra thread: o gerador de resultados é fechado no event loop em que era percorrido.
+        """
+        self._reserva.liberar()
+        if self._loop is not None and not self._loop.is_closed():
+            asyncio.run_coroutine_threadsafe(self._resultados.aclose(), self._loop)
+
+
+@api.post(
+    "/grade-ideal/alternativas",
+    response=list[GradeAlternativa] | AlternativasComEstatisticas,
+    openapi_extra=corpo_openapi(ADAPTADOR_GRADE_IDEAL),
+)
+async def gerar_alternativas_grade_ideal(
+    request,
+    k: int = 3,
+    tempo_limite: float | None = None,
+    num_workers: int | None = None,
+    deterministico: bool | None = None,
+    estatisticas: bool = False,
+    pesos: str = "diretos",
+    curso: str | None = None,
+):
+    """
+    Recebe a matriz horária (ou `matriz_id`) e o histórico acadêmico e retorna as k melhores grades distintas,
+    resolvendo um único modelo dentro do tempo limite informado, com o critério de peso `pesos` e o currículo
+    do curso `curso`.
+    Com `estatisticas=true`, retorna também as estatísticas de cada resolução.
+    As resoluções rodam no pool de admissão do solver, como em /grade-ideal.
+    """
+    try:
+        if not 1 <= k <= ALTERNATIVAS_K_MAXIMO:
+            raise ValueError(f"k deve estar entre 1 e {ALTERNATIVAS_K_MAXIMO}")
+
+        parametros_solver = _parametros_solver(tempo_limite, num_workers, deterministico)
+        with medir_etapa("requisicao.json"):
+            data = ADAPTADOR_GRADE_IDEAL.validate_json(request.body)
+        alternativas, estatisticas_solver = await ADMISSAO_SOLVER.executar(
+            _gerar_alternativas, data, parametros_solver, pesos, curso, k
+        )
+        if estatisticas:
+            return {"alternativas": alternativas, "estatisticas": estatisticas_solver}
+        return alternativas
+    except (FilaCheia, PrazoEsgotado) as exc:
+        return _responder_sobrecarga(request, exc)
+    except ValidationError as exc:
+        return _responder_corpo_invalido(request, exc)
+    except (MatrizNaoEncontrada, CurriculoNaoEncontrado) as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.NOT_FOUND)
     except Exception as exc:
         return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+
+
+def _gerar_alternativas(
+    data: dict, parametros_solver: ParametrosSolver, pesos: str, curso: str | None, k: int
+) -> tuple[list[dict], list[dict] | None]:
+    """Monta o gerador e gera as k melhores grades (executada no pool de admissão do solver)."""
+    gerador = _criar_gerador(data, parametros_solver, pesos, curso)
+    return gerador.gerar_alternativas(k), gerador.estatisticas
+
+
+@api.post("/grade-ideal/sessoes", response={201: Sessao}, openapi_extra=corpo_openapi(ADAPTADOR_GRADE_IDEAL))
+async def criar_sessao_grade_ideal(
+    request,
+    tempo_limite: float | None = None,
+    num_workers: int | None = None,
+    deterministico: bool | None = None,
+    pesos: str = "diretos",
+    curso: str | None = None,
+):
+    """
+    Recebe a matriz horária (ou `matriz_id`) e o histórico acadêmico, como em /grade-ideal, e abre uma sessão
+    de simulação: o modelo do estudante, reduzido às ofertas elegíveis, fica no servidor para ser editado em
+    /grade-ideal/sessoes/{id}. A resposta traz o identificador da sessão, a grade ideal e a posição de cada
+    oferta da grade na matriz horária. Os parâmetros do solver valem para todas as resoluções da sessão.
+    """
+    try:
+        parametros_solver = _parametros_solver(tempo_limite, num_workers, deterministico)
+        with medir_etapa("requisicao.json"):
+            data = ADAPTADOR_GRADE_IDEAL.validate_json(request.body)
+        sessao = await ADMISSAO_SOLVER.executar(_criar_sessao, data, parametros_solver, pesos, curso)
+        REGISTRO_SESSOES.registrar(sessao)
+        return api.create_response(request, sessao.para_dict(), status=HTTPStatus.CREATED)
+    except (FilaCheia, PrazoEsgotado) as exc:
+        return _responder_sobrecarga(request, exc)
+    except ValidationError as exc:
+        return _responder_corpo_invalido(request, exc)
+    except (MatrizNaoEncontrada, CurriculoNaoEncontrado) as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.NOT_FOUND)
+    except Exception as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+
+
+def _criar_sessao(data: dict, parametros_solver: ParametrosSolver, pesos: str, curso: str | None) -> SessaoGradeIdeal:
+    """Cria a sessão de simulação e resolve a grade inicial (executada no pool de admissão do solver)."""
+    sessao = SessaoGradeIdeal(_criar_gerador(data, parametros_solver, pesos, curso))
+    sessao.resolver()
+    return sessao
+
+
+@api.get("/grade-ideal/sessoes/{sessao_id}", response=Sessao)
+def consultar_sessao_grade_ideal(request, sessao_id: str):
+    """
+    Retorna a grade atual e as restrições de uma sessão de simulação, renovando a sua expiração.
+    """
+    try:
+        return REGISTRO_SESSOES.obter(sessao_id).para_dict()
+    except SessaoNaoEncontrada as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.NOT_FOUND)
+
+
+@api.patch("/grade-ideal/sessoes/{sessao_id}", response=Sessao, openapi_extra=corpo_openapi(ADAPTADOR_EDICAO_SESSAO))
+async def editar_sessao_grade_ideal(request, sessao_id: str):
+    """
+    Aplica uma edição incremental à sessão e retorna a nova grade. As ofertas são identificadas pela posição
+    na matriz horária: {"fixar": [...], "liberar": [...], "excluir": [...], "incluir": [...],
+    "excluir_professores": [...], "incluir_professores": [...], "bloquear_dias": ["SEXTA"], "desbloquear_dias": [...]},
+    todas opcionais. O modelo da sessão é resolvido novamente partindo da grade anterior, sem ser reconstruído.
+    Se as ofertas fixadas forem incompatíveis entre si, a grade fica vazia e o status das estatísticas
+    é INFEASIBLE.
+    """
+    try:
+        with medir_etapa("requisicao.json"):
+            edicao = ADAPTADOR_EDICAO_SESSAO.validate_json(request.body)
+        sessao = REGISTRO_SESSOES.obter(sessao_id)
+        await ADMISSAO_SOLVER.executar(sessao.editar, edicao)
+        return sessao.para_dict()
+    except (FilaCheia, PrazoEsgotado) as exc:
+        return _responder_sobrecarga(request, exc)
+    except ValidationError as exc:
+        return _responder_corpo_invalido(request, exc)
+    except SessaoNaoEncontrada as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.NOT_FOUND)
+    except Exception as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.BAD_REQUEST)
+
+
+@api.delete("/grade-ideal/sessoes/{sessao_id}")
+def encerrar_sessao_grade_ideal(request, sessao_id: str):
+    """
+    Encerra a sessão de simulação, liberando o seu modelo.
+    """
+    try:
+        REGISTRO_SESSOES.remover(sessao_id)
+    except SessaoNaoEncontrada as exc:
+        return api.create_response(request, {"erro": str(exc)}, status=HTTPStatus.NOT_FOUND)
+    return HttpResponse(status=HTTPStatus.NO_CONTENT)